@@ -2,6 +2,7 @@ rm -rf ../data-301-student/*
 cp -Rp book ../data-301-student/
 cp -Rp labs ../data-301-student/
 cp -Rp config ../data-301-student/
+cp -Rp data301 ../data-301-student/
 find ../data-301-student/ -name "*.ipynb" -exec rm -f {} \;
 
 # TODO go through every md file and remove certain sections
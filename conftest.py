@@ -0,0 +1 @@
+# Makes `data301` importable from the tests without installing it.
@@ -0,0 +1,12 @@
+"""
+Helper routines for DATA 301.
+
+The notebooks in `book/` and `labs/` teach the pandas idioms for each
+topic. The modules in this package implement the same computations in a
+form that scales to tables far larger than the course data sets. Import
+them from a notebook with
+
+    import sys
+    sys.path.append("../..")
+    from data301 import allocation
+"""
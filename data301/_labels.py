@@ -0,0 +1,29 @@
+"""
+Labels of the inputs, for results that are indexed and named like them.
+
+Inputs may be pandas objects or plain arrays and lists. Only a `Series` or
+a `DataFrame` has labels: other inputs can have attributes with the same
+names, such as the `index` method of a list, so the labels are never looked
+up with `getattr`.
+"""
+
+import pandas as pd
+
+
+def index_and_name(data):
+    """Index and name of `data`, or None for those it does not have.
+
+    A `Series` has both, a `DataFrame` only an index, and anything else
+    neither.
+    """
+    if isinstance(data, pd.Series):
+        return data.index, data.name
+    if isinstance(data, pd.DataFrame):
+        return data.index, None
+    return None, None
+
+
+def series_like(values, data):
+    """`values` as a Series with the index and name of `data`, if any."""
+    index, name = index_and_name(data)
+    return pd.Series(values, index=index, name=name)
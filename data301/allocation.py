@@ -0,0 +1,87 @@
+"""
+Splitting an amount evenly among the investors in each row.
+
+In the Shark Tank lab, each company that got a deal has a 1 in the column
+of every shark that invested, and the `Amount` is split evenly among them.
+Instead of a `groupby("Company").apply(...)` per company, we row-normalize
+the indicator matrix, scale each row by its amount and sum the columns.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _indicator_matrix(df, investors):
+    """Return a float matrix with a 1 wherever an investor column is set."""
+    values = df[investors].to_numpy(dtype=float, na_value=0.0)
+    return (values != 0).astype(float)
+
+
+def _shares(df, amount, investors):
+    """Return the indicator matrix and each row's amount per investor."""
+    indicators = _indicator_matrix(df, investors)
+    counts = indicators.sum(axis=1)
+    amounts = df[amount].to_numpy(dtype=float, na_value=0.0)
+    per_investor = np.divide(amounts, counts,
+                             out=np.zeros_like(amounts), where=counts > 0)
+    return indicators, per_investor
+
+
+def split_amount(df, amount, investors):
+    """Split each row's amount evenly among the investors who are set.
+
+    Parameters
+    ----------
+    df : DataFrame
+        One row per deal.
+    amount : str
+        Name of the numeric column holding the amount of each deal.
+    investors : list of str
+        Indicator columns, one per investor. A nonzero, non-null value means
+        that investor took part in the deal.
+
+    Returns
+    -------
+    DataFrame
+        Same index as `df`, one column per investor, holding the amount that
+        investor put into each deal. Rows with no investors are all zero.
+    """
+    indicators, per_investor = _shares(df, amount, investors)
+    return pd.DataFrame(indicators * per_investor[:, np.newaxis],
+                        index=df.index, columns=investors)
+
+
+def allocate_equal_split(df, amount, investors, by=None):
+    """Total amount invested by each investor under an equal split.
+
+    Parameters
+    ----------
+    df : DataFrame
+        One row per deal.
+    amount : str
+        Name of the numeric column holding the amount of each deal.
+    investors : list of str
+        Indicator columns, one per investor.
+    by : str, optional
+        Key column, such as `"Company"`. If given, only the first row for
+        each key is counted, which reproduces the result of
+        `df.groupby(by).apply(lambda x: ... x.iloc[0] ...)`.
+
+    Returns
+    -------
+    Series
+        Total amount per investor, indexed by `investors`.
+
+    Examples
+    --------
+    >>> names = ["Corcoran", "Cuban", "Greiner", "Herjavec",
+    ...          "John", "O'Leary", "Harrington", "Guest"]
+    >>> allocate_equal_split(df, "Amount", names).sort_values()
+    """
+    if by is not None:
+        df = df[~df[by].duplicated()]
+    indicators, per_investor = _shares(df, amount, investors)
+    # A single matrix-vector product sums each investor's share over all
+    # deals, without materializing the per-row allocation.
+    totals = per_investor @ indicators
+    return pd.Series(totals, index=investors, name=amount)
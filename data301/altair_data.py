@@ -0,0 +1,140 @@
+"""
+Keeping the data of Altair charts out of the notebook.
+
+Chapters 3 and 7 call `alt.data_transformers.disable_max_rows()` and pass
+whole `DataFrame`s to `alt.Chart`, so every row is embedded as JSON in the
+chart specification and saved in the notebook. The transformer in this
+module writes the data of each chart to a compact CSV file next to the
+notebook instead, and the specification only refers to it by URL. Files are
+named by a hash of their contents, so a `DataFrame` used by several charts
+is written once.
+
+Vega-Lite reads the file in the browser, so the notebook server must serve
+the directory it is written to; relative paths work in Jupyter Notebook and
+JupyterLab.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+NAME = "data301_files"
+
+_FORMATS = {"csv": ",", "tsv": "\t"}
+
+
+def content_hash(df):
+    """Hash of the column names, types and values of a `DataFrame`.
+
+    The rows are hashed with `pd.util.hash_pandas_object`, which is
+    vectorized, instead of serializing the whole table first.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr([(str(name), str(dtype))
+                        for name, dtype in df.dtypes.items()]).encode())
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest.update(np.ascontiguousarray(rows).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _parse(df):
+    """Vega-Lite types to parse each column as, so nothing is inferred."""
+    parse = {}
+    for name, dtype in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            parse[name] = "boolean"
+        elif pd.api.types.is_numeric_dtype(dtype):
+            parse[name] = "number"
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            parse[name] = "date"
+    return parse
+
+
+def to_local_file(data, directory="altair-data", format="csv",
+                  float_precision=None, url_prefix=None):
+    """Write the data of a chart to a file and return a reference to it.
+
+    Parameters
+    ----------
+    data : DataFrame or dict
+        The chart's data, as passed to a data transformer. A dict with a
+        `"values"` list is written too; other dicts (e.g. URLs) are returned
+        unchanged.
+    directory : str
+        Directory to write the files to, relative to the notebook.
+    format : {"csv", "tsv"}
+        File format.
+    float_precision : int, optional
+        Significant digits kept for floating point columns, which makes the
+        files smaller but changes the values that are plotted and shown in
+        tooltips. By default every float is written exactly, in the
+        shortest form that reads back to the same number.
+    url_prefix : str, optional
+        Prefix of the URL that the browser uses to fetch the files, if the
+        directory is served from somewhere other than the notebook's own
+        location.
+
+    Returns
+    -------
+    dict
+        `{"url": ..., "format": {...}}`, to be used as the chart's data.
+    """
+    if format not in _FORMATS:
+        raise ValueError("format must be one of %s" % list(_FORMATS))
+    if isinstance(data, dict):
+        if "values" not in data:
+            return data
+        data = pd.DataFrame(data["values"])
+    elif not isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data.columns, pd.MultiIndex):
+        raise ValueError("columns must be a flat Index, not a MultiIndex")
+    data = data.rename(columns=str)
+
+    # the same data rounded differently is a different file
+    digest = content_hash(data)
+    if float_precision is not None:
+        digest += "-g%d" % float_precision
+    filename = "data-%s.%s" % (digest, format)
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        # write to a temporary name first, so that a partially written file
+        # is never mistaken for a finished one
+        partial = path + ".partial"
+        float_format = (None if float_precision is None
+                        else "%%.%dg" % float_precision)
+        data.to_csv(partial, sep=_FORMATS[format], index=False,
+                    float_format=float_format, date_format="%Y-%m-%dT%H:%M:%S")
+        os.replace(partial, path)
+
+    url = "/".join([url_prefix if url_prefix is not None else directory,
+                    filename])
+    return {"url": url, "format": {"type": format, "parse": _parse(data)}}
+
+
+def enable(directory="altair-data", format="csv", float_precision=None,
+           url_prefix=None):
+    """Register and enable the file transformer for all Altair charts.
+
+    Replaces `alt.data_transformers.disable_max_rows()`: there is no row
+    limit, because the rows no longer go into the notebook. See
+    `to_local_file` for the parameters.
+
+    Examples
+    --------
+    >>> from data301 import altair_data
+    >>> altair_data.enable()
+    >>> alt.Chart(wines_plot).mark_point(size=60).encode(...)
+    """
+    import altair as alt
+
+    def transformer(data):
+        return to_local_file(data, directory=directory, format=format,
+                             float_precision=float_precision,
+                             url_prefix=url_prefix)
+
+    alt.data_transformers.register(NAME, transformer)
+    alt.data_transformers.enable(NAME)
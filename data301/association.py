@@ -0,0 +1,221 @@
+"""
+Measures of association between categorical variables.
+
+Section 3.2 measures how far two variables are from independence by
+comparing their joint distribution with the one expected under
+independence, using the total variation distance, the chi-square distance
+and the mutual information. `association_matrix` computes any of these for
+every pair of columns in a table. Each column is factorized into integer
+codes once, the counts for many pairs are tabulated with a single
+`np.bincount`, and the pairs are spread over a pool of processes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .contingency import factorize
+
+STATISTICS = ("total_variation", "chi_square", "mutual_information")
+
+# maximum number of (pair, observation) entries, and of cells, tabulated by
+# one bincount
+_BLOCK_SIZE = 2 ** 24
+
+
+def _statistic(counts, statistic):
+    """Association statistic of a 2-D array of counts."""
+    total = counts.sum()
+    if total == 0:
+        return np.nan
+    joint = counts / total
+    expected = np.outer(joint.sum(axis=1), joint.sum(axis=0))
+    if statistic == "total_variation":
+        return np.abs(joint - expected).sum()
+    nonzero = expected > 0
+    if statistic == "chi_square":
+        return (((joint - expected)[nonzero] ** 2) / expected[nonzero]).sum()
+    # 0 log 0 = 0, so only the nonzero cells contribute
+    nonzero = joint > 0
+    return (joint[nonzero] * np.log(joint[nonzero] / expected[nonzero])).sum()
+
+
+def total_variation(table):
+    """Total variation distance between `table.joint` and `table.expected`."""
+    return _statistic(table.counts.to_numpy(), "total_variation")
+
+
+def chi_square(table):
+    """Chi-square distance between `table.joint` and `table.expected`."""
+    return _statistic(table.counts.to_numpy(), "chi_square")
+
+
+def mutual_information(table):
+    """Mutual information of the two variables in a `ContingencyTable`."""
+    return _statistic(table.counts.to_numpy(), "mutual_information")
+
+
+# The codes are sent to each worker process once, when it starts, rather than
+# with every task.
+_codes = None
+_n_categories = None
+
+
+def _init_worker(codes, n_categories):
+    global _codes, _n_categories
+    _codes, _n_categories = codes, n_categories
+
+
+def _sparse_statistic(rows, columns, counts, statistic):
+    """Association statistic of the nonzero cells of a table of counts.
+
+    Every cell that is left out has a count of 0, so it only adds its
+    expected proportion to the total variation, and nothing to the other
+    statistics; both are accounted for without listing those cells.
+    """
+    total = counts.sum()
+    if total == 0:
+        return np.nan
+    joint = counts / total
+    expected = (np.bincount(rows, joint)[rows]
+                * np.bincount(columns, joint)[columns])
+    if statistic == "total_variation":
+        # the expected proportions of all the cells sum to 1
+        return (np.abs(joint - expected) - expected).sum() + 1
+    if statistic == "chi_square":
+        return (joint ** 2 / expected).sum() - 1
+    return (joint * np.log(joint / expected)).sum()
+
+
+def _block_statistics(i, js, statistic):
+    """Statistics of column `i` against each of the columns `js`.
+
+    The cells of all the pairs are numbered consecutively, so that one
+    bincount over the concatenated cell numbers tabulates every pair.
+    Missing values have code 0, so their row and column of each table are
+    simply dropped afterwards. Pairs with more cells than observations
+    (such as an ID column against anything) are tabulated sparsely, from
+    the distinct cell numbers that actually occur.
+    """
+    x, k = _codes[i].astype(np.int64), _n_categories[i]
+    results = np.empty(len(js))
+    dense = k * _n_categories[js] <= len(x)
+    sizes = k * _n_categories[js[dense]]
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    if dense.any():
+        cells = np.concatenate([
+            offset + x * _n_categories[j] + _codes[j]
+            for offset, j in zip(offsets, js[dense])
+        ])
+        counts = np.bincount(cells, minlength=offsets[-1])
+        results[dense] = [
+            _statistic(counts[start:stop].reshape(k, -1)[1:, 1:], statistic)
+            for start, stop in zip(offsets[:-1], offsets[1:])
+        ]
+    for position in np.flatnonzero(~dense):
+        j = js[position]
+        cells, counts = np.unique(x * _n_categories[j] + _codes[j],
+                                  return_counts=True)
+        rows, columns = np.divmod(cells, _n_categories[j])
+        present = (rows > 0) & (columns > 0)
+        results[position] = _sparse_statistic(
+            rows[present], columns[present], counts[present], statistic)
+    return results
+
+
+def _tasks(n_categories, n_rows):
+    """Split the pairs above the diagonal into blocks of bounded size.
+
+    A block has at most `_BLOCK_SIZE` (pair, observation) entries, and its
+    dense tables have at most `_BLOCK_SIZE` cells in all.
+    """
+    n_columns = len(n_categories)
+    for i in range(n_columns):
+        js, entries, cells = [], 0, 0
+        for j in range(i + 1, n_columns):
+            size = n_categories[i] * n_categories[j]
+            if size > n_rows:
+                size = 0  # tabulated sparsely
+            if js and (entries + n_rows > _BLOCK_SIZE
+                       or cells + size > _BLOCK_SIZE):
+                yield i, np.array(js)
+                js, entries, cells = [], 0, 0
+            js.append(j)
+            entries += n_rows
+            cells += size
+        if js:
+            yield i, np.array(js)
+
+
+def _diagonal_statistic(codes, n_categories, statistic):
+    """Statistic of a column against itself, from its own counts."""
+    counts = np.bincount(codes, minlength=n_categories)[1:]
+    present = np.flatnonzero(counts)
+    return _sparse_statistic(present, present, counts[present], statistic)
+
+
+def association_matrix(df, columns=None, statistic="mutual_information",
+                       n_jobs=None):
+    """Association statistic for every pair of categorical columns.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Table of observations.
+    columns : list of str, optional
+        Columns to compare. Defaults to all columns of `df`.
+    statistic : {"mutual_information", "chi_square", "total_variation"}
+        Measure of association, computed from the joint distribution and
+        the distribution expected under independence as in section 3.2.
+    n_jobs : int, optional
+        Number of worker processes. Defaults to the number of CPUs; use 1 to
+        compute everything in the current process.
+
+    Returns
+    -------
+    DataFrame
+        Symmetric matrix indexed by `columns` in both directions. Each pair
+        only uses the observations where neither variable is missing.
+
+    Examples
+    --------
+    >>> association_matrix(titanic_df, ["sex", "pclass", "embarked"],
+    ...                    statistic="chi_square")
+    """
+    if statistic not in STATISTICS:
+        raise ValueError("statistic must be one of %s" % (STATISTICS,))
+    if columns is None:
+        columns = list(df.columns)
+    factorized = [factorize(df[column]) for column in columns]
+    # shift the codes so that missing values (-1) get a category of their own
+    codes = np.vstack([code for code, _ in factorized]).astype(np.int32) + 1
+    n_categories = np.array([len(labels) + 1 for _, labels in factorized])
+    n_columns, n_rows = codes.shape
+
+    tasks = list(_tasks(n_categories, n_rows))
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = min(n_jobs, max(len(tasks), 1))
+    if n_jobs <= 1:
+        _init_worker(codes, n_categories)
+        try:
+            results = [_block_statistics(i, js, statistic)
+                       for i, js in tasks]
+        finally:
+            _init_worker(None, None)
+    else:
+        with ProcessPoolExecutor(n_jobs, initializer=_init_worker,
+                                 initargs=(codes, n_categories)) as pool:
+            results = list(pool.map(_block_statistics,
+                                    *zip(*tasks),
+                                    [statistic] * len(tasks)))
+
+    matrix = np.empty((n_columns, n_columns))
+    for i in range(n_columns):
+        matrix[i, i] = _diagonal_statistic(codes[i], n_categories[i],
+                                           statistic)
+    for (i, js), values in zip(tasks, results):
+        matrix[i, js] = matrix[js, i] = values
+    return pd.DataFrame(matrix, index=columns, columns=columns)
@@ -0,0 +1,237 @@
+"""
+Two-dimensional binning of dense scatter plots and heatmaps.
+
+Sections 3.3, 5.1 and 6.1 draw scatter plots with one mark per observation,
+and the KNN heatmap in section 5.1 draws one `mark_rect` per grid point, so
+the cost of the plot grows with the number of rows. Here the x/y plane is
+divided into a grid of cells, and the observations are reduced to a count
+(and the mean of a color variable) per cell with `np.bincount` before
+anything is drawn. The plot then only has as many marks as there are cells.
+"""
+
+import numpy as np
+import pandas as pd
+
+STATISTICS = ("count", "sum", "mean")
+
+
+def auto_bins(n, min_bins=10, max_bins=200):
+    """Number of bins per axis for `n` points.
+
+    Twice the cube root of `n` (the Rice rule), so the grid gets finer as
+    more points are available to fill it, up to `max_bins`.
+    """
+    return int(np.clip(np.ceil(2 * np.cbrt(max(n, 1))), min_bins, max_bins))
+
+
+def _edges(values, bins, value_range):
+    if value_range is None:
+        low, high = (values.min(), values.max()) if len(values) else (0., 1.)
+    else:
+        low, high = value_range
+    if low == high:
+        low, high = low - .5, high + .5
+    return np.linspace(low, high, bins + 1)
+
+
+def _bin_index(values, edges):
+    """Bin of each value; the last bin includes its right edge."""
+    bins = len(edges) - 1
+    index = ((values - edges[0]) * (bins / (edges[-1] - edges[0])))
+    return np.clip(index.astype(np.int64), 0, bins - 1)
+
+
+class Grid:
+    """Observations aggregated into the cells of a regular x/y grid.
+
+    Parameters
+    ----------
+    x, y : array-like
+        Coordinates of the points.
+    values : array-like, optional
+        Variable to aggregate in each cell, such as the one mapped to color.
+    bins : int, (int, int) or "auto"
+        Number of bins along each axis. "auto" picks it from the number of
+        points with `auto_bins`.
+    range : ((float, float), (float, float)), optional
+        Limits of the grid along x and y. Defaults to the range of the data;
+        points outside the limits are dropped.
+
+    Attributes
+    ----------
+    x_edges, y_edges : ndarray
+        Boundaries of the cells along each axis.
+    counts : ndarray
+        Number of points in each cell, of shape `(x bins, y bins)`.
+    sums : ndarray or None
+        Sum of `values` in each cell.
+    """
+
+    def __init__(self, x, y, values=None, bins="auto", range=None):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        keep = ~(np.isnan(x) | np.isnan(y))
+        if values is not None:
+            values = np.asarray(values, dtype=float)
+            keep &= ~np.isnan(values)
+        if not keep.all():
+            x, y = x[keep], y[keep]
+            values = None if values is None else values[keep]
+
+        if isinstance(bins, str):
+            if bins != "auto":
+                raise ValueError("bins must be an int, a pair or 'auto'")
+            bins = auto_bins(len(x))
+        x_bins, y_bins = (bins, bins) if np.ndim(bins) == 0 else bins
+        x_range, y_range = (None, None) if range is None else range
+        self.x_edges = _edges(x, x_bins, x_range)
+        self.y_edges = _edges(y, y_bins, y_range)
+
+        if range is not None:
+            inside = ((x >= self.x_edges[0]) & (x <= self.x_edges[-1])
+                      & (y >= self.y_edges[0]) & (y <= self.y_edges[-1]))
+            x, y = x[inside], y[inside]
+            values = None if values is None else values[inside]
+
+        cells = (_bin_index(x, self.x_edges) * y_bins
+                 + _bin_index(y, self.y_edges))
+        shape = (x_bins, y_bins)
+        self.counts = np.bincount(cells, minlength=x_bins * y_bins) \
+            .reshape(shape)
+        self.sums = None
+        if values is not None:
+            self.sums = np.bincount(cells, weights=values,
+                                    minlength=x_bins * y_bins).reshape(shape)
+
+    @property
+    def means(self):
+        """Mean of `values` in each cell, NaN where a cell is empty."""
+        if self.sums is None:
+            raise ValueError("no values were aggregated")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.counts > 0, self.sums / self.counts, np.nan)
+
+    def statistic(self, statistic):
+        """The grid of counts, sums or means."""
+        if statistic not in STATISTICS:
+            raise ValueError("statistic must be one of %s" % (STATISTICS,))
+        if statistic == "count":
+            return self.counts
+        if statistic == "sum":
+            return self.sums
+        return self.means
+
+    def to_frame(self, dropempty=True):
+        """One row per cell, with its boundaries and aggregates.
+
+        The columns `x`, `x2`, `y` and `y2` are the boundaries of the cell,
+        so they can be encoded directly in an Altair `mark_rect`.
+        """
+        x_index, y_index = np.indices(self.counts.shape)
+        frame = pd.DataFrame({
+            "x": self.x_edges[:-1][x_index.ravel()],
+            "x2": self.x_edges[1:][x_index.ravel()],
+            "y": self.y_edges[:-1][y_index.ravel()],
+            "y2": self.y_edges[1:][y_index.ravel()],
+            "count": self.counts.ravel(),
+        })
+        if self.sums is not None:
+            frame["mean"] = self.means.ravel()
+        if dropempty:
+            frame = frame[frame["count"] > 0].reset_index(drop=True)
+        return frame
+
+
+def binned_scatter(x, y, c=None, bins="auto", range=None, ax=None,
+                   cmap=None, log=True, colorbar=True, **kwargs):
+    """Draw a dense scatter plot as a grid of cells with matplotlib.
+
+    Without `c`, each cell is colored by the number of points in it (on a
+    log scale if `log`). With `c`, each cell is colored by the mean of `c`,
+    like `plot.scatter(x, y, c=...)`.
+
+    Parameters
+    ----------
+    x, y : array-like
+        Coordinates of the points.
+    c : array-like, optional
+        Variable to average in each cell.
+    bins, range
+        As in `Grid`.
+    ax : Axes, optional
+        Axes to draw on. Defaults to the current axes.
+    cmap : str, optional
+        Colormap, e.g. "plasma".
+    log : bool
+        Use a logarithmic color scale for counts.
+    colorbar : bool
+        Add a colorbar.
+    **kwargs
+        Passed to `Axes.pcolormesh`.
+
+    Returns
+    -------
+    Axes
+
+    Examples
+    --------
+    >>> binned_scatter(housing["Gr Liv Area"], housing["Bedroom AbvGr"],
+    ...                c=housing["SalePrice"], cmap="plasma")
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    grid = Grid(x, y, values=c, bins=bins, range=range)
+    if ax is None:
+        ax = plt.gca()
+    if c is None:
+        image = np.where(grid.counts > 0, grid.counts, np.nan)
+        if log and grid.counts.max() > 0:
+            kwargs.setdefault("norm", LogNorm())
+    else:
+        image = grid.means
+    mesh = ax.pcolormesh(grid.x_edges, grid.y_edges, image.T, cmap=cmap,
+                         **kwargs)
+    if colorbar:
+        label = "count" if c is None else getattr(c, "name", None)
+        ax.figure.colorbar(mesh, ax=ax, label=label)
+    ax.set_xlabel(getattr(x, "name", None))
+    ax.set_ylabel(getattr(y, "name", None))
+    return ax
+
+
+def binned_chart(df, x, y, color=None, bins="auto", range=None):
+    """Altair heatmap of a dense scatter plot, with one rect per cell.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Table of observations.
+    x, y : str
+        Columns for the horizontal and vertical axes.
+    color : str, optional
+        Column averaged in each cell and mapped to color. Defaults to the
+        number of points in each cell.
+    bins, range
+        As in `Grid`.
+
+    Returns
+    -------
+    alt.Chart
+    """
+    import altair as alt
+
+    grid = Grid(df[x], df[y], values=None if color is None else df[color],
+                bins=bins, range=range)
+    cells = grid.to_frame()
+    # the mean keeps its own column, which `color` may have the name of
+    statistic = "count" if color is None else "mean"
+    tooltip = [alt.Tooltip("count:Q")]
+    if color is not None:
+        tooltip.append(alt.Tooltip("mean:Q", title=color))
+    return alt.Chart(cells).mark_rect().encode(
+        x=alt.X("x:Q", title=x), x2="x2:Q",
+        y=alt.Y("y:Q", title=y), y2="y2:Q",
+        color=alt.Color("%s:Q" % statistic, title=color or statistic),
+        tooltip=tooltip,
+    )
@@ -0,0 +1,186 @@
+"""
+Binary variables packed into bits, and distances between them.
+
+Dummy variables (section 4.2), genre indicators from `MultiLabelBinarizer`
+(lab 7B) and indicator columns (section 1.4) only take the values 0 and 1,
+yet they are usually stored as one float64, or at best one byte, per value.
+A `BitMatrix` packs each row into 64-bit words, 64 variables per word, which
+is 64 times smaller than float64. The number of variables two rows have in
+common is then the number of bits set in the AND of their words (a
+"popcount"), and the Hamming, Jaccard and Dice distances all follow from
+that count and the number of bits set in each row.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ._labels import index_and_name
+from .distances import MEMORY, _tiled_apply, tile_shape
+
+METRICS = ("hamming", "jaccard", "dice")
+
+# number of bits set in each byte, for NumPy versions without bitwise_count
+_BYTE_COUNTS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis],
+                             axis=1).sum(axis=1).astype(np.uint8)
+
+
+def popcount(words):
+    """Number of bits set in each 64-bit word."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    counts = _BYTE_COUNTS[words.view(np.uint8)]
+    return counts.reshape(*words.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+class BitMatrix:
+    """Rows of binary variables, packed 64 to a word.
+
+    Parameters
+    ----------
+    X : DataFrame or array-like, shape (n, p)
+        Binary data. Nonzero values count as 1, zero and missing values as 0.
+
+    Attributes
+    ----------
+    words : ndarray of uint64, shape (n, ceil(p / 64))
+        The packed rows. Bit j of a row is variable j.
+    counts : ndarray, shape (n,)
+        Number of variables equal to 1 in each row.
+
+    Examples
+    --------
+    >>> bits = BitMatrix(genres)
+    >>> bits.nbytes, genres.memory_usage().sum()
+    >>> D = binary_distance_matrix(bits, metric="jaccard")
+    """
+
+    def __init__(self, X):
+        self.index, _ = index_and_name(X)
+        self.columns = None
+        if isinstance(X, pd.DataFrame):
+            self.columns = X.columns
+            X = X.fillna(0).to_numpy()
+        values = np.asarray(X) != 0
+        if values.ndim != 2:
+            raise ValueError("X must be 2-D")
+        self.n_features = values.shape[1]
+        packed = np.packbits(values, axis=1, bitorder="little")
+        # pad each row to a whole number of 64-bit words
+        width = -(-packed.shape[1] // 8) * 8
+        padded = np.zeros((len(packed), width), dtype=np.uint8)
+        padded[:, :packed.shape[1]] = packed
+        self.words = padded.view("<u8").astype(np.uint64, copy=False)
+        self.counts = popcount(self.words).sum(axis=1, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.words)
+
+    @property
+    def nbytes(self):
+        """Memory used by the packed rows."""
+        return self.words.nbytes
+
+    def to_numpy(self):
+        """The unpacked rows, as booleans."""
+        unpacked = np.unpackbits(self.words.astype("<u8").view(np.uint8),
+                                 axis=1, count=self.n_features,
+                                 bitorder="little")
+        return unpacked.astype(bool)
+
+    def to_frame(self):
+        """The unpacked rows, as a `DataFrame` of booleans."""
+        return pd.DataFrame(self.to_numpy(), index=self.index,
+                            columns=self.columns)
+
+
+def _as_bits(X):
+    return X if isinstance(X, BitMatrix) else BitMatrix(X)
+
+
+def _tile(metric, x_words, y_words, x_counts, y_counts, n_features, out):
+    """Distances between two blocks of packed rows, written into `out`."""
+    # number of variables equal to 1 in both rows
+    common = popcount(x_words[:, 0, np.newaxis] & y_words[np.newaxis, :, 0])
+    if x_words.shape[1] > 1:
+        common = common.astype(np.int32)
+        for w in range(1, x_words.shape[1]):
+            common += popcount(x_words[:, w, np.newaxis]
+                               & y_words[np.newaxis, :, w])
+    # number of 1s in the two rows, and the number of variables that differ
+    total = np.add.outer(x_counts, y_counts, dtype=np.float64)
+    np.subtract(total, 2.0 * common, out=out)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if metric == "hamming":
+            out /= max(n_features, 1)
+        elif metric == "jaccard":
+            total -= common
+            out /= total
+        else:
+            out /= total
+    # two rows of zeros are identical
+    out[np.isnan(out)] = 0
+    return out
+
+
+def binary_distance_tiles(X, Y=None, metric="jaccard", memory=MEMORY):
+    """Compute distances between binary rows one tile at a time.
+
+    Parameters
+    ----------
+    X : BitMatrix, DataFrame or array-like, shape (n, p)
+        Binary observations.
+    Y : BitMatrix, DataFrame or array-like, shape (m, p), optional
+        Second set of observations. Defaults to `X`.
+    metric : {"hamming", "jaccard", "dice"}
+        "hamming" is the fraction of variables that differ. "jaccard" is
+        the fraction of the variables equal to 1 in either row that differ,
+        and "dice" is the number that differ over the total number of 1s
+        in the two rows. All are 0 between two rows of zeros.
+    memory : int
+        Size of one tile, in bytes.
+
+    Yields
+    ------
+    rows, columns : slice
+        Position of the tile in the full matrix.
+    distances : ndarray
+        The tile. It is overwritten by the next tile.
+    """
+    if metric not in METRICS:
+        raise ValueError("metric must be one of %s" % (METRICS,))
+    X = _as_bits(X)
+    Y = X if Y is None else _as_bits(Y)
+    if X.n_features != Y.n_features:
+        raise ValueError("X and Y must have the same number of variables")
+    n, m = len(X), len(Y)
+
+    def compute(rows, columns, out):
+        _tile(metric, X.words[rows], Y.words[columns], X.counts[rows],
+              Y.counts[columns], X.n_features, out)
+
+    # the tile, the counts in common and their temporaries
+    yield from _tiled_apply(n, m, compute,
+                            tile_shape(n, m, np.float64, memory // 4))
+
+
+def binary_distance_matrix(X, Y=None, metric="jaccard", memory=MEMORY,
+                           out=None):
+    """Matrix of distances between binary observations.
+
+    The same as `sklearn.metrics.pairwise_distances(X, Y, metric)` on
+    boolean data, computed from the packed bits. See
+    `binary_distance_tiles` for the parameters; `out` is an optional array
+    of shape (n, m) to write the distances into.
+
+    Examples
+    --------
+    >>> D = binary_distance_matrix(genres, metric="jaccard")
+    """
+    X = _as_bits(X)
+    Y = X if Y is None else _as_bits(Y)
+    if out is None:
+        out = np.empty((len(X), len(Y)))
+    for rows, columns, distances in binary_distance_tiles(X, Y, metric,
+                                                          memory):
+        out[rows, columns] = distances
+    return out
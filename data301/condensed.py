@@ -0,0 +1,220 @@
+"""
+Distance matrices that store only the upper triangle.
+
+Section 4.3 wraps the result of `pairwise_distances` in a labeled
+`DataFrame`:
+
+    D = pd.DataFrame(D_, index=reds.index, columns=reds.index)
+
+That stores every distance twice, plus a diagonal of zeros, all in memory:
+80 GB for 100,000 observations. A `CondensedDistances` keeps only the
+`n (n - 1) / 2` distances above the diagonal, in the row-major order used
+by `scipy.spatial.distance.squareform`, optionally as float32 and in a
+memory-mapped file. It is filled one tile at a time (see `distances`), and
+it answers the questions of the exercises (each row, and the nearest other
+observation to each one) without ever building the square matrix.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ._labels import index_and_name
+from .distances import MEMORY, distance_tiles
+
+
+class CondensedDistances:
+    """Symmetric distance matrix with a zero diagonal, stored condensed.
+
+    Parameters
+    ----------
+    n : int
+        Number of observations.
+    labels : array-like, optional
+        Label of each observation, e.g. the index of the data.
+    dtype : {np.float64, np.float32}
+        Precision of the stored distances.
+    path : str, optional
+        File to store the distances in, as a `np.memmap`. By default they
+        are kept in memory.
+
+    Examples
+    --------
+    >>> D = CondensedDistances.from_data(reds, path="reds.dist")
+    >>> D.row("0_wine")
+    >>> D.min()       # distance to the most similar wine
+    >>> D.idxmin()    # the most similar wine
+    """
+
+    def __init__(self, n, labels=None, dtype=np.float64, path=None):
+        self.n = int(n)
+        self.labels = pd.RangeIndex(n) if labels is None else pd.Index(labels)
+        if len(self.labels) != self.n:
+            raise ValueError("expected %d labels, got %d"
+                             % (self.n, len(self.labels)))
+        size = self.n * (self.n - 1) // 2
+        if path is None:
+            self.values = np.zeros(size, dtype=dtype)
+        else:
+            self.values = np.memmap(path, dtype=dtype, mode="w+",
+                                    shape=(max(size, 1),))[:size]
+        self._nearest = None
+
+    @classmethod
+    def from_data(cls, X, metric="euclidean", dtype=np.float64, path=None,
+                  memory=MEMORY):
+        """Distances between the rows of `X`, computed tile by tile.
+
+        The labels are the index of `X` if it is a `DataFrame`. See
+        `distances.distance_tiles` for `metric` and `memory`.
+        """
+        labels, _ = index_and_name(X)
+        distances = cls(len(X), labels, dtype, path)
+        distances.fill(X, metric, memory)
+        return distances
+
+    @classmethod
+    def from_values(cls, values, labels=None):
+        """Wrap an existing condensed array without copying it, such as the
+        result of `scipy.spatial.distance.pdist` or a shared buffer."""
+        n = int(round((1 + np.sqrt(1 + 8 * len(values))) / 2))
+        if n * (n - 1) // 2 != len(values):
+            raise ValueError("%d is not the length of a condensed matrix"
+                             % len(values))
+        distances = cls.__new__(cls)
+        distances.n = n
+        distances.labels = pd.RangeIndex(n) if labels is None \
+            else pd.Index(labels)
+        distances.values = values
+        distances._nearest = None
+        return distances
+
+    @classmethod
+    def open(cls, path, n, labels=None, dtype=np.float64, mode="r+"):
+        """Map a file written by an earlier `CondensedDistances`."""
+        size = n * (n - 1) // 2
+        values = np.memmap(path, dtype=dtype, mode=mode,
+                           shape=(max(size, 1),))[:size]
+        return cls.from_values(values, labels)
+
+    def _offsets(self, rows):
+        """Position in `values` of the entry (i, i + 1) of each row i."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return rows * (2 * self.n - rows - 1) // 2
+
+    def fill(self, X, metric="euclidean", memory=MEMORY, rows=None,
+             prepared=None):
+        """Compute the distances between the rows of `X` into this matrix.
+
+        With `rows` (a slice), only the stored part of those rows is
+        computed, so that separate processes can fill disjoint parts, and
+        `prepared` is passed to `distance_tiles` so that they do not each
+        prepare `X` again.
+        """
+        if len(X) != self.n:
+            raise ValueError("expected %d observations, got %d"
+                             % (self.n, len(X)))
+        for rows, columns, tile in distance_tiles(
+                X, metric=metric, dtype=self.values.dtype, memory=memory,
+                upper=True, rows=rows, prepared=prepared):
+            # the part of each row right of the diagonal is contiguous, both
+            # in the tile and in the condensed storage
+            offsets = self._offsets(np.arange(rows.start, rows.stop))
+            for r, i in enumerate(range(rows.start, rows.stop)):
+                first = max(columns.start, i + 1)
+                if first < columns.stop:
+                    start = offsets[r] + first - i - 1
+                    self.values[start:start + columns.stop - first] = \
+                        tile[r, first - columns.start:]
+        if isinstance(self.values, np.memmap):
+            self.values.flush()
+        self._nearest = None
+        return self
+
+    def _position(self, key):
+        return self.labels.get_loc(key)
+
+    def row_values(self, i):
+        """Distances from the observation at position `i` to every one."""
+        result = np.zeros(self.n, dtype=self.values.dtype)
+        # entries (j, i) for j < i lie in the rows above, one per row
+        above = np.arange(i)
+        result[:i] = self.values[self._offsets(above) + (i - above - 1)]
+        start = self._offsets(i)
+        result[i + 1:] = self.values[start:start + self.n - i - 1]
+        return result
+
+    def row(self, key):
+        """Distances from the observation labeled `key`, as a Series."""
+        return pd.Series(self.row_values(self._position(key)),
+                         index=self.labels, name=key)
+
+    def distance(self, a, b):
+        """Distance between the observations labeled `a` and `b`."""
+        i, j = sorted((self._position(a), self._position(b)))
+        if i == j:
+            return self.values.dtype.type(0)
+        return self.values[self._offsets(i) + (j - i - 1)]
+
+    def __getitem__(self, key):
+        """`D[a, b]` is the distance between labels `a` and `b`; `D[a]` is
+        the row of `a`."""
+        if isinstance(key, tuple):
+            return self.distance(*key)
+        return self.row(key)
+
+    def __len__(self):
+        return self.n
+
+    def _compute_nearest(self):
+        """Smallest distance to another observation, and its position.
+
+        One sequential pass over the stored rows: the stored part of row i
+        holds the distances (i, j) for j > i, which are also the entries
+        (j, i) of the later rows.
+        """
+        best = np.full(self.n, np.inf)
+        where = np.full(self.n, -1, dtype=np.int64)
+        for i in range(self.n - 1):
+            start = self._offsets(i)
+            segment = self.values[start:start + self.n - i - 1]
+            # j > i; the earlier rows already gave the j < i, which win ties
+            j = int(np.argmin(segment))
+            if segment[j] < best[i]:
+                best[i], where[i] = segment[j], i + 1 + j
+            later = best[i + 1:]
+            closer = segment < later
+            later[closer] = segment[closer]
+            where[i + 1:][closer] = i
+        if self.n == 1:
+            best[:] = np.nan
+        self._nearest = best, where
+        return self._nearest
+
+    def min(self):
+        """Distance from each observation to the nearest other one.
+
+        Like `D.min()` after setting the diagonal of the square matrix to
+        NaN, as in the exercises of section 4.3.
+        """
+        best, _ = self._nearest or self._compute_nearest()
+        return pd.Series(best, index=self.labels)
+
+    def idxmin(self):
+        """Label of the nearest other observation to each observation."""
+        _, where = self._nearest or self._compute_nearest()
+        nearest = self.labels.take(np.maximum(where, 0))
+        result = pd.Series(nearest, index=self.labels)
+        return result.where(where >= 0)
+
+    def to_numpy(self):
+        """The square matrix (which needs `n * n` entries of memory)."""
+        matrix = np.zeros((self.n, self.n), dtype=self.values.dtype)
+        i, j = np.triu_indices(self.n, 1)
+        matrix[i, j] = self.values
+        matrix[j, i] = self.values
+        return matrix
+
+    def to_frame(self):
+        """The square matrix as a `DataFrame` labeled on both axes."""
+        return pd.DataFrame(self.to_numpy(), index=self.labels,
+                            columns=self.labels)
@@ -0,0 +1,164 @@
+"""
+Contingency tables with cached joint, marginal and conditional distributions.
+
+Chapter 3 builds `pd.crosstab(x, y)` and then recomputes sums such as
+`counts.sum().sum()` and `counts.sum(axis=1)` for every distribution it
+derives. A `ContingencyTable` counts the pairs once, with a single
+`np.bincount` over integer codes, and computes each distribution the first
+time it is asked for.
+"""
+
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+def factorize(values, dropna=True):
+    """Integer codes and sorted labels for a categorical variable.
+
+    Missing values get the code -1 if `dropna` is True, and are otherwise
+    kept as a category of their own, labeled NaN.
+    """
+    codes, labels = pd.factorize(values, sort=True, use_na_sentinel=dropna)
+    return codes, pd.Index(labels, name=getattr(values, "name", None))
+
+
+def _occurs(codes, n_categories):
+    """Whether each category has a code in `codes`."""
+    return np.bincount(codes[codes >= 0], minlength=n_categories) > 0
+
+
+class ContingencyTable:
+    """Counts of two categorical variables, and the distributions they imply.
+
+    Parameters
+    ----------
+    index : Series
+        Variable whose categories label the rows.
+    columns : Series
+        Variable whose categories label the columns.
+    dropna : bool
+        Drop observations where either variable is missing, like
+        `pd.crosstab`.
+
+    Examples
+    --------
+    >>> table = ContingencyTable(titanic_df.embarked, titanic_df.pclass)
+    >>> table.counts          # same as pd.crosstab(embarked, pclass)
+    >>> table.joint           # counts / counts.sum().sum()
+    >>> table.row_given_column  # P(embarked | pclass); columns sum to 1
+    """
+
+    def __init__(self, index, columns, dropna=True):
+        row_codes, row_labels = factorize(index, dropna)
+        column_codes, column_labels = factorize(columns, dropna)
+        self._init_from_codes(row_codes, column_codes,
+                              row_labels, column_labels)
+
+    @classmethod
+    def from_codes(cls, row_codes, column_codes, row_labels, column_labels):
+        """Build a table from integer codes that were factorized already.
+
+        Codes of -1 mark missing values, and those observations are dropped,
+        along with the categories that were only seen in them. Use this
+        to tabulate many pairs of variables while factorizing each variable
+        only once.
+        """
+        table = cls.__new__(cls)
+        table._init_from_codes(np.asarray(row_codes),
+                               np.asarray(column_codes),
+                               pd.Index(row_labels), pd.Index(column_labels))
+        return table
+
+    def _init_from_codes(self, row_codes, column_codes,
+                         row_labels, column_labels):
+        n_rows, n_columns = len(row_labels), len(column_labels)
+        keep = (row_codes >= 0) & (column_codes >= 0)
+        emptied = None
+        if not keep.all():
+            # categories that occur only next to a missing value of the
+            # other variable; pd.crosstab leaves them out
+            emptied = (_occurs(row_codes, n_rows),
+                       _occurs(column_codes, n_columns))
+            row_codes, column_codes = row_codes[keep], column_codes[keep]
+        cells = row_codes.astype(np.int64) * n_columns + column_codes
+        counts = np.bincount(
+            cells, minlength=n_rows * n_columns
+        ).reshape(n_rows, n_columns)
+        if emptied is not None:
+            rows = ~emptied[0] | counts.any(axis=1)
+            columns = ~emptied[1] | counts.any(axis=0)
+            counts = counts[rows][:, columns]
+            row_labels = row_labels[rows]
+            column_labels = column_labels[columns]
+        self._counts = counts
+        self.row_labels = row_labels
+        self.column_labels = column_labels
+
+    def _frame(self, values):
+        return pd.DataFrame(values, index=self.row_labels,
+                            columns=self.column_labels)
+
+    @cached_property
+    def total(self):
+        """Number of observations in the table."""
+        return int(self._counts.sum())
+
+    @cached_property
+    def counts(self):
+        """Table of counts, as returned by `pd.crosstab`."""
+        return self._frame(self._counts)
+
+    @cached_property
+    def joint(self):
+        """Joint distribution: the counts divided by the total."""
+        return self._frame(self._counts / self.total)
+
+    @cached_property
+    def row_marginal(self):
+        """Marginal distribution of the row variable."""
+        return pd.Series(self._counts.sum(axis=1) / self.total,
+                         index=self.row_labels)
+
+    @cached_property
+    def column_marginal(self):
+        """Marginal distribution of the column variable."""
+        return pd.Series(self._counts.sum(axis=0) / self.total,
+                         index=self.column_labels)
+
+    @cached_property
+    def row_given_column(self):
+        """Conditional distributions of the row variable given each column.
+
+        Each column sums to 1.
+        """
+        column_counts = self._counts.sum(axis=0, keepdims=True)
+        return self._frame(self._counts / column_counts)
+
+    @cached_property
+    def column_given_row(self):
+        """Conditional distributions of the column variable given each row.
+
+        Each row sums to 1.
+        """
+        row_counts = self._counts.sum(axis=1, keepdims=True)
+        return self._frame(self._counts / row_counts)
+
+    @cached_property
+    def expected(self):
+        """Joint distribution expected if the two variables were independent.
+
+        This is the outer product of the two marginal distributions.
+        """
+        return self._frame(np.outer(self.row_marginal.to_numpy(),
+                                    self.column_marginal.to_numpy()))
+
+    @cached_property
+    def expected_counts(self):
+        """Counts expected if the two variables were independent."""
+        return self.expected * self.total
+
+    def __repr__(self):
+        return "<ContingencyTable %s x %s, %d observations>" % (
+            self.row_labels.name, self.column_labels.name, self.total)
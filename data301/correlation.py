@@ -0,0 +1,124 @@
+"""
+Correlation matrices of wide tables with missing values.
+
+Section 3.3 correlates `Gr Liv Area` with every other column, and section
+3.4 calls `.corr()` on the whole table. Once there are missing values,
+pandas falls back to a loop over pairs of columns. Here the pairwise-complete
+correlations of all pairs come out of a few matrix products over the
+zero-filled values and the mask of present values (see `moments`), computed
+over blocks of rows so that the working memory stays bounded.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .moments import CovarianceAccumulator
+
+METHODS = ("pearson", "spearman")
+
+
+def _numeric(df, columns):
+    if columns is None:
+        return df.select_dtypes("number")
+    return df[list(columns)]
+
+
+def _accumulate(df, columns, method, chunksize):
+    if method not in METHODS:
+        raise ValueError("method must be one of %s" % (METHODS,))
+    data = _numeric(df, columns)
+    if method == "spearman":
+        data = data.rank()
+    # nullable columns (Int64, Float64, boolean) mark missing values with
+    # pd.NA, which does not convert to float
+    values = data.to_numpy(dtype=float, na_value=np.nan)
+    accumulator = CovarianceAccumulator(data.columns)
+    for start in range(0, len(values), chunksize):
+        accumulator.update(values[start:start + chunksize])
+    return accumulator
+
+
+def corr_matrix(df, columns=None, method="pearson", min_periods=1,
+                chunksize=100_000):
+    """Pairwise-complete correlation matrix.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Table of observations.
+    columns : list of str, optional
+        Columns to correlate. Defaults to the numeric columns of `df`.
+    method : {"pearson", "spearman"}
+        Pearson correlation of the values, or of their ranks.
+    min_periods : int
+        Minimum number of rows where both columns are present; pairs with
+        fewer are NaN.
+    chunksize : int
+        Number of rows multiplied at a time.
+
+    Returns
+    -------
+    DataFrame
+        The same matrix as `df[columns].corr(method, min_periods)` for
+        Pearson correlations. For Spearman correlations, each column is
+        ranked once over all of its present values rather than once per
+        pair, so pairs with different missing rows can differ slightly
+        from pandas; without missing values the results are the same.
+    """
+    return _accumulate(df, columns, method, chunksize).corr(min_periods)
+
+
+def top_correlations(df, k=10, columns=None, method="pearson",
+                     absolute=True, min_periods=1, target=None,
+                     chunksize=100_000):
+    """The `k` most correlated pairs of columns.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Table of observations.
+    k : int
+        Number of pairs to return.
+    columns, method, min_periods, chunksize
+        As in `corr_matrix`.
+    absolute : bool
+        Rank pairs by the absolute value of their correlation, so that
+        strong negative correlations count too.
+    target : str, optional
+        Only consider pairs involving this column, e.g. `"SalePrice"`.
+
+    Returns
+    -------
+    DataFrame
+        Columns `variable_1`, `variable_2`, `corr` and `n` (the number of
+        rows used), sorted from the most to the least correlated pair.
+
+    Examples
+    --------
+    >>> top_correlations(housing_df, k=5, target="Gr Liv Area")
+    """
+    accumulator = _accumulate(df, columns, method, chunksize)
+    corr = accumulator.corr(min_periods)
+    names = corr.columns
+    values = corr.to_numpy()
+    counts = accumulator.count().to_numpy()
+    if target is None:
+        rows, cols = np.triu_indices(len(names), k=1)
+    else:
+        cols = np.flatnonzero(names != target)
+        rows = np.full(len(cols), names.get_loc(target))
+    scores = values[rows, cols]
+    if absolute:
+        scores = np.abs(scores)
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+
+    k = min(k, len(scores))
+    best = np.argpartition(-scores, k - 1)[:k] if k else np.array([], int)
+    best = best[np.argsort(-scores[best], kind="stable")]
+    rows, cols = rows[best], cols[best]
+    return pd.DataFrame({
+        "variable_1": names[rows],
+        "variable_2": names[cols],
+        "corr": values[rows, cols],
+        "n": counts[rows, cols],
+    })
@@ -0,0 +1,253 @@
+"""
+Histograms and kernel density estimates of large columns from binned data.
+
+Section 1.3 calls `df.fare.plot.hist(bins=50)` and `df.fare.plot.density()`
+on the raw column. The density estimate evaluates a Gaussian kernel for
+every pair of (observation, grid point), which takes time proportional to
+n times the size of the grid. Here a column is binned once onto a fine
+regular grid. The density is the convolution of the binned data with the
+kernel, computed by FFT. Histograms with any number of bins are merged from
+the same fine bins, so the histogram and the density drawn on top of it
+share one pass over the data.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ._labels import index_and_name
+
+
+def _scott_bandwidth(n_eff, std):
+    """Scott's rule, as used by `scipy.stats.gaussian_kde` and pandas."""
+    return std * n_eff ** (-1 / 5)
+
+
+def _group_moments(values, weights, codes, n_groups):
+    """Total weight, effective sample size and std of each group.
+
+    The variance is the unbiased weighted variance used by
+    `scipy.stats.gaussian_kde`. The sums are taken around the overall mean
+    to limit cancellation.
+    """
+    def total(x):
+        return np.bincount(codes, x, minlength=n_groups)
+
+    centered = values - np.average(values, weights=weights)
+    weight = total(weights)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total(weights * centered) / weight
+        var = total(weights * centered ** 2) / weight - mean ** 2
+        n_eff = weight ** 2 / total(weights ** 2)
+        var = np.where(n_eff > 1, var * n_eff / (n_eff - 1), np.nan)
+    return weight, n_eff, np.sqrt(np.maximum(var, 0))
+
+
+class BinnedColumn:
+    """A numeric column binned once for histograms and density estimates.
+
+    Parameters
+    ----------
+    values : Series or array-like
+        The column. Missing values are dropped.
+    weights : array-like, optional
+        Weight of each observation.
+    groups : Series or array-like, optional
+        Group of each observation. Each group gets its own histogram and
+        density (with its own bandwidth), all on a common grid.
+    grid_size : int
+        Number of fine bins between the smallest and the largest value.
+        Histograms whose number of bins divides it (the default 1200 is
+        divisible by 10, 20, 25, 30, 40, 50, 60, 75, 100, ...) are exact.
+    bandwidth : "scott" or float
+        Standard deviation of the Gaussian kernel. Defaults to Scott's rule,
+        like `plot.density()`. Groups whose values do not vary get the width
+        of one fine bin instead.
+    cut : float
+        The grid extends this many bandwidths beyond the data, so that the
+        tails of the density are included.
+
+    Examples
+    --------
+    >>> fares = BinnedColumn(df.fare)
+    >>> ax = fares.plot(bins=50)          # histogram with the density on top
+    >>> BinnedColumn(df.age, groups=df.sex).density()
+    """
+
+    def __init__(self, values, weights=None, groups=None, grid_size=1200,
+                 bandwidth="scott", cut=3):
+        _, self.name = index_and_name(values)
+        values = np.asarray(values, dtype=float)
+        weights = (np.ones_like(values) if weights is None
+                   else np.asarray(weights, dtype=float))
+        if groups is None:
+            codes = np.zeros(len(values), dtype=np.int64)
+            self.labels = None
+        else:
+            _, name = index_and_name(groups)
+            if not isinstance(groups, pd.Series):
+                groups = np.asarray(groups)
+            codes, labels = pd.factorize(groups, sort=True)
+            self.labels = pd.Index(labels, name=name)
+        keep = ~np.isnan(values) & ~np.isnan(weights) & (codes >= 0)
+        values, weights, codes = values[keep], weights[keep], codes[keep]
+        if len(values) == 0:
+            raise ValueError("no non-missing values to bin")
+        n_groups = 1 if self.labels is None else len(self.labels)
+
+        self.totals, n_eff, std = _group_moments(values, weights, codes,
+                                                 n_groups)
+        if bandwidth == "scott":
+            self.bandwidths = _scott_bandwidth(n_eff, std)
+        else:
+            self.bandwidths = np.full(n_groups, float(bandwidth))
+
+        low, high = values.min(), values.max()
+        if low == high:
+            low, high = low - .5, high + .5
+        self.step = (high - low) / grid_size
+        # Scott's rule fails for a group without spread (one observation,
+        # or all values equal); its density becomes a peak one fine bin wide
+        self.bandwidths[~(self.bandwidths > 0)] = self.step
+        widest = np.nanmax(self.bandwidths)
+        if not np.isfinite(widest) or widest <= 0:
+            widest = self.step
+        pad = int(np.ceil(cut * widest / self.step))
+        self.low = low
+        self.high = high
+        # fine bin edges, and the points where the density is evaluated
+        self.edges = low + self.step * np.arange(-pad, grid_size + pad + 1)
+
+        n_edges = len(self.edges)
+        position = (values - self.edges[0]) / self.step
+        cell = np.clip(position.astype(np.int64), 0, n_edges - 2)
+        fraction = position - cell
+        offset = codes * n_edges
+        # Simple binning (the whole weight in the cell) for histograms. The
+        # largest value belongs to the last bin inside the data range.
+        last = pad + grid_size - 1
+        self.counts = np.bincount(
+            offset + np.minimum(cell, last), weights,
+            minlength=n_groups * n_edges
+        ).reshape(n_groups, n_edges)[:, :-1]
+        # Linear binning (the weight split between the two nearest grid
+        # points) for density estimates, which is much more accurate.
+        self.masses = (
+            np.bincount(offset + cell, weights * (1 - fraction),
+                        minlength=n_groups * n_edges)
+            + np.bincount(offset + cell + 1, weights * fraction,
+                          minlength=n_groups * n_edges)
+        ).reshape(n_groups, n_edges)
+
+    def _result(self, values, index):
+        if self.labels is None:
+            return pd.Series(values[0], index=index, name=self.name)
+        return pd.DataFrame(values.T, index=index, columns=self.labels)
+
+    def density(self):
+        """Gaussian kernel density estimate on the grid.
+
+        Returns
+        -------
+        Series, or DataFrame with one column per group
+            Density at each grid point, indexed by the grid points. Each
+            density integrates to 1.
+        """
+        n_groups, n_points = self.masses.shape
+        reach = self.bandwidths / self.step * 5
+        half_width = int(min(np.ceil(np.nanmax(reach)), n_points - 1)) \
+            if np.isfinite(np.nanmax(reach)) else 0
+        offsets = np.arange(-half_width, half_width + 1) * self.step
+        with np.errstate(invalid="ignore", divide="ignore"):
+            kernels = (np.exp(-.5 * (offsets / self.bandwidths[:, None]) ** 2)
+                       / (self.bandwidths[:, None] * np.sqrt(2 * np.pi)))
+            kernels[~np.isfinite(kernels)] = 0
+
+        # linear convolution of each group's masses with its own kernel
+        size = n_points + 2 * half_width
+        n_fft = 1 << int(np.ceil(np.log2(size)))
+        spectrum = (np.fft.rfft(self.masses, n_fft, axis=1)
+                    * np.fft.rfft(kernels, n_fft, axis=1))
+        smoothed = np.fft.irfft(spectrum, n_fft, axis=1)
+        smoothed = smoothed[:, half_width:half_width + n_points]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            smoothed = np.maximum(smoothed, 0) / self.totals[:, None]
+        return self._result(smoothed, pd.Index(self.edges, name=self.name))
+
+    def hist(self, bins=10, density=False):
+        """Histogram over the range of the data.
+
+        Parameters
+        ----------
+        bins : int
+            Number of equal-width bins between the smallest and the largest
+            value, as in `plot.hist(bins=...)`.
+        density : bool
+            Divide by the total weight and the bin width, so that the
+            histogram integrates to 1 and can be drawn with `density()`.
+
+        Returns
+        -------
+        (counts, edges)
+            `counts` is an array (or a DataFrame with one column per group,
+            indexed by bin) and `edges` the `bins + 1` bin boundaries. Where
+            a boundary falls inside a fine bin, its count is split in
+            proportion to the overlap.
+        """
+        edges = np.linspace(self.low, self.high, bins + 1)
+        cumulative = np.concatenate(
+            [np.zeros((len(self.counts), 1)), np.cumsum(self.counts, axis=1)],
+            axis=1)
+        # the cumulative counts are interpolated linearly inside fine bins
+        position = (edges - self.edges[0]) / self.step
+        left = np.clip(np.floor(position).astype(int), 0,
+                       cumulative.shape[1] - 2)
+        fraction = position - left
+        at_edges = (cumulative[:, left] * (1 - fraction)
+                    + cumulative[:, left + 1] * fraction)
+        counts = np.diff(at_edges, axis=1)
+        if density:
+            counts = counts / (self.totals[:, None] * np.diff(edges))
+        if self.labels is None:
+            return counts[0], edges
+        return pd.DataFrame(counts.T, columns=self.labels), edges
+
+    def plot(self, bins=None, ax=None, **kwargs):
+        """Draw the density, over a histogram if `bins` is given.
+
+        Parameters
+        ----------
+        bins : int, optional
+            Number of histogram bins. The histogram is scaled to a density
+            so that both share the vertical axis.
+        ax : Axes, optional
+            Axes to draw on. Defaults to the current axes.
+        **kwargs
+            Passed to `Axes.plot` for the density curves.
+
+        Returns
+        -------
+        Axes
+        """
+        import matplotlib.pyplot as plt
+
+        if ax is None:
+            ax = plt.gca()
+        if bins is not None:
+            counts, edges = self.hist(bins, density=True)
+            columns = ([(self.name, counts)] if self.labels is None
+                       else counts.items())
+            for label, values in columns:
+                ax.stairs(np.asarray(values), edges, fill=True, alpha=.4,
+                          label=None if self.labels is None else
+                          "%s (histogram)" % label)
+        densities = self.density()
+        if self.labels is None:
+            ax.plot(densities.index, densities.to_numpy(), **kwargs)
+        else:
+            for label, values in densities.items():
+                ax.plot(values.index, values.to_numpy(), label=label,
+                        **kwargs)
+            ax.legend()
+        ax.set_xlabel(self.name)
+        ax.set_ylabel("Density")
+        return ax
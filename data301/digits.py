@@ -0,0 +1,292 @@
+"""
+First and last digits of numeric columns, and Benford's law.
+
+The lab on the distribution of first digits turns each number into a string
+and takes `.str[0]`. That is slow, and it gives "0" for 0.07 and the wrong
+answer for numbers printed in scientific notation. Here the digits are
+computed arithmetically on whole arrays: the decimal exponent of each value
+comes from `log10`, the value is scaled to an integer mantissa of 15
+significant digits, and the first and last digits are read off the mantissa
+with integer division and remainders. `digit_counts` does this for every
+numeric column of a table at once and returns one histogram per column,
+which `benford_test` compares with Benford's law.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ._labels import series_like
+
+# significant digits of the mantissa; float64 values round-trip through 15
+_SIGNIFICANT = 15
+_POWERS = 10 ** np.arange(19, dtype=np.int64)
+
+POSITIONS = ("first", "last")
+
+
+def _mantissa(x):
+    """Decimal exponents and 15-digit integer mantissas of float values.
+
+    `abs(x)` is about `mantissa * 10 ** (exponent - 14)`. Zero, missing and
+    infinite values get a mantissa of 0.
+    """
+    x = np.abs(x)
+    valid = np.isfinite(x) & (x > 0)
+    x = np.where(valid, x, 1.0)
+    exponent = np.floor(np.log10(x)).astype(np.int64)
+    with np.errstate(over="ignore"):
+        # dividing by an exact power of ten is more accurate than
+        # multiplying by an inexact one, and vice versa
+        scaled = np.where(exponent >= 0, x / 10.0 ** np.maximum(exponent, 0),
+                          x * 10.0 ** np.maximum(-exponent, 0))
+    tiny = exponent < -300
+    if tiny.any():
+        # subnormal values: scale in two steps to avoid overflowing 10**-e
+        scaled[tiny] = x[tiny] * 1e300 * 10.0 ** (-exponent[tiny] - 300)
+    mantissa = np.rint(scaled * 10.0 ** (_SIGNIFICANT - 1)).astype(np.int64)
+    # log10 (or the rounding) can be off by one near powers of ten
+    high = mantissa >= _POWERS[_SIGNIFICANT]
+    mantissa[high] //= 10
+    exponent[high] += 1
+    low = mantissa < _POWERS[_SIGNIFICANT - 1]
+    mantissa[low] *= 10
+    exponent[low] -= 1
+    mantissa[~valid] = 0
+    return exponent, mantissa
+
+
+def _first_digits(x, ndigits):
+    """First `ndigits` digits of an array of numbers, -1 if there are none."""
+    if x.dtype.kind in "iu":
+        x = np.abs(x.astype(np.int64))
+        valid = x > 0
+        exponent = np.floor(np.log10(np.where(valid, x, 1))).astype(np.int64)
+        # correct the float exponent with exact integer comparisons
+        exponent -= x < _POWERS[exponent]
+        exponent += (exponent < 18) & (x >= _POWERS[np.minimum(exponent + 1,
+                                                               18)])
+        shift = exponent - ndigits + 1
+        digits = np.where(shift >= 0, x // _POWERS[np.maximum(shift, 0)],
+                          x * _POWERS[np.maximum(-shift, 0)])
+        return np.where(valid, digits, -1)
+    _, mantissa = _mantissa(x.astype(float))
+    digits = mantissa // _POWERS[_SIGNIFICANT - ndigits]
+    return np.where(mantissa > 0, digits, -1)
+
+
+def _last_digits(x, decimals):
+    """Last digit of an array of numbers, or -1 if there is none."""
+    if x.dtype.kind in "iu" and not decimals:
+        # the units digit, as in str(x)[-1]
+        return np.abs(x.astype(np.int64)) % 10
+    x = x.astype(float)
+    if decimals is not None:
+        valid = np.isfinite(x)
+        scaled = np.rint(np.abs(np.where(valid, x, 0)) * 10.0 ** decimals)
+        return np.where(valid, np.fmod(scaled, 10), -1).astype(np.int64)
+    _, mantissa = _mantissa(x.ravel())
+    # strip trailing zeros, leaving the last nonzero digit in the units place
+    todo = np.flatnonzero((mantissa > 0) & (mantissa % 10 == 0))
+    while len(todo):
+        mantissa[todo] //= 10
+        todo = todo[mantissa[todo] % 10 == 0]
+    return np.where(mantissa > 0, mantissa % 10, -1).reshape(x.shape)
+
+
+def _digits(x, position, ndigits, decimals):
+    x = np.asarray(x)
+    if x.dtype.kind not in "iuf":
+        x = x.astype(float)
+    if position == "first":
+        return _first_digits(x, ndigits)
+    if position == "last":
+        return _last_digits(x, decimals)
+    raise ValueError("position must be one of %s" % (POSITIONS,))
+
+
+def first_digit(values, ndigits=1):
+    """The leading digit(s) of each number, ignoring its sign.
+
+    The first digits of 52, 30.8 and 0.07 are 5, 3 and 7. Floats are read to
+    15 significant digits, so 0.3 (which is stored as 0.29999999999999999)
+    has first digit 3, as it is printed.
+
+    Parameters
+    ----------
+    values : Series or array-like
+        Numbers.
+    ndigits : int
+        Number of leading digits, e.g. 2 for the first-two-digits test.
+
+    Returns
+    -------
+    Series
+        Integer digits, or -1 for zero, missing and infinite values.
+
+    Examples
+    --------
+    >>> first_digit(df["volume"]).value_counts(normalize=True).sort_index()
+    """
+    return series_like(_digits(values, "first", ndigits, None), values)
+
+
+def last_digit(values, decimals=None):
+    """The last digit of each number, ignoring its sign.
+
+    Parameters
+    ----------
+    values : Series or array-like
+        Numbers.
+    decimals : int, optional
+        Take the digit in this decimal place, e.g. 2 for prices in dollars
+        and cents. By default, integers give their units digit (like
+        `str(x)[-1]`) and floats give their last nonzero digit, to 15
+        significant digits (so 30.8 gives 8 and 1200.0 gives 2).
+
+    Returns
+    -------
+    Series
+        Integer digits, or -1 for missing and infinite values (and zero
+        floats when `decimals` is not given).
+
+    Examples
+    --------
+    >>> last_digit(df["volume"]).value_counts(normalize=True).sort_index()
+    """
+    return series_like(_digits(values, "last", None, decimals), values)
+
+
+def _digit_range(position, ndigits):
+    if position == "first":
+        return 10 ** (ndigits - 1), 10 ** ndigits
+    return 0, 10
+
+
+def digit_counts(df, columns=None, position="first", ndigits=1,
+                 decimals=None, normalize=False):
+    """Histogram of the first (or last) digits of every numeric column.
+
+    The integer columns and the float columns are each processed as one
+    2-D array, and all of the histograms are counted with one `bincount`.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Table of numbers.
+    columns : list, optional
+        Columns to use. Defaults to every numeric column.
+    position : {"first", "last"}
+        Which digit to count.
+    ndigits : int
+        Number of leading digits, when `position="first"`.
+    decimals : int, optional
+        Decimal place of the last digit, see `last_digit`.
+    normalize : bool
+        Return the proportion of each digit instead of its count.
+
+    Returns
+    -------
+    DataFrame
+        One row per digit and one column per variable.
+
+    Examples
+    --------
+    >>> counts = digit_counts(sp500, normalize=True)
+    >>> counts.plot.bar()
+    """
+    if columns is None:
+        columns = df.select_dtypes("number").columns
+    columns = pd.Index(columns)
+    low, high = _digit_range(position, ndigits)
+    size = high - low
+    counts = np.zeros(len(columns) * size, dtype=np.int64)
+    dtypes = df[columns].dtypes
+    kinds = np.array([dtype.kind for dtype in dtypes])
+    # nullable integer columns can hold missing values, so they are read as
+    # floats; their last digit is still the units digit
+    nullable = np.array([not isinstance(dtype, np.dtype) for dtype in dtypes])
+    groups = [(np.isin(kinds, ["i", "u"]) & ~nullable, np.int64, decimals),
+              (np.isin(kinds, ["i", "u"]) & nullable, float, decimals or 0),
+              (~np.isin(kinds, ["i", "u"]), float, decimals)]
+    for mask, dtype, places in groups:
+        selected = np.flatnonzero(mask)
+        if not len(selected):
+            continue
+        block = df.iloc[:, df.columns.get_indexer(columns[selected])]
+        block = block.to_numpy(dtype=dtype) if dtype is np.int64 \
+            else block.to_numpy(dtype=float, na_value=np.nan)
+        digits = _digits(block, position, ndigits, places)
+        # cell of each (column, digit) pair in the flattened histograms
+        cells = digits - low + (selected * size)[np.newaxis, :]
+        cells = cells[digits >= low]
+        counts += np.bincount(cells, minlength=len(counts))
+    result = pd.DataFrame(counts.reshape(len(columns), size).T,
+                          index=pd.RangeIndex(low, high, name="digit"),
+                          columns=columns)
+    if normalize:
+        return result / result.sum()
+    return result
+
+
+def benford(ndigits=1):
+    """Proportions of the first digits predicted by Benford's law.
+
+    The first `ndigits` digits equal `d` with probability
+    `log10(1 + 1 / d)`.
+    """
+    low, high = _digit_range("first", ndigits)
+    digits = np.arange(low, high)
+    return pd.Series(np.log10(1 + 1 / digits),
+                     index=pd.RangeIndex(low, high, name="digit"),
+                     name="benford")
+
+
+def benford_test(counts, ndigits=None):
+    """Goodness of fit of first-digit histograms to Benford's law.
+
+    Parameters
+    ----------
+    counts : DataFrame or Series
+        Counts of the first digits, as returned by `digit_counts` or by
+        `first_digit(x).value_counts()`, with the digits as the index.
+        Counts of -1 (values without digits) are ignored.
+    ndigits : int, optional
+        Number of leading digits that were counted. By default the number
+        of digits of the largest digit in the index.
+
+    Returns
+    -------
+    DataFrame
+        For each column, the number of values `n`, the chi-square statistic
+        and its p-value, and the mean absolute deviation `mad` between the
+        observed and the expected proportions (Nigrini's measure, which does
+        not grow with `n`).
+
+    Examples
+    --------
+    >>> benford_test(digit_counts(sp500))
+    """
+    from scipy.stats import chi2
+
+    if isinstance(counts, pd.Series):
+        counts = counts.to_frame()
+    digits = pd.to_numeric(pd.Series(counts.index), errors="coerce")
+    counts = counts[(digits >= 0).to_numpy()]
+    if ndigits is None:
+        if not len(counts):
+            raise ValueError("counts has no digits, so ndigits must be given")
+        ndigits = len(str(int(digits.max())))
+    expected = benford(ndigits).to_numpy()[:, np.newaxis]
+    observed = counts.reindex(benford(ndigits).index, fill_value=0) \
+        .to_numpy(dtype=float)
+    n = observed.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        proportions = observed / n
+        statistic = (n * (proportions - expected) ** 2 / expected).sum(axis=0)
+    statistic[n == 0] = np.nan
+    return pd.DataFrame({
+        "n": n.astype(np.int64),
+        "chi_square": statistic,
+        "p_value": chi2.sf(statistic, len(expected) - 1),
+        "mad": np.abs(proportions - expected).mean(axis=0),
+    }, index=counts.columns)
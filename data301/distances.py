@@ -0,0 +1,225 @@
+"""
+Distance matrices computed in tiles with matrix products.
+
+Section 4.3 builds the distance matrix with
+
+    housing_df_quant.apply(get_euclidean_dists_from_obs, axis=1)
+
+which runs one `DataFrame` operation per observation. Here the matrix is
+computed one rectangular tile at a time. Squared Euclidean distances use the
+expansion
+
+    |x - y|^2 = |x|^2 + |y|^2 - 2 x.y
+
+so that the bulk of the work in each tile is one matrix product (done by
+BLAS), and cosine distances are one matrix product of the normalized rows.
+The tiles are small enough to fit a memory budget, and `distance_tiles`
+yields them one at a time, for consumers that never need the whole matrix
+(see `condensed` and `neighbors`).
+"""
+
+import math
+
+import numpy as np
+
+METRICS = ("euclidean", "sqeuclidean", "cityblock", "cosine")
+
+# default working memory of one tile, in bytes
+MEMORY = 2 ** 26
+
+
+def _as_array(X, dtype):
+    return np.ascontiguousarray(np.asarray(X, dtype=dtype))
+
+
+def _prepare(X, Y, metric, dtype):
+    """Arrays and per-row terms used by `_tile`.
+
+    Returns `X`, `Y` and the auxiliary rows `x_aux` and `y_aux`: the squared
+    norms for the Euclidean metrics (after centering both arrays on the mean
+    of `X`, which reduces cancellation in the expansion), and nothing for
+    the others. For the cosine metric the rows are normalized instead.
+    """
+    if metric not in METRICS:
+        raise ValueError("metric must be one of %s" % (METRICS,))
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("dtype must be float32 or float64")
+    X = _as_array(X, dtype)
+    Y = X if Y is None else _as_array(Y, dtype)
+    if X.ndim != 2 or Y.ndim != 2 or X.shape[1] != Y.shape[1]:
+        raise ValueError("X and Y must be 2-D with the same number of columns")
+    same = Y is X
+    if metric in ("euclidean", "sqeuclidean"):
+        center = X.mean(axis=0, dtype=np.float64).astype(dtype)
+        X = X - center
+        Y = X if same else Y - center
+        x_aux = np.einsum("ij,ij->i", X, X)
+        y_aux = x_aux if same else np.einsum("ij,ij->i", Y, Y)
+        return X, Y, x_aux, y_aux
+    if metric == "cosine":
+        X = _normalize(X)
+        Y = X if same else _normalize(Y)
+    return X, Y, None, None
+
+
+def _normalize(X):
+    """Rows scaled to unit length (rows of zeros are left as they are)."""
+    norms = np.sqrt(np.einsum("ij,ij->i", X, X))
+    norms[norms == 0] = 1
+    return X / norms[:, np.newaxis]
+
+
+def _tile(metric, X, Y, x_aux, y_aux, rows, columns, out):
+    """Distances between `X[rows]` and `Y[columns]`, written into `out`."""
+    x, y = X[rows], Y[columns]
+    if metric == "cityblock":
+        out[...] = 0
+        # one pass over the tile per feature keeps the memory at one tile
+        for j in range(X.shape[1]):
+            out += np.abs(x[:, j, np.newaxis] - y[np.newaxis, :, j])
+        return out
+    np.matmul(x, y.T, out=out)
+    if metric == "cosine":
+        np.subtract(1, out, out=out)
+        return np.clip(out, 0, 2, out=out)
+    out *= -2
+    out += x_aux[rows, np.newaxis]
+    out += y_aux[np.newaxis, columns]
+    np.maximum(out, 0, out=out)
+    if metric == "euclidean":
+        np.sqrt(out, out=out)
+    return out
+
+
+def tile_shape(n_rows, n_columns, dtype=np.float64, memory=MEMORY):
+    """Rows and columns of a tile that fits in `memory` bytes.
+
+    Tiles are square when both sides are long, and as tall as the budget
+    allows when there are few columns.
+    """
+    cells = max(memory // np.dtype(dtype).itemsize, 1)
+    side = max(math.isqrt(cells), 1)
+    columns = min(n_columns, side) if n_rows > side else \
+        min(n_columns, max(cells // max(n_rows, 1), 1))
+    rows = min(n_rows, max(cells // max(columns, 1), 1))
+    return max(rows, 1), max(columns, 1)
+
+
+def _tiled_apply(n, m, compute, shape, dtype=np.float64, rows=None,
+                 upper=False):
+    """Yield the tiles of an (n, m) matrix, computed by `compute`.
+
+    `compute(rows, columns, out)` writes the tile of the slices `rows` and
+    `columns` into `out`, a view of one buffer of `shape` that is reused
+    for every tile. `rows` and `upper` are as in `distance_tiles`.
+    """
+    height, width = shape
+    buffer = np.empty(height * width, dtype=dtype)
+    first_row, last_row, _ = (rows or slice(0, n)).indices(n)
+    for start in range(first_row, last_row, height):
+        rows = slice(start, min(start + height, last_row))
+        first = start - start % width if upper else 0
+        for column in range(first, m, width):
+            columns = slice(column, min(column + width, m))
+            out = buffer[:(rows.stop - rows.start)
+                         * (columns.stop - columns.start)].reshape(
+                rows.stop - rows.start, columns.stop - columns.start)
+            compute(rows, columns, out)
+            yield rows, columns, out
+
+
+def distance_tiles(X, Y=None, metric="euclidean", dtype=np.float64,
+                   memory=MEMORY, upper=False, tile=None, rows=None,
+                   prepared=None):
+    """Compute a distance matrix one tile at a time.
+
+    Parameters
+    ----------
+    X : array-like, shape (n, p)
+        Observations (rows) and numeric variables (columns).
+    Y : array-like, shape (m, p), optional
+        Second set of observations. Defaults to `X`.
+    metric : {"euclidean", "sqeuclidean", "cityblock", "cosine"}
+        Distance metric.
+    dtype : {np.float64, np.float32}
+        Precision of the computation and of the distances. float32 halves
+        the memory and is about twice as fast, at the cost of absolute
+        errors of around 1e-3 times the typical distance.
+    memory : int
+        Size of one tile, in bytes.
+    upper : bool
+        Only yield the tiles that touch the upper triangle (including the
+        diagonal), for symmetric consumers. Requires `Y` to be `X`.
+    tile : tuple of int, optional
+        Shape of the tiles, overriding `memory`.
+    rows : slice, optional
+        Only yield the tiles of these rows of `X`, e.g. to split the work
+        between processes (see `parallel`).
+    prepared : tuple, optional
+        The result of `_prepare(X, Y, metric, dtype)`, when the caller
+        computes the tiles of the same data in several calls and has
+        already centered or normalized it. Only the length of `X` and
+        whether `Y` is None are then used.
+
+    Yields
+    ------
+    rows, columns : slice
+        Position of the tile in the full matrix.
+    distances : ndarray
+        The tile. It is overwritten by the next tile, so copy it to keep it.
+    """
+    same = Y is None
+    if upper and not same:
+        raise ValueError("upper=True requires Y to be None")
+    if prepared is None:
+        prepared = _prepare(X, Y, metric, dtype)
+    X, Y, x_aux, y_aux = prepared
+    n, m = len(X), len(Y)
+
+    def compute(rows, columns, out):
+        _tile(metric, X, Y, x_aux, y_aux, rows, columns, out)
+        if same:
+            # the distance from an observation to itself is exactly 0
+            diagonal = np.arange(max(rows.start, columns.start),
+                                 min(rows.stop, columns.stop))
+            out[diagonal - rows.start, diagonal - columns.start] = 0
+
+    yield from _tiled_apply(n, m, compute,
+                            tile or tile_shape(n, m, X.dtype, memory),
+                            X.dtype, rows, upper)
+
+
+def distance_matrix(X, Y=None, metric="euclidean", dtype=np.float64,
+                    memory=MEMORY, out=None):
+    """Matrix of distances between every pair of observations.
+
+    Equivalent to `sklearn.metrics.pairwise_distances(X, Y, metric)`, and to
+    the `.apply(..., axis=1)` of section 4.3, but computed tile by tile
+    with matrix products.
+
+    Parameters
+    ----------
+    X, Y, metric, dtype, memory
+        As in `distance_tiles`.
+    out : ndarray, optional
+        Array of shape (n, m) to write the distances into, for example a
+        `np.memmap` for a matrix larger than memory.
+
+    Returns
+    -------
+    ndarray, shape (n, m)
+
+    Examples
+    --------
+    >>> D = distance_matrix(housing_df_quant)
+    >>> D = pd.DataFrame(D, index=reds.index, columns=reds.index)
+    """
+    n = len(X)
+    m = n if Y is None else len(Y)
+    if out is None:
+        out = np.empty((n, m), dtype=dtype)
+    for rows, columns, distances in distance_tiles(X, Y, metric, dtype,
+                                                   memory):
+        out[rows, columns] = distances
+    return out
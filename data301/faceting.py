@@ -0,0 +1,148 @@
+"""
+Small multiples drawn from a single partition of the data.
+
+Section 3.4 draws one scatter plot per building type with
+
+    for ax, bldg_type in zip(axes, bldg_types):
+        housing_type = housing_df[housing_df["Bldg Type"] == bldg_type]
+
+which scans the whole table and copies the matching rows once per facet.
+A `Partition` sorts the row numbers by group once, so that each group is a
+contiguous range. The columns being plotted are reordered once, and each
+facet is then drawn from a slice of them, which is a view, not a copy.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _smallest_int_dtype(n):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class Partition:
+    """Row numbers grouped into contiguous ranges, one per category.
+
+    Parameters
+    ----------
+    groups : Series or array-like
+        Group of each row. Rows whose group is missing are left out.
+    sort : bool
+        Order the groups by label. Otherwise they are in order of first
+        appearance, like `Series.unique()`.
+
+    Attributes
+    ----------
+    labels : Index
+        Label of each group.
+    order : ndarray
+        Row numbers, sorted by group (and in their original order within
+        each group).
+    offsets : ndarray
+        Rows `order[offsets[i]:offsets[i + 1]]` belong to group `labels[i]`.
+    """
+
+    def __init__(self, groups, sort=False):
+        codes, labels = pd.factorize(groups, sort=sort)
+        self.labels = pd.Index(labels, name=getattr(groups, "name", None))
+        # A stable sort on small integer codes is a radix sort in NumPy.
+        codes = codes.astype(_smallest_int_dtype(len(labels)))
+        order = np.argsort(codes, kind="stable")
+        n_missing = int((codes < 0).sum())
+        self.order = order[n_missing:]
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def __len__(self):
+        return len(self.labels)
+
+    def sizes(self):
+        """Number of rows in each group."""
+        return pd.Series(np.diff(self.offsets), index=self.labels)
+
+    def take(self, values):
+        """Reorder a column (or array) so that each group is contiguous."""
+        if isinstance(values, pd.Series):
+            values = values.to_numpy()
+        return np.asarray(values)[self.order]
+
+    def slices(self):
+        """Iterate over `(label, slice)` pairs into the reordered data."""
+        for label, start, stop in zip(self.labels, self.offsets[:-1],
+                                      self.offsets[1:]):
+            yield label, slice(start, stop)
+
+    def split(self, *columns):
+        """Iterate over `(label, views)`, with one view per column.
+
+        Each column is reordered once; the views of all the groups share
+        that one copy.
+        """
+        ordered = [self.take(column) for column in columns]
+        for label, rows in self.slices():
+            yield label, tuple(column[rows] for column in ordered)
+
+
+def facet_scatter(df, x, y, by, ncols=None, sharex=True, sharey=True,
+                  sort=False, axes=None, figsize=None, **kwargs):
+    """Scatter plot of `y` against `x`, with one panel per group of `by`.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Table of observations.
+    x, y : str
+        Columns to plot on the horizontal and vertical axes.
+    by : str
+        Column whose groups define the panels.
+    ncols : int, optional
+        Number of panels per row. Defaults to one row for up to 5 panels
+        and a roughly square grid otherwise.
+    sharex, sharey : bool
+        Share the axes between panels, as in `plt.subplots`.
+    sort : bool
+        Order the panels by group label instead of by first appearance.
+    axes : array of Axes, optional
+        Axes to draw on, one per group. Created if not given.
+    figsize : tuple, optional
+        Figure size in inches, if the axes are created here.
+    **kwargs
+        Passed to `Axes.scatter`, e.g. `s=1` or `alpha=.2` for many points.
+
+    Returns
+    -------
+    array of Axes
+
+    Examples
+    --------
+    >>> facet_scatter(housing_df, "Gr Liv Area", "SalePrice", by="Bldg Type",
+    ...               figsize=(10, 4))
+    """
+    import matplotlib.pyplot as plt
+
+    partition = Partition(df[by], sort=sort)
+    n = len(partition)
+    if axes is None:
+        if ncols is None:
+            ncols = n if n <= 5 else math.ceil(math.sqrt(n))
+        nrows = math.ceil(n / ncols)
+        _, axes = plt.subplots(nrows, ncols, figsize=figsize, squeeze=False,
+                               sharex=sharex, sharey=sharey)
+        for ax in axes.ravel()[n:]:
+            ax.set_visible(False)
+    axes = np.asarray(axes).ravel()
+
+    kwargs.setdefault("s", 10)
+    for ax, (label, (xs, ys)) in zip(axes, partition.split(df[x], df[y])):
+        ax.scatter(xs, ys, **kwargs)
+        ax.set_title(label)
+        ax.set_xlabel(x)
+    for ax in axes[:n]:
+        if ax.get_subplotspec() is None or ax.get_subplotspec().is_first_col():
+            ax.set_ylabel(y)
+    return axes[:n]
@@ -0,0 +1,167 @@
+"""
+`value_counts` for categorical columns with very many distinct values.
+
+Section 1.2 calls `df.name.value_counts()` and `surnames.value_counts()`.
+Counting every distinct value exactly needs a hash table as large as the
+number of distinct values. A `ValueCounter` counts exactly while the column
+has few distinct values. Once there are more than `exact_limit`, it
+switches to sketches that use a fixed amount of memory (see `sketches`):
+`SpaceSaving` for the most common values, `CountMinSketch` for the count
+of any given value and `HyperLogLog` for the number of distinct values.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .sketches import CountMinSketch, HyperLogLog, SpaceSaving, hash_values
+
+
+class ValueCounter:
+    """Mergeable, bounded-memory replacement for `value_counts`.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of heavy-hitter counters. Every value that makes up more than
+        `1 / capacity` of the data is found, and each reported count is
+        at most `total / capacity` too high.
+    exact_limit : int
+        Count exactly while there are at most this many distinct values.
+    precision : int
+        Precision of the distinct count, see `HyperLogLog`.
+    epsilon, delta : float
+        Error bounds of the point counts, see `CountMinSketch`.
+
+    Examples
+    --------
+    >>> counter = ValueCounter()
+    >>> for chunk in pd.read_csv("names.csv", chunksize=10 ** 6):
+    ...     counter.update(chunk["name"])
+    >>> counter.value_counts(10)
+    >>> counter.nunique()
+    """
+
+    def __init__(self, capacity=1000, exact_limit=100_000, precision=14,
+                 epsilon=1e-4, delta=0.01):
+        self.capacity = capacity
+        self.exact_limit = exact_limit
+        self.name = None
+        self.exact = pd.Series(dtype=np.int64)
+        self.heavy_hitters = None
+        self.distinct = HyperLogLog(precision)
+        self.point_counts = CountMinSketch(epsilon, delta)
+
+    @property
+    def is_exact(self):
+        """Whether every distinct value is still counted exactly."""
+        return self.heavy_hitters is None
+
+    def _switch_to_sketches(self):
+        self.heavy_hitters = SpaceSaving(self.capacity)
+        self.heavy_hitters.update_counts(self.exact)
+        self.exact = None
+
+    def update(self, values):
+        """Add a chunk of values. Missing values are ignored."""
+        if self.name is None:
+            self.name = getattr(values, "name", None)
+        counts = pd.Series(values).value_counts()
+        # a categorical column also lists its unobserved categories
+        counts = counts[counts > 0]
+        hashes = hash_values(counts.index.to_numpy())
+        self.distinct.update_hashes(hashes)
+        self.point_counts.update_hashes(hashes, counts.to_numpy())
+        if self.is_exact:
+            self.exact = self.exact.add(counts, fill_value=0).astype(np.int64)
+            if len(self.exact) > self.exact_limit:
+                self._switch_to_sketches()
+        else:
+            self.heavy_hitters.update_counts(counts)
+        return self
+
+    def merge(self, other):
+        """Combine with a counter built with the same parameters."""
+        if self.name is None:
+            self.name = other.name
+        self.distinct.merge(other.distinct)
+        self.point_counts.merge(other.point_counts)
+        if self.is_exact and other.is_exact:
+            self.exact = self.exact.add(other.exact, fill_value=0) \
+                .astype(np.int64)
+            if len(self.exact) > self.exact_limit:
+                self._switch_to_sketches()
+            return self
+        if self.is_exact:
+            self._switch_to_sketches()
+        if other.is_exact:
+            self.heavy_hitters.update_counts(other.exact)
+        else:
+            self.heavy_hitters.merge(other.heavy_hitters)
+        return self
+
+    @property
+    def total(self):
+        """Number of (non-missing) values added."""
+        return self.point_counts.total
+
+    def value_counts(self, k=10, normalize=False):
+        """The `k` most common values and their counts.
+
+        Exact while `is_exact`. Otherwise each count is the smaller of the
+        heavy-hitter and the Count-Min estimates, both of which can only be
+        too high, by at most `max_error()`.
+        """
+        if self.is_exact:
+            counts = self.exact.sort_values(ascending=False, kind="stable")
+            counts = counts.iloc[:k]
+        else:
+            counts = self.heavy_hitters.top(k)["count"]
+            sketched = self.point_counts.estimate_hashes(
+                hash_values(counts.index.to_numpy()))
+            counts = pd.Series(np.minimum(counts.to_numpy(), sketched),
+                               index=counts.index)
+            counts = counts.sort_values(ascending=False, kind="stable")
+        counts = counts.rename(self.name)
+        counts.index.name = self.name
+        if normalize:
+            return counts / self.total
+        return counts
+
+    def count(self, value):
+        """Count of a single value (estimated, unless `is_exact`)."""
+        if self.is_exact:
+            return int(self.exact.get(value, 0))
+        return int(self.point_counts.estimate([value])[0])
+
+    def max_error(self):
+        """Bound on how much a reported count can exceed the true count."""
+        if self.is_exact:
+            return 0
+        return min(self.total / self.capacity,
+                   self.point_counts.epsilon * self.total)
+
+    def nunique(self):
+        """Number of distinct values (estimated, unless `is_exact`)."""
+        if self.is_exact:
+            return len(self.exact)
+        return int(round(self.distinct.estimate()))
+
+
+def approx_value_counts(values, k=10, **kwargs):
+    """`values.value_counts().head(k)` in bounded memory.
+
+    Parameters
+    ----------
+    values : Series, or iterable of Series
+        A column, or the chunks of one.
+    k : int
+        Number of most common values to return.
+    **kwargs
+        Passed to `ValueCounter`.
+    """
+    counter = ValueCounter(**kwargs)
+    chunks = [values] if isinstance(values, (pd.Series, np.ndarray)) \
+        else values
+    for chunk in chunks:
+        counter.update(chunk)
+    return counter.value_counts(k)
@@ -0,0 +1,403 @@
+"""
+k-nearest neighbors regression for many new observations at once.
+
+Section 5.1 predicts a whole grid of new observations with
+
+    X_new.apply(get_30NN_prediction, axis=1)
+
+where every call computes the distances to all of the training data in a
+`DataFrame`, sorts every one of them with `sort_values` and averages the
+labels of the first 30. `knn_predict` finds the neighbors of all of the new
+observations together, one tile of distances at a time (see `neighbors`),
+keeping only the `k` smallest distances of each row with `np.argpartition`
+instead of sorting them, and then averages the labels with a single gather,
+`y[indices]`.
+
+Choosing `k` (sections 5.3 to 5.5) fits and searches again for every
+candidate value. Since the labels of the nearest neighbors are sorted by
+distance, the prediction for every `k` up to some `K` is a prefix sum of the
+same row, `np.cumsum(y[indices], axis=1)[:, k - 1] / k`, so
+`knn_predictions`, `knn_validation_errors` and `knn_cv_errors` search once
+for the largest `k` and evaluate all of the others for almost nothing.
+
+The training error of section 5.3 (and the training metrics of section 6.2)
+come from `model.predict(X_train_sc)`, another full search, and a
+leave-one-out estimate of the test error would refit the model once per
+observation. Both follow from the `k` nearest *other* observations of each
+training observation: leaving it out, its prediction uses all `k` of them,
+and with it in the training data, it is its own nearest neighbor followed
+by the first `k - 1` of them (see `knn_loo`).
+"""
+
+import numpy as np
+import pandas as pd
+
+from ._labels import index_and_name
+from .distances import MEMORY
+from .neighbors import k_nearest
+from .scaling import Scaler
+
+STATISTICS = ("mean", "median")
+
+
+def _features(X_train, X_new):
+    """The new observations as rows, with the columns of `X_train`."""
+    if isinstance(X_new, pd.Series):
+        X_new = X_new.to_frame().T
+    if isinstance(X_train, pd.DataFrame) and isinstance(X_new, pd.DataFrame):
+        X_new = X_new[X_train.columns]
+    return X_new
+
+
+def _labels(y_train, n):
+    y = np.asarray(y_train, dtype=float)
+    if y.ndim != 1 or len(y) != n:
+        raise ValueError("y_train must have one label per training row")
+    return y
+
+
+def _ks(ks, n):
+    ks = np.atleast_1d(np.asarray(ks, dtype=np.int64))
+    if not len(ks) or ks.min() < 1 or ks.max() > n:
+        raise ValueError("every k must be between 1 and the number of "
+                         "training observations")
+    return ks
+
+
+def _neighbor_labels(X_train, y, X_new, k, metric, dtype, memory):
+    """Labels of the `k` nearest training rows of each new row, nearest
+    first."""
+    _, indices = k_nearest(_features(X_train, X_new), X_train, k, metric,
+                           dtype, memory)
+    return y[indices]
+
+
+def _prefix_means(neighbors, ks):
+    """Mean of the first `k` labels of each row, for every `k` in `ks`."""
+    sums = np.cumsum(neighbors, axis=1)
+    return sums[:, ks - 1] / ks
+
+
+def _errors(y, predictions, ks):
+    residuals = y[:, np.newaxis] - predictions
+    mse = np.mean(residuals ** 2, axis=0)
+    return pd.DataFrame({"MSE": mse, "RMSE": np.sqrt(mse),
+                         "MAE": np.mean(np.abs(residuals), axis=0)},
+                        index=pd.Index(ks, name="k"))
+
+
+def knn_predict(X_train, y_train, X_new, k=30, metric="euclidean",
+                statistic="mean", dtype=np.float64, memory=MEMORY):
+    """Predict the labels of new observations from their `k` nearest
+    neighbors in the training data.
+
+    Parameters
+    ----------
+    X_train : DataFrame or array-like, shape (n, p)
+        Features of the training data, already scaled (see `scaling`).
+    y_train : Series or array-like, shape (n,)
+        Labels of the training data.
+    X_new : DataFrame, Series or array-like, shape (m, p)
+        Features of the new observations, scaled in the same way. A
+        `DataFrame` is matched to the columns of `X_train` by name, and a
+        `Series` is a single observation.
+    k : int
+        Number of neighbors.
+    metric : {"euclidean", "sqeuclidean", "cityblock", "cosine"}
+        Distance metric, as in `distances.distance_tiles`.
+    statistic : {"mean", "median"}
+        How to combine the labels of the neighbors.
+    dtype, memory
+        As in `distances.distance_tiles`.
+
+    Returns
+    -------
+    Series, ndarray or float
+        The predictions: a `Series` indexed like `X_new` if it is a
+        `DataFrame`, a number if it is a `Series`, and otherwise an array.
+
+    Ties at the `k`-th place are broken arbitrarily, as by
+    `sort_values().index[:k]` and by scikit-learn.
+
+    Examples
+    --------
+    >>> X_new = pd.DataFrame({"Gr Liv Area": np.arange(0, 6000, 10)})
+    >>> y_new_pred = knn_predict(housing[["Gr Liv Area"]],
+    ...                          housing["SalePrice"], X_new, k=30)
+    """
+    if statistic not in STATISTICS:
+        raise ValueError("statistic must be one of %s" % (STATISTICS,))
+    y = _labels(y_train, len(X_train))
+    if not 1 <= k <= len(y):
+        raise ValueError("k must be between 1 and the number of training "
+                         "observations")
+    single = isinstance(X_new, pd.Series)
+    X_new = _features(X_train, X_new)
+    neighbors = _neighbor_labels(X_train, y, X_new, k, metric, dtype, memory)
+    if statistic == "mean":
+        predictions = neighbors.mean(axis=1)
+    else:
+        predictions = np.median(neighbors, axis=1)
+    if single:
+        return predictions[0]
+    if isinstance(X_new, pd.DataFrame):
+        return pd.Series(predictions, index=X_new.index,
+                         name=getattr(y_train, "name", None))
+    return predictions
+
+
+def knn_predictions(X_train, y_train, X_new, ks, metric="euclidean",
+                    dtype=np.float64, memory=MEMORY):
+    """Predictions of the `k`-nearest neighbors regressor for several `k`.
+
+    One search for the largest `k`, instead of one per value, as in the
+    loop `for k in [5, 30, 100]` of section 5.1. The parameters are those
+    of `knn_predict`, except that `ks` is a list of numbers of neighbors.
+
+    Returns
+    -------
+    DataFrame
+        One column of predictions per `k`, and one row per new
+        observation.
+
+    Examples
+    --------
+    >>> y_new_pred = knn_predictions(X_train, y_train, X_new, [5, 30, 100])
+    >>> y_new_pred.set_index(X_new["Gr Liv Area"]).plot.line()
+    """
+    y = _labels(y_train, len(X_train))
+    ks = _ks(ks, len(y))
+    X_new = _features(X_train, X_new)
+    neighbors = _neighbor_labels(X_train, y, X_new, ks.max(), metric, dtype,
+                                 memory)
+    index = X_new.index if isinstance(X_new, pd.DataFrame) else None
+    return pd.DataFrame(_prefix_means(neighbors, ks), index=index,
+                        columns=pd.Index(ks, name="k"))
+
+
+def knn_validation_errors(X_train, y_train, X_val, y_val, ks,
+                          metric="euclidean", dtype=np.float64,
+                          memory=MEMORY):
+    """Validation errors of the `k`-nearest neighbors regressor for several
+    `k`, from a single neighbor search.
+
+    The same as fitting a `KNeighborsRegressor` for each `k` and comparing
+    its predictions on `X_val` to `y_val`, as `get_val_error` does in
+    section 5.4. For the training errors of section 5.3, use
+    `knn_loo_errors`, which also gives the leave-one-out errors.
+
+    Returns
+    -------
+    DataFrame
+        Columns `MSE`, `RMSE` and `MAE`, indexed by `k`.
+
+    Examples
+    --------
+    >>> knn_validation_errors(X_train_sc, y_train, X_val_sc, y_val,
+    ...                       ks=range(1, 51))
+    """
+    y = _labels(y_train, len(X_train))
+    ks = _ks(ks, len(y))
+    neighbors = _neighbor_labels(X_train, y, X_val, ks.max(), metric, dtype,
+                                 memory)
+    return _errors(_labels(y_val, len(neighbors)),
+                   _prefix_means(neighbors, ks), ks)
+
+
+def _rows(X, positions):
+    return X.iloc[positions] if isinstance(X, (pd.DataFrame, pd.Series)) \
+        else np.asarray(X)[positions]
+
+
+def knn_cv_errors(X, y, ks, cv=10, scale="standard", metric="euclidean",
+                  dtype=np.float64, memory=MEMORY):
+    """Cross-validation errors of the `k`-nearest neighbors regressor for
+    several `k`.
+
+    The same as `cross_val_score` with a pipeline that scales the features
+    and fits a `KNeighborsRegressor`, for every `k` (the `get_cv_error` of
+    section 5.5), but each fold is scaled and searched only once.
+
+    Parameters
+    ----------
+    X : DataFrame or array-like, shape (n, p)
+        Numeric features (with categorical variables already converted to
+        dummy variables), not yet scaled.
+    y : Series or array-like, shape (n,)
+        Labels.
+    ks : list of int
+        Numbers of neighbors to evaluate.
+    cv : int
+        Number of folds. As in scikit-learn, the folds are consecutive
+        blocks of rows, so shuffle the rows first if they are ordered.
+    scale : {"standard", "l2", "minmax", None}
+        How to scale the features, with statistics from the training folds
+        only (see `scaling.Scaler`).
+    metric, dtype, memory
+        As in `distances.distance_tiles`.
+
+    Returns
+    -------
+    DataFrame
+        Columns `MSE` and `MAE`, the averages over the folds, and `RMSE`,
+        the square root of `MSE`, indexed by `k`.
+
+    Examples
+    --------
+    >>> X = pd.get_dummies(housing[features])
+    >>> errors = knn_cv_errors(X, housing["SalePrice"], range(1, 51))
+    >>> errors["MSE"].plot.line()
+    """
+    labels = _labels(y, len(X))
+    n = len(labels)
+    if not 2 <= cv <= n:
+        raise ValueError("cv must be between 2 and the number of "
+                         "observations")
+    # the first n % cv folds have one more row, as in KFold
+    sizes = np.full(cv, n // cv)
+    sizes[:n % cv] += 1
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    ks = _ks(ks, n - sizes.max())
+    mse = np.zeros(len(ks))
+    mae = np.zeros(len(ks))
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        train = np.r_[0:start, stop:n]
+        X_train, X_val = _rows(X, train), _rows(X, slice(start, stop))
+        if scale is not None:
+            # every column, including boolean dummy variables
+            scaler = Scaler(getattr(X, "columns", None)).update(X_train)
+            X_train = scaler.transform(X_train, scale, dtype=dtype)
+            X_val = scaler.transform(X_val, scale, dtype=dtype)
+        neighbors = _neighbor_labels(X_train, labels[train], X_val, ks.max(),
+                                     metric, dtype, memory)
+        errors = _errors(labels[start:stop], _prefix_means(neighbors, ks),
+                         ks)
+        mse += errors["MSE"].to_numpy() / cv
+        mae += errors["MAE"].to_numpy() / cv
+    return pd.DataFrame({"MSE": mse, "RMSE": np.sqrt(mse), "MAE": mae},
+                        index=pd.Index(ks, name="k"))
+
+
+def _classify(y, classify):
+    if classify is None:
+        y = pd.Series(y) if not isinstance(y, pd.Series) else y
+        return not (pd.api.types.is_numeric_dtype(y.dtype)
+                    and not pd.api.types.is_bool_dtype(y.dtype))
+    return classify
+
+
+def _loo_predictions(X, y, ks, classify, metric, dtype, memory):
+    """Training (self included) and leave-one-out predictions of every
+    observation, for every `k`, each an array of shape (n, len(ks))."""
+    _, others = k_nearest(X, k=ks.max(), metric=metric, dtype=dtype,
+                          memory=memory)
+    if not classify:
+        y = _labels(y, len(X))
+        sums = np.cumsum(y[others], axis=1)
+        loo = sums[:, ks - 1] / ks
+        # the first k - 1 others, and the observation itself
+        training = np.where(ks > 1, sums[:, np.maximum(ks - 2, 0)], 0.0)
+        training = (training + y[:, np.newaxis]) / ks
+        return training, loo
+    classes, codes = np.unique(np.asarray(y), return_inverse=True)
+    codes = codes.reshape(-1)
+    # votes[i, j, c]: number of the first j + 1 others of i in class c
+    votes = np.cumsum(codes[others][:, :, np.newaxis]
+                      == np.arange(len(classes)), axis=1, dtype=np.int32)
+    loo_votes = votes[:, ks - 1]
+    training_votes = np.where((ks > 1)[:, np.newaxis],
+                              votes[:, np.maximum(ks - 2, 0)], 0)
+    training_votes[np.arange(len(codes)), :, codes] += 1
+    # ties go to the first class in sorted order, as in scikit-learn
+    return (classes[training_votes.argmax(axis=2)],
+            classes[loo_votes.argmax(axis=2)])
+
+
+def knn_loo(X, y, k=10, classify=None, metric="euclidean",
+            dtype=np.float64, memory=MEMORY):
+    """Training and leave-one-out predictions of the `k`-nearest neighbors
+    model, from a single neighbor search.
+
+    The training prediction of an observation is that of the model fitted
+    to all of the data, like `model.predict(X_train_sc)` in section 5.3,
+    so it counts the observation as one of its own neighbors. The
+    leave-one-out prediction is that of the model fitted to all of the
+    other observations, exactly as if it were refitted `n` times.
+
+    Parameters
+    ----------
+    X : DataFrame or array-like, shape (n, p)
+        Features, already scaled.
+    y : Series or array-like, shape (n,)
+        Labels.
+    k : int
+        Number of neighbors.
+    classify : bool, optional
+        Predict the most common label of the neighbors (as
+        `KNeighborsClassifier`) rather than their mean. Defaults to True
+        for labels that are not numeric.
+    metric, dtype, memory
+        As in `distances.distance_tiles`.
+
+    Returns
+    -------
+    DataFrame
+        Indexed like `X`, with the columns `training` and `loo` (the
+        predictions) and, for a regression, `training_residual` and
+        `loo_residual` (the label minus the prediction).
+
+    Examples
+    --------
+    >>> loo = knn_loo(X_train_sc, y_train, k=9)
+    >>> (loo["training"] == y_train).mean(), (loo["loo"] == y_train).mean()
+    """
+    classify = _classify(y, classify)
+    ks = _ks([k], len(X) - 1)
+    training, loo = _loo_predictions(X, y, ks, classify, metric, dtype,
+                                     memory)
+    index, _ = index_and_name(X)
+    result = pd.DataFrame({"training": training[:, 0], "loo": loo[:, 0]},
+                          index=index)
+    if not classify:
+        labels = _labels(y, len(X))
+        result["training_residual"] = labels - training[:, 0]
+        result["loo_residual"] = labels - loo[:, 0]
+    return result
+
+
+def knn_loo_errors(X, y, ks, classify=None, metric="euclidean",
+                   dtype=np.float64, memory=MEMORY):
+    """Training and leave-one-out errors of the `k`-nearest neighbors model
+    for several `k`, from a single neighbor search.
+
+    See `knn_loo`; `ks` is a list of numbers of neighbors.
+
+    Returns
+    -------
+    DataFrame
+        Indexed by `k`, with the columns `training` and `loo`, each with
+        `MSE`, `RMSE` and `MAE` for a regression, or `accuracy` for a
+        classification.
+
+    Examples
+    --------
+    >>> errors = knn_loo_errors(X_train_sc, y_train, [3, 10, 20, 30])
+    >>> errors["training", "MAE"].plot.bar()
+    """
+    classify = _classify(y, classify)
+    ks = _ks(ks, len(X) - 1)
+    training, loo = _loo_predictions(X, y, ks, classify, metric, dtype,
+                                     memory)
+    if classify:
+        labels = np.asarray(y)[:, np.newaxis]
+        index = pd.Index(ks, name="k")
+        errors = {
+            "training": pd.DataFrame(
+                {"accuracy": (training == labels).mean(axis=0)}, index=index),
+            "loo": pd.DataFrame(
+                {"accuracy": (loo == labels).mean(axis=0)}, index=index)}
+    else:
+        labels = _labels(y, len(X))
+        errors = {"training": _errors(labels, training, ks),
+                  "loo": _errors(labels, loo, ks)}
+    return pd.concat(errors, axis=1)
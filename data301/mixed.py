@@ -0,0 +1,205 @@
+"""
+Distances between observations with numeric and categorical variables.
+
+Section 4.2 converts every categorical variable to dummy variables with
+`pd.get_dummies` before computing distances, so a variable with K categories
+becomes K columns of mostly zeros. Here each categorical variable stays a
+single column of integer codes, and a difference in that variable is a
+mismatch of codes. Numeric variables are scaled (by their range, for
+Gower's distance) and compared by their absolute differences. The memory
+is proportional to the number of original columns, and the distances are
+computed one tile at a time, as in `distances`.
+
+With `metric="euclidean"` or `"cityblock"` and no scaling, the distances are
+exactly those between the rows of `pd.get_dummies(df)`: two different
+categories differ in two dummy columns, and a missing category (a row of
+zeros) differs from any other category in one.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .distances import MEMORY, _tiled_apply, tile_shape
+
+METRICS = ("gower", "euclidean", "cityblock")
+SCALES = ("range", "std", None)
+
+
+def _is_categorical(dtype):
+    return dtype == object or isinstance(
+        dtype, (pd.CategoricalDtype, pd.StringDtype))
+
+
+def _encode(X, Y, categorical, scale, weights):
+    """Scaled numeric values, categorical codes and weights of X and Y.
+
+    The scales are computed from `X`. Each categorical column of `X` and `Y`
+    is factorized together, so equal categories get equal codes.
+    """
+    if scale not in SCALES:
+        raise ValueError("scale must be one of %s" % (SCALES,))
+    if categorical is None:
+        categorical = [column for column, dtype in X.dtypes.items()
+                       if _is_categorical(dtype)]
+    categorical = list(categorical)
+    numeric = [column for column in X.columns if column not in categorical]
+    if weights is None:
+        weights = {}
+    elif not isinstance(weights, dict):
+        weights = dict(zip(X.columns, weights))
+    numeric_weights = np.array([weights.get(c, 1.0) for c in numeric],
+                               dtype=float)
+    categorical_weights = np.array([weights.get(c, 1.0) for c in categorical],
+                                   dtype=float)
+
+    x_numeric = X[numeric].to_numpy(dtype=float, na_value=np.nan)
+    y_numeric = None if Y is None \
+        else Y[numeric].to_numpy(dtype=float, na_value=np.nan)
+    if scale is not None and numeric:
+        if scale == "range":
+            spread = np.nanmax(x_numeric, axis=0) - np.nanmin(x_numeric,
+                                                              axis=0)
+        else:
+            spread = np.nanstd(x_numeric, axis=0, ddof=1)
+        # a constant column contributes nothing rather than 0 / 0
+        spread[~(spread > 0)] = 1
+        x_numeric = x_numeric / spread
+        y_numeric = None if Y is None else y_numeric / spread
+
+    x_codes = np.empty((len(X), len(categorical)), dtype=np.int64)
+    y_codes = None if Y is None \
+        else np.empty((len(Y), len(categorical)), dtype=np.int64)
+    for f, column in enumerate(categorical):
+        values = X[column] if Y is None else pd.concat([X[column], Y[column]],
+                                                       ignore_index=True)
+        codes, _ = pd.factorize(values)
+        x_codes[:, f] = codes[:len(X)]
+        if Y is not None:
+            y_codes[:, f] = codes[len(X):]
+    return (x_numeric, y_numeric, numeric_weights,
+            x_codes, y_codes, categorical_weights)
+
+
+def _tile(metric, x_numeric, y_numeric, numeric_weights, x_codes, y_codes,
+          categorical_weights, out):
+    """Distances between two blocks of encoded rows, written into `out`."""
+    out[...] = 0
+    gower = metric == "gower"
+    # Gower's distance averages over the variables present in both rows;
+    # the total weight is a single number unless some values are missing
+    total = 0.0
+    x_missing = np.isnan(x_numeric).any(axis=0)
+    y_missing = np.isnan(y_numeric).any(axis=0)
+    for f, weight in enumerate(numeric_weights):
+        difference = np.abs(x_numeric[:, f, np.newaxis]
+                            - y_numeric[np.newaxis, :, f])
+        if metric == "euclidean":
+            difference **= 2
+        if gower and (x_missing[f] or y_missing[f]):
+            present = ~np.isnan(difference)
+            difference[~present] = 0
+            total = total + weight * present
+        elif gower:
+            total = total + weight
+        if weight != 1:
+            difference *= weight
+        out += difference
+    x_missing = (x_codes < 0).any(axis=0)
+    y_missing = (y_codes < 0).any(axis=0)
+    for f, weight in enumerate(categorical_weights):
+        x, y = x_codes[:, f, np.newaxis], y_codes[np.newaxis, :, f]
+        if not gower:
+            # number of dummy columns that differ: 2, or 1 if one is missing
+            out += weight * ((x != y) * (2 - (x < 0) - (y < 0)))
+        elif x_missing[f] or y_missing[f]:
+            present = (x >= 0) & (y >= 0)
+            out += weight * ((x != y) & present)
+            total = total + weight * present
+        else:
+            out += weight * (x != y)
+            total = total + weight
+    if gower:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out /= total
+    elif metric == "euclidean":
+        np.sqrt(out, out=out)
+    return out
+
+
+def mixed_distance_tiles(X, Y=None, categorical=None, metric="gower",
+                         scale="range", weights=None, memory=MEMORY):
+    """Compute distances between mixed-type observations one tile at a time.
+
+    Parameters
+    ----------
+    X : DataFrame
+        Observations, with numeric and categorical columns.
+    Y : DataFrame, optional
+        Second set of observations, with the same columns. Defaults to `X`.
+    categorical : list, optional
+        Columns to compare as categories. Defaults to the columns of dtype
+        object, string or category. The other columns must be numeric.
+    metric : {"gower", "euclidean", "cityblock"}
+        "gower" is the weighted average, over the variables present in
+        both observations, of the scaled absolute differences and of the
+        category mismatches (each between 0 and 1 with `scale="range"`).
+        "euclidean" and "cityblock" are the distances between the dummy
+        encodings of the observations, with numeric columns scaled.
+    scale : {"range", "std", None}
+        Divide each numeric column by its range or its standard deviation
+        (computed from `X`), or leave it as it is.
+    weights : dict or list, optional
+        Weight of each column (default 1). For "euclidean", this is the
+        square of the factor that the column is multiplied by.
+    memory : int
+        Size of one tile, in bytes.
+
+    Yields
+    ------
+    rows, columns : slice
+        Position of the tile in the full matrix.
+    distances : ndarray
+        The tile. It is overwritten by the next tile.
+    """
+    if metric not in METRICS:
+        raise ValueError("metric must be one of %s" % (METRICS,))
+    (x_numeric, y_numeric, numeric_weights, x_codes, y_codes,
+     categorical_weights) = _encode(X, Y, categorical, scale, weights)
+    if Y is None:
+        y_numeric, y_codes = x_numeric, x_codes
+    n, m = len(x_codes), len(y_codes)
+
+    def compute(rows, columns, out):
+        _tile(metric, x_numeric[rows], y_numeric[columns], numeric_weights,
+              x_codes[rows], y_codes[columns], categorical_weights, out)
+
+    # the tile and a few temporaries of the same size
+    yield from _tiled_apply(n, m, compute,
+                            tile_shape(n, m, np.float64, memory // 4))
+
+
+def mixed_distance_matrix(X, Y=None, categorical=None, metric="gower",
+                          scale="range", weights=None, memory=MEMORY,
+                          out=None):
+    """Matrix of distances between mixed-type observations.
+
+    See `mixed_distance_tiles` for the parameters; `out` is an optional
+    array of shape (n, m) to write the distances into.
+
+    Examples
+    --------
+    >>> columns = ["pclass", "sex", "age", "fare", "embarked"]
+    >>> D = mixed_distance_matrix(titanic[columns])
+    >>> pd.Series(D[0], index=titanic.index).sort_values()
+    >>> # the same distances as with pd.get_dummies and no scaling:
+    >>> mixed_distance_matrix(titanic[columns], metric="euclidean",
+    ...                       scale=None)
+    """
+    n = len(X)
+    m = n if Y is None else len(Y)
+    if out is None:
+        out = np.empty((n, m))
+    for rows, columns, distances in mixed_distance_tiles(
+            X, Y, categorical, metric, scale, weights, memory):
+        out[rows, columns] = distances
+    return out
@@ -0,0 +1,196 @@
+"""
+Covariance and correlation matrices of tables that arrive in chunks.
+
+Section 3.4 calls `.cov()` and `.corr()` on a `DataFrame` that is already
+in memory. A `CovarianceAccumulator` is fed one chunk at a time, for example
+from `pd.read_csv(..., chunksize=...)`, and keeps only the counts, means and
+co-moments of every pair of columns. Chunks are combined with the pairwise
+update formulas of Chan, Golub and LeVeque (`_pool`), so accumulators built
+by separate workers can be merged into exactly the result of a single pass.
+
+Like pandas, every pair of columns uses the rows where both are present.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _numeric_values(chunk, columns):
+    """The float values of `chunk` and its columns.
+
+    The columns of a DataFrame are `columns`, by default its numeric ones;
+    those of an array are numbered, unless `columns` is given.
+    """
+    if isinstance(chunk, pd.DataFrame):
+        if columns is None:
+            columns = list(chunk.select_dtypes("number").columns)
+        chunk = chunk[columns]
+    if isinstance(chunk, (pd.DataFrame, pd.Series)):
+        values = chunk.to_numpy(dtype=float, na_value=np.nan)
+    else:
+        values = np.asarray(chunk, dtype=float)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+    if columns is None:
+        columns = list(range(values.shape[1]))
+    return values, columns
+
+
+def _pool(n_a, mean_a, n_b, mean_b):
+    """Combine the counts and means of two parts of the data.
+
+    Returns the total count, the mean of both parts, the difference `delta`
+    of their means and the weight `n_a * n_b / n`, so that the sum of
+    squared deviations of both parts is `m2_a + m2_b + delta ** 2 * weight`
+    (Chan, Golub and LeVeque). Works elementwise on arrays; where both
+    counts are 0, the mean, `delta` and the weight are 0.
+    """
+    total = n_a + n_b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(total > 0, n_a * n_b / total, 0.0)
+        delta = np.where(total > 0, mean_b - mean_a, 0.0)
+        mean = np.where(total > 0, mean_a + delta * n_b / total, 0.0)
+    return total, mean, delta, weight
+
+
+def _chunk_moments(values):
+    """Pairwise counts, means and co-moments of one chunk.
+
+    For each pair of columns (i, j), using only the rows where both are
+    present, returns the count `n[i, j]`, the mean of column i
+    `mean[i, j]`, the sum of squared deviations of column i `m2[i, j]` and
+    the sum of cross products of deviations `c[i, j]`. Each is computed with
+    a few matrix products over the zero-filled values and the mask of
+    present values.
+    """
+    present = ~np.isnan(values)
+    mask = present.astype(float)
+    # Shifting each column by its own mean keeps the sums of products small,
+    # which avoids cancellation in the co-moments below.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shift = np.nansum(values, axis=0) / mask.sum(axis=0)
+    shift = np.nan_to_num(shift)
+    x = np.where(present, values - shift, 0.0)
+
+    if present.all():
+        # Without missing values every pair uses every row, so the products
+        # with the mask reduce to column sums.
+        n = np.full((x.shape[1],) * 2, float(len(x)))
+        sums = np.repeat(x.sum(axis=0)[:, np.newaxis], x.shape[1], axis=1)
+        local_mean = sums / n
+        m2 = np.repeat(((x ** 2).sum(axis=0) - sums[:, 0] * local_mean[:, 0])
+                       [:, np.newaxis], x.shape[1], axis=1)
+        c = x.T @ x - sums * local_mean.T
+        return n, local_mean + shift[:, np.newaxis], m2, c
+
+    n = mask.T @ mask
+    sums = x.T @ mask                      # sums[i, j] = sum of x_i over (i, j)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        local_mean = np.where(n > 0, sums / n, 0.0)
+    m2 = (x ** 2).T @ mask - sums * local_mean
+    c = x.T @ x - sums * local_mean.T
+    return n, local_mean + shift[:, np.newaxis], m2, c
+
+
+class CovarianceAccumulator:
+    """Mergeable running covariance and correlation of numeric columns.
+
+    Parameters
+    ----------
+    columns : list of str, optional
+        Columns to track. Defaults to the numeric columns of the first chunk.
+
+    Examples
+    --------
+    >>> acc = CovarianceAccumulator(["Gr Liv Area", "Bedroom AbvGr",
+    ...                              "Full Bath", "SalePrice"])
+    >>> for chunk in pd.read_csv(url, sep="\\t", chunksize=1000):
+    ...     acc.update(chunk)
+    >>> acc.cov()    # same as housing_df[variables].cov()
+    >>> acc.corr()   # same as housing_df[variables].corr()
+    """
+
+    def __init__(self, columns=None):
+        self.columns = None if columns is None else list(columns)
+        self._n = None
+        self._mean = None
+        self._m2 = None
+        self._c = None
+
+    def _combine(self, n, mean, m2, c):
+        if self._n is None:
+            self._n, self._mean, self._m2, self._c = n, mean, m2, c
+            return
+        self._n, self._mean, delta, weight = _pool(self._n, self._mean, n,
+                                                   mean)
+        self._m2 = self._m2 + m2 + delta ** 2 * weight
+        self._c = self._c + c + delta * delta.T * weight
+
+    def update(self, chunk):
+        """Add a chunk of rows (a DataFrame or 2-D array) to the statistics."""
+        values, self.columns = _numeric_values(chunk, self.columns)
+        if len(values):
+            self._combine(*_chunk_moments(values))
+        return self
+
+    def merge(self, other):
+        """Add the statistics of another accumulator over the same columns."""
+        if other._n is None:
+            return self
+        if self.columns is None:
+            self.columns = other.columns
+        elif list(self.columns) != list(other.columns):
+            raise ValueError("cannot merge accumulators of different columns")
+        self._combine(other._n, other._mean, other._m2, other._c)
+        return self
+
+    @classmethod
+    def from_chunks(cls, chunks, columns=None):
+        """Accumulate every chunk of an iterable, such as a chunked reader."""
+        accumulator = cls(columns)
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return accumulator
+
+    def _check(self):
+        if self._n is None:
+            raise ValueError("no data has been accumulated")
+
+    def _frame(self, values):
+        return pd.DataFrame(values, index=self.columns, columns=self.columns)
+
+    def count(self):
+        """Number of rows where both columns of each pair are present."""
+        self._check()
+        return self._frame(self._n.astype(np.int64))
+
+    def mean(self):
+        """Mean of each column over the rows where it is present."""
+        self._check()
+        return pd.Series(np.diag(self._mean), index=self.columns)
+
+    def var(self, ddof=1):
+        """Variance of each column over the rows where it is present."""
+        self._check()
+        n = np.diag(self._n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.where(n > ddof, np.diag(self._m2) / (n - ddof), np.nan)
+        return pd.Series(var, index=self.columns)
+
+    def cov(self, ddof=1, min_periods=None):
+        """Pairwise covariance matrix, as `DataFrame.cov`."""
+        self._check()
+        min_periods = max(min_periods or 1, ddof + 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = np.where(self._n >= min_periods,
+                           self._c / (self._n - ddof), np.nan)
+        return self._frame(cov)
+
+    def corr(self, min_periods=1):
+        """Pairwise Pearson correlation matrix, as `DataFrame.corr`."""
+        self._check()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self._c / np.sqrt(self._m2 * self._m2.T)
+        corr = np.clip(corr, -1, 1)
+        corr[self._n < max(min_periods, 2)] = np.nan
+        return self._frame(corr)
@@ -0,0 +1,157 @@
+"""
+Nearest neighbors of every observation, without the distance matrix.
+
+The exercises of section 4.3 find the most similar wine to each wine by
+building the full labeled distance matrix, setting its diagonal to NaN and
+calling `D.min()` and `D.idxmin()`. `k_nearest` scans the same distances one
+tile at a time (see `distances`) and keeps only the `k` smallest distances
+found so far in each row, so the memory is one tile plus `n * k` entries,
+however many observations there are.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ._labels import index_and_name
+from .distances import MEMORY, distance_tiles
+
+
+def _merge_best(distances, indices, tile, columns, k):
+    """Update the `k` best distances (and their columns) of each row, in
+    place, with a tile of distances."""
+    if k == 1:
+        # argmin keeps the first (lowest) column among ties, like idxmin
+        j = tile.argmin(axis=1)
+        d = tile[np.arange(len(tile)), j]
+        closer = d < distances[:, 0]
+        distances[closer, 0] = d[closer]
+        indices[closer, 0] = columns.start + j[closer]
+        return
+    # Only distances below the current k-th best can enter.
+    below = tile < distances[:, k - 1, np.newaxis]
+    n_below = np.count_nonzero(below)
+    if n_below == 0:
+        return
+    if n_below > tile.size // 8 and tile.shape[1] > k:
+        # many candidates (e.g. in the first tile): take the k best of the
+        # tile, then merge them with the k best so far
+        best = np.argpartition(tile, k - 1, axis=1)[:, :k]
+        candidates = np.concatenate(
+            [distances, np.take_along_axis(tile, best, axis=1)], axis=1)
+        candidate_indices = np.concatenate([indices, columns.start + best],
+                                           axis=1)
+        affected = slice(None)
+    else:
+        # few candidates: gather them into a small padded array
+        rows, cols = np.nonzero(below)
+        counts = np.bincount(rows, minlength=len(tile))
+        affected = np.flatnonzero(counts)
+        # rank of each candidate within its row (np.nonzero is row-major)
+        starts = np.cumsum(counts) - counts
+        rank = np.arange(len(rows)) - starts[rows]
+        slot = (np.cumsum(counts > 0) - 1)[rows]
+        width = k + counts.max()
+        candidates = np.full((len(affected), width), np.inf,
+                             dtype=distances.dtype)
+        candidate_indices = np.full((len(affected), width), -1,
+                                    dtype=np.int64)
+        candidates[:, :k] = distances[affected]
+        candidate_indices[:, :k] = indices[affected]
+        candidates[slot, k + rank] = tile[rows, cols]
+        candidate_indices[slot, k + rank] = columns.start + cols
+    best = np.argpartition(candidates, k - 1, axis=1)[:, :k]
+    distances[affected] = np.take_along_axis(candidates, best, axis=1)
+    indices[affected] = np.take_along_axis(candidate_indices, best, axis=1)
+
+
+def _k_nearest_rows(X, Y, k, metric, dtype, memory, exclude_self,
+                    rows=None, prepared=None):
+    """k nearest rows of `Y` (or of `X` if `Y` is None) to the rows `rows`
+    of `X` (by default all of them). `prepared` is passed to
+    `distance_tiles`."""
+    first, last, _ = (rows or slice(0, len(X))).indices(len(X))
+    # squared distances have the same order, and skip the square roots
+    squared = metric == "euclidean"
+    if squared:
+        metric = "sqeuclidean"
+    distances = np.full((last - first, k), np.inf, dtype=dtype)
+    indices = np.full((last - first, k), -1, dtype=np.int64)
+    for block, columns, tile in distance_tiles(X, Y, metric, dtype, memory,
+                                               rows=rows, prepared=prepared):
+        if Y is None and exclude_self:
+            diagonal = np.arange(max(block.start, columns.start),
+                                 min(block.stop, columns.stop))
+            tile[diagonal - block.start, diagonal - columns.start] = np.inf
+        local = slice(block.start - first, block.stop - first)
+        _merge_best(distances[local], indices[local], tile, columns, k)
+    # sort each row by distance, then by position
+    order = np.lexsort((indices, distances), axis=1)
+    distances = np.take_along_axis(distances, order, axis=1)
+    indices = np.take_along_axis(indices, order, axis=1)
+    indices[np.isinf(distances)] = -1
+    if squared:
+        np.sqrt(distances, out=distances)
+    return distances, indices
+
+
+def k_nearest(X, Y=None, k=1, metric="euclidean", dtype=np.float64,
+              memory=MEMORY, exclude_self=True):
+    """The `k` nearest observations of `Y` to each observation of `X`.
+
+    Parameters
+    ----------
+    X : array-like, shape (n, p)
+        Observations to find neighbors for.
+    Y : array-like, shape (m, p), optional
+        Observations to search. Defaults to `X`.
+    k : int
+        Number of neighbors.
+    metric, dtype, memory
+        As in `distances.distance_tiles`.
+    exclude_self : bool
+        When `Y` is None or `X` itself, do not count an observation as its
+        own neighbor (like setting the diagonal of the distance matrix to
+        NaN).
+
+    Returns
+    -------
+    distances : ndarray, shape (n, k)
+        Distances to the neighbors, nearest first.
+    indices : ndarray, shape (n, k)
+        Positions of the neighbors in `Y`. If there are fewer than `k`
+        candidates, the rest are -1 (with distance inf).
+
+    Ties at the `k`-th place are broken arbitrarily, except for `k=1`,
+    where the first of the tied observations is chosen, as by `idxmin`.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    if Y is X:
+        Y = None
+    return _k_nearest_rows(X, Y, k, metric, dtype, memory, exclude_self)
+
+
+def nearest_other(X, metric="euclidean", dtype=np.float64, memory=MEMORY):
+    """Distance to, and label of, the nearest other observation.
+
+    The same as `D.min()` and `D.idxmin()` for the distance matrix `D` with
+    its diagonal set to NaN, in exercises 2 and 3 of section 4.3.
+
+    Returns
+    -------
+    DataFrame
+        Columns `distance` and `nearest`, indexed like `X`.
+
+    Examples
+    --------
+    >>> nearest_other(reds)
+    """
+    distances, indices = k_nearest(X, k=1, metric=metric, dtype=dtype,
+                                   memory=memory)
+    labels, _ = index_and_name(X)
+    if labels is None:
+        labels = pd.RangeIndex(len(X))
+    nearest = pd.Series(labels.take(np.maximum(indices[:, 0], 0)),
+                        index=labels).where(indices[:, 0] >= 0)
+    return pd.DataFrame({"distance": distances[:, 0], "nearest": nearest},
+                        index=labels)
@@ -0,0 +1,254 @@
+"""
+Distance computations spread over worker processes.
+
+The tiled kernels in `distances` use BLAS, which is multithreaded, for the
+Euclidean and cosine metrics, but the cityblock metric of section 4.1 (and
+all of the bookkeeping around the matrix products) runs in a single thread.
+`parallel_distances` splits the rows of the output into blocks and computes
+them in a pool of processes. The data is centered or normalized and copied
+into shared memory once, and every worker writes its rows of the result
+directly into a shared output, so neither the data nor the results are
+pickled. The output can be the dense matrix, a `CondensedDistances`
+(optionally in a file), or the `k` nearest neighbors of every observation.
+When threadpoolctl is installed, each worker runs BLAS in a single thread,
+so that the processes do not compete with BLAS threads for the same cores.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ._labels import index_and_name
+from .condensed import CondensedDistances
+from .distances import MEMORY, _prepare, distance_tiles, tile_shape
+from .neighbors import _k_nearest_rows
+
+OUTPUTS = ("dense", "condensed", "topk")
+
+# Each worker attaches to the shared arrays once, when it starts, rather
+# than receiving them with every task.
+_arrays = None
+_segments = None
+_blas_limits = None
+
+
+def _allocate(shape, dtype):
+    """A new shared memory segment, and an array of `shape` in it."""
+    dtype = np.dtype(dtype)
+    size = math.prod(shape) * dtype.itemsize
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    shared = np.ndarray(shape, dtype, buffer=segment.buf)
+    return segment, shared, ("shared", segment.name, shape, dtype.str)
+
+
+def _share(array):
+    """Copy an array into a new shared memory segment."""
+    segment, shared, spec = _allocate(array.shape, array.dtype)
+    shared[...] = array
+    return segment, shared, spec
+
+
+def _attach(spec):
+    """The array described by `spec`, and the segment that holds it."""
+    kind = spec[0]
+    if kind == "array":
+        return None, spec[1]
+    if kind == "file":
+        _, path, shape, dtype = spec
+        return None, np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+    _, name, shape, dtype = spec
+    segment = shared_memory.SharedMemory(name)
+    return segment, np.ndarray(shape, dtype, buffer=segment.buf)
+
+
+def _start_worker(specs):
+    global _blas_limits
+    # only the worker's own BLAS is limited, whether it was loaded in the
+    # worker or inherited from the parent by a fork
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        pass
+    else:
+        _blas_limits = threadpool_limits(1, user_api="blas")
+    _init_worker(specs)
+
+
+def _init_worker(specs):
+    global _arrays, _segments
+    if specs is None:
+        _arrays = _segments = None
+        return
+    _arrays, _segments = {}, []
+    for key, spec in specs.items():
+        segment, _arrays[key] = _attach(spec)
+        if segment is not None:
+            _segments.append(segment)
+
+
+def _prepared():
+    """The prepared arrays, in the order returned by `_prepare`."""
+    X = _arrays["X"]
+    x_aux = _arrays.get("x_aux")
+    return X, _arrays.get("Y", X), x_aux, _arrays.get("y_aux", x_aux)
+
+
+def _dense_task(rows, metric, dtype, memory):
+    out = _arrays["out"]
+    for block, columns, tile in distance_tiles(
+            _arrays["X"], _arrays.get("Y"), metric, dtype, memory,
+            rows=rows, prepared=_prepared()):
+        out[block, columns] = tile
+
+
+def _condensed_task(rows, metric, dtype, memory):
+    CondensedDistances.from_values(_arrays["out"]).fill(
+        _arrays["X"], metric, memory, rows, prepared=_prepared())
+
+
+def _topk_task(rows, metric, dtype, memory, k, exclude_self):
+    distances, indices = _k_nearest_rows(
+        _arrays["X"], _arrays.get("Y"), k, metric, dtype, memory,
+        exclude_self, rows, prepared=_prepared())
+    _arrays["distances"][rows] = distances
+    _arrays["indices"][rows] = indices
+
+
+def _row_blocks(n, m, dtype, memory, n_jobs):
+    """Blocks of rows, a few per worker so that they balance each other."""
+    height, _ = tile_shape(n, m, dtype, memory)
+    height = max(min(height, math.ceil(n / (4 * n_jobs))), 1)
+    return [slice(start, min(start + height, n))
+            for start in range(0, n, height)]
+
+
+def parallel_distances(X, Y=None, metric="euclidean", output="dense", k=1,
+                       dtype=np.float64, memory=MEMORY, n_jobs=None,
+                       path=None, exclude_self=True):
+    """Distances between observations, computed by a pool of processes.
+
+    Parameters
+    ----------
+    X, Y, metric, dtype, memory
+        As in `distances.distance_tiles`; `memory` is the size of one tile
+        in each worker.
+    output : {"dense", "condensed", "topk"}
+        What to compute: the full matrix, as in `distance_matrix`; the
+        upper triangle, as in `CondensedDistances` (requires `Y` to be
+        None); or the `k` nearest neighbors, as in `k_nearest`.
+    k : int
+        Number of neighbors, for `output="topk"`.
+    n_jobs : int, optional
+        Number of worker processes. Defaults to the number of CPUs; use 1 to
+        compute everything in the current process.
+    path : str, optional
+        File for the dense or condensed matrix, which the workers then
+        write to directly instead of to shared memory. The result is then
+        a `np.memmap` of the file.
+    exclude_self : bool
+        For `output="topk"` with `Y` None or `X`, as in `k_nearest`.
+
+    Returns
+    -------
+    ndarray, CondensedDistances or (distances, indices)
+
+    Examples
+    --------
+    >>> D = parallel_distances(reds, metric="cityblock", output="condensed")
+    >>> D.idxmin()
+    """
+    if output not in OUTPUTS:
+        raise ValueError("output must be one of %s" % (OUTPUTS,))
+    if Y is X:
+        Y = None
+    if output == "condensed" and Y is not None:
+        raise ValueError("output='condensed' requires Y to be None")
+    labels, _ = index_and_name(X)
+    dtype = np.dtype(dtype)
+    # center or normalize once here, rather than once per task
+    X, prepared_Y, x_aux, y_aux = _prepare(X, Y, metric, dtype)
+    inputs = {"X": X}
+    if x_aux is not None:
+        inputs["x_aux"] = x_aux
+    if Y is not None:
+        inputs["Y"] = prepared_Y
+        if y_aux is not None:
+            inputs["y_aux"] = y_aux
+    n, m = len(X), len(prepared_Y)
+
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    blocks = _row_blocks(n, m, dtype, memory, n_jobs)
+    n_jobs = min(n_jobs, len(blocks))
+
+    condensed = None
+    if output == "dense":
+        if path is not None and n * m:
+            out = np.memmap(path, dtype=dtype, mode="w+", shape=(n, m))
+        else:
+            out = np.empty((n, m), dtype=dtype)
+        outputs = {"out": out}
+        task, arguments = _dense_task, (metric, dtype, memory)
+    elif output == "condensed":
+        condensed = CondensedDistances(n, labels, dtype, path)
+        outputs = {"out": condensed.values}
+        task, arguments = _condensed_task, (metric, dtype, memory)
+    else:
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        outputs = {"distances": np.empty((n, k), dtype=dtype),
+                   "indices": np.empty((n, k), dtype=np.int64)}
+        task, arguments = _topk_task, (metric, dtype, memory, k,
+                                       exclude_self)
+
+    if n_jobs <= 1:
+        _init_worker({key: ("array", array)
+                      for key, array in {**inputs, **outputs}.items()})
+        try:
+            for rows in blocks:
+                task(rows, *arguments)
+        finally:
+            _init_worker(None)
+    else:
+        segments, shared, specs = [], {}, {}
+        try:
+            for key, array in {**inputs, **outputs}.items():
+                if isinstance(array, np.memmap) and array.size:
+                    array.flush()
+                    specs[key] = ("file", array.filename, array.shape,
+                                  array.dtype.str)
+                    continue
+                # the workers fill every entry of the outputs, so only the
+                # inputs are copied in
+                if key in outputs:
+                    segment, shared[key], specs[key] = _allocate(
+                        array.shape, array.dtype)
+                else:
+                    segment, shared[key], specs[key] = _share(array)
+                segments.append(segment)
+            with ProcessPoolExecutor(n_jobs, initializer=_start_worker,
+                                     initargs=(specs,)) as pool:
+                list(pool.map(task, blocks,
+                              *[[argument] * len(blocks)
+                                for argument in arguments]))
+            # copy the results out of shared memory before it is released
+            for key, array in outputs.items():
+                if key in shared:
+                    array[...] = shared[key]
+        finally:
+            shared.clear()
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    if output == "dense":
+        if isinstance(outputs["out"], np.memmap):
+            outputs["out"].flush()
+        return outputs["out"]
+    if output == "condensed":
+        condensed._nearest = None
+        return condensed
+    return outputs["distances"], outputs["indices"]
@@ -0,0 +1,254 @@
+"""
+Parsing dirty numeric strings such as `"$1,250,000"`, `"12.5%"` and `"(300)"`.
+
+In the Shark Tank lab, `Amount` and `Equity` are read in as strings and
+cleaned with a chain of `.str` calls, each of which makes another pass over
+the column and allocates another array of Python strings. Here the strings
+are copied once into a fixed-width character matrix, and the digits are
+validated and accumulated with vectorized operations on the character codes.
+"""
+
+import numpy as np
+import pandas as pd
+
+CURRENCY_SYMBOLS = "$€£¥"
+
+# Longest string the grammar can accept once surrounding whitespace is
+# removed: parentheses, sign, currency, 18 digits with their thousands
+# separators, a decimal point and a percent sign, plus some inner spaces.
+# Longer strings are rejected before the character matrix is built, because
+# its width is that of the longest string in the chunk.
+_MAX_LENGTH = 40
+
+# character classes
+(_PAD, _DIGIT, _DOT, _COMMA, _CURRENCY, _PERCENT, _SIGN, _LPAREN, _RPAREN,
+ _OTHER) = range(10)
+_N_CLASSES = 10
+
+# parser states
+(_START, _SIGNED, _CURRENCIED, _PREFIXED, _INTEGER, _POINT, _FRACTION,
+ _SUFFIX, _ERROR) = range(9)
+
+
+def _class_table():
+    """Lookup table from ASCII code points to character classes."""
+    table = np.full(129, _OTHER, dtype=np.int8)
+    table[[0, ord(" "), ord("\t")]] = _PAD
+    table[ord("0"):ord("9") + 1] = _DIGIT
+    for char, cls in [(".", _DOT), (",", _COMMA), ("%", _PERCENT),
+                      ("-", _SIGN), ("+", _SIGN), ("(", _LPAREN),
+                      (")", _RPAREN)]:
+        table[ord(char)] = cls
+    for char in CURRENCY_SYMBOLS:
+        if ord(char) < 128:
+            table[ord(char)] = _CURRENCY
+    return table
+
+
+def _transition_table():
+    """State machine for `[sign or "("] [currency] digits [. digits] [")"] [%]`.
+
+    The sign and the currency symbol may come in either order, and whitespace
+    is allowed around every part except inside the digits. Parentheses and
+    percent signs are counted separately, because their order at the end is
+    not checked here.
+    """
+    table = np.full((_ERROR + 1, _N_CLASSES), _ERROR, dtype=np.int8)
+    prefix = {_START: (_SIGNED, _CURRENCIED), _SIGNED: (_ERROR, _PREFIXED),
+              _CURRENCIED: (_PREFIXED, _ERROR), _PREFIXED: (_ERROR, _ERROR)}
+    for state, (after_sign, after_currency) in prefix.items():
+        table[state, _PAD] = state
+        table[state, _SIGN] = table[state, _LPAREN] = after_sign
+        table[state, _CURRENCY] = after_currency
+        table[state, _DIGIT] = _INTEGER
+        table[state, _DOT] = _POINT
+    table[_INTEGER, [_DIGIT, _COMMA]] = _INTEGER
+    table[_INTEGER, _DOT] = _POINT
+    table[[_POINT, _FRACTION], _DIGIT] = _FRACTION
+    for state in (_INTEGER, _POINT, _FRACTION, _SUFFIX):
+        table[state, [_PAD, _RPAREN, _PERCENT]] = _SUFFIX
+    return table
+
+
+_CLASS_TABLE = _class_table()
+_TRANSITIONS = _transition_table().ravel()
+_NON_ASCII_CURRENCY = [ord(c) for c in CURRENCY_SYMBOLS if ord(c) >= 128]
+
+
+def _classify(codes):
+    """Map an array of Unicode code points to character classes."""
+    # code point 128 stands for every non-ASCII character
+    classes = _CLASS_TABLE[np.minimum(codes, 128)]
+    non_ascii = codes >= 128
+    if non_ascii.any():
+        classes[non_ascii & np.isin(codes, _NON_ASCII_CURRENCY)] = _CURRENCY
+    return classes
+
+
+def _parse_chunk(text, percent):
+    """Parse an array of strings, returning values and validity/blank masks.
+
+    The character matrix is walked one column at a time, so every step is a
+    vectorized update of the parser state of all rows at once.
+    """
+    n = len(text)
+    width = max(text.dtype.itemsize // 4, 1)
+    columns = np.ascontiguousarray(text).view(np.uint32).reshape(n, width).T
+    columns = np.ascontiguousarray(columns)
+
+    state = np.full(n, _START, dtype=np.int8)
+    mantissa = np.zeros(n, dtype=np.int64)
+    n_digits = np.zeros(n, dtype=np.int32)
+    n_fraction = np.zeros(n, dtype=np.int32)
+    negative = np.zeros(n, dtype=bool)
+    n_lparen = np.zeros(n, dtype=np.int32)
+    n_rparen = np.zeros(n, dtype=np.int32)
+    n_percent = np.zeros(n, dtype=np.int32)
+    # The state machine lets commas anywhere in the integer part, so the
+    # digits between them are counted here: 1 to 3 before the first comma,
+    # and exactly 3 after each one.
+    n_commas = np.zeros(n, dtype=np.int32)
+    group = np.zeros(n, dtype=np.int32)
+    misgrouped = np.zeros(n, dtype=bool)
+    for codes in columns:
+        classes = _classify(codes)
+        state = _TRANSITIONS[state * _N_CLASSES + classes]
+        digit = classes == _DIGIT
+        mantissa = np.where(digit, mantissa * 10 + (codes - ord("0")),
+                            mantissa)
+        n_digits += digit
+        n_fraction += digit & (state == _FRACTION)
+        negative |= codes == ord("-")
+        n_lparen += classes == _LPAREN
+        n_rparen += classes == _RPAREN
+        n_percent += classes == _PERCENT
+        comma = classes == _COMMA
+        misgrouped |= comma & np.where(n_commas > 0, group != 3,
+                                       (group == 0) | (group > 3))
+        n_commas += comma
+        group = np.where(comma, 0, group + (digit & (state == _INTEGER)))
+    misgrouped |= (n_commas > 0) & (group != 3)
+
+    valid = ((state >= _INTEGER) & (state <= _SUFFIX)
+             & (n_digits > 0) & (n_digits <= 18)
+             & (n_lparen == n_rparen) & (n_percent <= 1) & ~misgrouped)
+
+    scale = 10.0 ** n_fraction
+    if percent == "fraction":
+        scale[n_percent > 0] *= 100
+    values = mantissa / scale
+    negative |= n_lparen > 0
+    values[negative] = -values[negative]
+    values[~valid] = np.nan
+    return values, valid, state == _START
+
+
+def parse_numeric(values, percent="strip", na_value=np.nan,
+                  errors="raise", chunksize=1_000_000):
+    """Convert currency and percentage strings to numbers in one pass.
+
+    Understands leading currency symbols (`$`, `€`, `£`, `¥`), thousands
+    separators (every three digits), a leading `+` or `-`, accounting
+    negatives written in parentheses and a trailing `%`. Surrounding
+    whitespace is ignored.
+
+    Parameters
+    ----------
+    values : Series, array-like
+        Strings to parse. Missing values (`None`, `NaN`) and empty strings
+        are treated as null. Values that are already numeric are only
+        converted to float, and strings of more than 40 characters are
+        never numbers.
+    percent : {"strip", "fraction"}
+        Whether `"12.5%"` becomes `12.5` (the default, like
+        `.str[:-1].astype(float)`) or `0.125`.
+    na_value : scalar
+        Value to use for nulls, e.g. `0` to match `.fillna("$0")`.
+    errors : {"raise", "coerce"}
+        If "raise", a `ValueError` listing the offending entries is raised
+        when any non-null string cannot be parsed. If "coerce", such entries
+        become NaN.
+    chunksize : int
+        Number of strings converted at a time. Bounds the size of the
+        character matrix for very large columns.
+
+    Returns
+    -------
+    Series or ndarray
+        float64 values. A Series (with the same index and name) is returned
+        if `values` is a Series.
+
+    Examples
+    --------
+    >>> parse_numeric(pd.Series(["$1,250,000", "12.5%", "(300)", None]))
+    0    1250000.0
+    1         12.5
+    2       -300.0
+    3          NaN
+    dtype: float64
+    """
+    if percent not in ("strip", "fraction"):
+        raise ValueError("percent must be 'strip' or 'fraction'")
+    if errors not in ("raise", "coerce"):
+        raise ValueError("errors must be 'raise' or 'coerce'")
+
+    series = values if isinstance(values, pd.Series) else None
+    if series is None:
+        values = np.asarray(values)
+    array = values if series is None else series.to_numpy()
+    # numbers may also come as objects, e.g. floats mixed with None
+    numeric = pd.api.types.is_numeric_dtype(values.dtype) or (
+        array.dtype.kind == "O" and len(array) > 0
+        and pd.api.types.infer_dtype(array, skipna=True)
+        in ("integer", "floating", "mixed-integer-float", "boolean"))
+    if numeric:
+        # already numbers: formatting them as strings would only lose
+        # precision or produce exponents such as "1e-07"
+        result = pd.Series(values).to_numpy(dtype=float, na_value=na_value)
+        if series is not None:
+            return pd.Series(result, index=series.index, name=series.name)
+        return result
+
+    strings = np.asarray(values, dtype=object)
+    null = pd.isna(strings)
+    strings = np.where(null, "", strings)
+
+    # A single long value would make the character matrix of its whole
+    # chunk that wide, so values the grammar cannot accept are set aside.
+    text = strings
+    too_long = np.zeros(len(strings), dtype=bool)
+    lengths = np.fromiter(map(len, map(str, strings)), dtype=np.int64,
+                          count=len(strings))
+    long = np.flatnonzero(lengths > _MAX_LENGTH)
+    if len(long):
+        text = strings.copy()
+        for i in long:
+            stripped = str(strings[i]).strip()
+            too_long[i] = len(stripped) > _MAX_LENGTH
+            text[i] = "" if too_long[i] else stripped
+
+    n = len(strings)
+    result = np.empty(n, dtype=float)
+    invalid = np.zeros(n, dtype=bool)
+    for start in range(0, n, chunksize):
+        chunk = slice(start, start + chunksize)
+        parsed, valid, blank = _parse_chunk(text[chunk].astype(str),
+                                            percent)
+        result[chunk] = parsed
+        invalid[chunk] = ~valid
+        null[chunk] |= blank
+    null &= ~too_long
+    invalid |= too_long
+    invalid &= ~null
+
+    if invalid.any() and errors == "raise":
+        positions = np.flatnonzero(invalid)
+        examples = ", ".join(repr(strings[i]) for i in positions[:5])
+        raise ValueError(
+            "could not parse %d value(s) as numbers, e.g. %s at positions %s"
+            % (len(positions), examples, positions[:5].tolist()))
+    result[null] = na_value
+
+    if series is not None:
+        return pd.Series(result, index=series.index, name=series.name)
+    return result
@@ -0,0 +1,114 @@
+"""
+Recoding categorical variables through their integer codes.
+
+Section 1.4 recodes `Heating QC` with `.map({...})` and builds indicator
+columns for `Utilities` with one `==` comparison per category. Both look up
+every row's string in a dictionary or compare it with a string. Here the
+column is reduced to integer codes and a short list of categories (for a
+column of dtype `category` this is free). Only the categories are mapped,
+and the result for every row is gathered through its code.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ._labels import index_and_name, series_like
+
+
+def _codes(values):
+    """Integer codes (-1 for missing) and categories of a column."""
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    if not isinstance(values, pd.Series):
+        values = np.asarray(values)
+    codes, categories = pd.factorize(values)
+    return codes, pd.Index(categories)
+
+
+def recode(values, mapping, categorical=True):
+    """Replace each value by `mapping[value]`, like `values.map(mapping)`.
+
+    Parameters
+    ----------
+    values : Series or array-like
+        Column to recode.
+    mapping : dict, Series or function
+        New value of each category. Categories that are not in the mapping
+        become missing, as with `.map()`.
+    categorical : bool
+        Return a categorical column (whose categories are the distinct new
+        values), or a column of the new values' own dtype.
+
+    Returns
+    -------
+    Series
+
+    Examples
+    --------
+    >>> recode(df["Heating QC"], {"Po": "Unacceptable", "Fa": "Unacceptable",
+    ...                           "TA": "Acceptable", "Gd": "Acceptable",
+    ...                           "Ex": "Acceptable"})
+    """
+    codes, categories = _codes(values)
+    mapped = categories.map(mapping)
+    new_codes, new_categories = pd.factorize(mapped)
+    if np.array_equal(new_codes, np.arange(len(categories))):
+        # A one-to-one mapping keeps every code: only the labels change.
+        gathered = codes
+    else:
+        # new code of each old category, plus an entry for missing (-1)
+        lookup = np.append(new_codes, -1).astype(codes.dtype)
+        gathered = lookup[codes]
+    if categorical:
+        result = pd.Categorical.from_codes(gathered, new_categories,
+                                           validate=False)
+    else:
+        result = pd.api.extensions.take(np.asarray(new_categories), gathered,
+                                        allow_fill=True)
+    return series_like(result, values)
+
+
+def indicators(values, categories=None, prefix=None, prefix_sep="_"):
+    """One boolean column per category, built in one pass over the codes.
+
+    Equivalent to `pd.DataFrame({c: values == c for c in categories})`, or
+    to `pd.get_dummies(values)` when `categories` is not given.
+
+    Parameters
+    ----------
+    values : Series or array-like
+        Categorical column.
+    categories : list, optional
+        Categories to make indicators for, in order. Defaults to all of
+        them, sorted.
+    prefix : str, optional
+        Prefix of the column names, as in `pd.get_dummies`.
+    prefix_sep : str
+        Separator between the prefix and the category.
+
+    Returns
+    -------
+    DataFrame
+
+    Examples
+    --------
+    >>> indicators(df["Utilities"], ["AllPub", "NoSewr", "NoSeWa"])
+    """
+    codes, all_categories = _codes(values)
+    if categories is None:
+        categories = all_categories.sort_values()
+    categories = pd.Index(categories)
+    # column of each existing category, or -1 if it gets no column
+    column_of = categories.get_indexer(all_categories)
+    columns = np.append(column_of, -1)[codes]
+    rows = np.flatnonzero(columns >= 0)
+    matrix = np.zeros((len(codes), len(categories)), dtype=bool)
+    matrix[rows, columns[rows]] = True
+
+    # the columns are the categories themselves, or strings if prefixed
+    names = categories
+    if prefix is not None:
+        names = [prefix + prefix_sep + str(category)
+                 for category in categories]
+    index, _ = index_and_name(values)
+    return pd.DataFrame(matrix, index=index, columns=names)
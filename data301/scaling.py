@@ -0,0 +1,199 @@
+"""
+Scaling variables with statistics collected in one pass.
+
+Section 4.1 standardizes, normalizes and min-max scales the Ames housing
+data with expressions such as
+
+    (housing_df_quant - housing_df_quant.mean()) / housing_df_quant.std()
+
+Each one scans the data again for its statistics and allocates a new
+`DataFrame` for every intermediate result. A `Scaler` collects the count,
+mean, sum of squared deviations, minimum and maximum of every column in a
+single pass, one chunk at a time if need be (combining chunks as in
+`moments`). Any of the three scalings can then be applied to the same or to
+new data, in place or into a preallocated array, such as a float32 buffer.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .moments import _numeric_values, _pool
+
+METHODS = ("standard", "l2", "minmax")
+
+
+class Scaler:
+    """Column statistics for standardizing, normalizing and min-max scaling.
+
+    Parameters
+    ----------
+    columns : list, optional
+        Columns to use. Defaults to the numeric columns of the first chunk.
+    ddof : int
+        Delta degrees of freedom of the standard deviation. The default of 1
+        matches `DataFrame.std()`.
+
+    Examples
+    --------
+    >>> scaler = Scaler().update(housing_df_quant)
+    >>> housing_df_std = scaler.transform(housing_df_quant)
+    >>> housing_df_norm = scaler.transform(housing_df_quant, "l2")
+    >>> housing_df_minmax = scaler.transform(housing_df_quant, "minmax")
+    """
+
+    def __init__(self, columns=None, ddof=1):
+        self.columns = None if columns is None else list(columns)
+        self.ddof = ddof
+        self._n = None
+        self._mean = None
+        self._m2 = None
+        self._min = None
+        self._max = None
+
+    def _combine(self, n, mean, m2, minimum, maximum):
+        if self._n is None:
+            self._n, self._mean, self._m2 = n, mean, m2
+            self._min, self._max = minimum, maximum
+            return
+        self._n, self._mean, delta, weight = _pool(self._n, self._mean, n,
+                                                   mean)
+        self._m2 = self._m2 + m2 + delta ** 2 * weight
+        self._min = np.fmin(self._min, minimum)
+        self._max = np.fmax(self._max, maximum)
+
+    def update(self, chunk):
+        """Add a chunk of rows to the statistics (a partial fit).
+
+        Missing values are skipped, like the `pandas` reductions.
+        """
+        values, self.columns = _numeric_values(chunk, self.columns)
+        if not len(values):
+            return self
+        n = (~np.isnan(values)).sum(axis=0).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(n > 0, np.nansum(values, axis=0) / n, 0.0)
+        m2 = np.nansum((values - mean) ** 2, axis=0)
+        # fmin and fmax skip NaN, and give NaN for an all-missing column
+        self._combine(n, mean, m2, np.fmin.reduce(values, axis=0),
+                      np.fmax.reduce(values, axis=0))
+        return self
+
+    def merge(self, other):
+        """Add the statistics of another scaler over the same columns."""
+        if other._n is None:
+            return self
+        if self.columns is None:
+            self.columns = other.columns
+        elif list(self.columns) != list(other.columns):
+            raise ValueError("cannot merge scalers of different columns")
+        self._combine(other._n, other._mean, other._m2, other._min,
+                      other._max)
+        return self
+
+    @classmethod
+    def from_chunks(cls, chunks, columns=None, ddof=1):
+        """Accumulate every chunk of an iterable, such as a chunked reader."""
+        scaler = cls(columns, ddof)
+        for chunk in chunks:
+            scaler.update(chunk)
+        return scaler
+
+    def _check(self):
+        if self._n is None:
+            raise ValueError("no data has been accumulated")
+
+    def _series(self, values):
+        return pd.Series(values, index=self.columns)
+
+    def count(self):
+        """Number of non-missing values in each column."""
+        self._check()
+        return self._series(self._n.astype(np.int64))
+
+    def mean(self):
+        """Mean of each column."""
+        self._check()
+        return self._series(np.where(self._n > 0, self._mean, np.nan))
+
+    def std(self):
+        """Standard deviation of each column, with `ddof`."""
+        self._check()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.where(self._n > self.ddof,
+                           self._m2 / (self._n - self.ddof), np.nan)
+        return self._series(np.sqrt(var))
+
+    def norm(self):
+        """Euclidean length of each column, `np.sqrt((x ** 2).sum())`."""
+        self._check()
+        return self._series(np.sqrt(self._m2 + self._n * self._mean ** 2))
+
+    def min(self):
+        """Minimum of each column."""
+        self._check()
+        return self._series(self._min)
+
+    def max(self):
+        """Maximum of each column."""
+        self._check()
+        return self._series(self._max)
+
+    def parameters(self, method="standard"):
+        """The shift and the scale of each column, for `(x - shift) / scale`.
+
+        A scale of 0 (a constant column) is replaced by 1, so that the
+        column becomes 0 rather than NaN.
+        """
+        if method not in METHODS:
+            raise ValueError("method must be one of %s" % (METHODS,))
+        self._check()
+        if method == "standard":
+            shift, scale = self.mean().to_numpy(), self.std().to_numpy()
+        elif method == "l2":
+            shift, scale = np.zeros(len(self.columns)), self.norm().to_numpy()
+        else:
+            shift = self._min
+            scale = self._max - self._min
+        scale = np.where(scale == 0, 1.0, scale)
+        return shift, scale
+
+    def transform(self, X, method="standard", out=None, dtype=np.float64,
+                  chunksize=100_000):
+        """Scale the columns of `X` with the accumulated statistics.
+
+        Parameters
+        ----------
+        X : DataFrame or ndarray
+            Data with the same columns (a `DataFrame` is matched by name).
+        method : {"standard", "l2", "minmax"}
+            Subtract the mean and divide by the standard deviation; divide
+            by the Euclidean length; or subtract the minimum and divide by
+            the range.
+        out : ndarray, optional
+            Array of shape (n, p) to write the result into. Pass `X` itself
+            (a float array) to scale it in place.
+        dtype : dtype
+            Type of the result when `out` is not given, e.g. np.float32.
+        chunksize : int
+            Number of rows converted at a time, which bounds the temporary
+            memory used when `X` is a `DataFrame`.
+
+        Returns
+        -------
+        DataFrame or ndarray
+            A `DataFrame` if `X` is one and `out` is not given, otherwise
+            `out`.
+        """
+        shift, scale = self.parameters(method)
+        frame = isinstance(X, pd.DataFrame)
+        values = X[self.columns] if frame else np.asarray(X)
+        result = np.empty(values.shape, dtype=dtype) if out is None else out
+        for start in range(0, len(values), chunksize):
+            rows = slice(start, start + chunksize)
+            chunk = values.iloc[rows].to_numpy(dtype=float, na_value=np.nan) \
+                if frame else values[rows]
+            np.subtract(chunk, shift, out=result[rows], casting="unsafe")
+            np.divide(result[rows], scale, out=result[rows], casting="unsafe")
+        if frame and out is None:
+            return pd.DataFrame(result, index=X.index, columns=self.columns)
+        return result
@@ -0,0 +1,346 @@
+"""
+Mergeable sketches that summarize a column in bounded memory.
+
+Exact quantiles need the whole column to be sorted. A `KLLSketch` keeps a
+small weighted sample instead, from which any quantile can be estimated
+with a rank error of about `epsilon`. Sketches built from different chunks,
+or in different processes, can be merged, and the merged sketch has the
+same error guarantee as one built in a single pass.
+
+The other sketches answer `value_counts` questions about columns with too
+many distinct values to count exactly: `SpaceSaving` finds the most common
+values, `CountMinSketch` estimates the count of any value, and
+`HyperLogLog` estimates the number of distinct values.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# capacity of each level shrinks by this factor below the top level
+_DECAY = 2 / 3
+
+
+class KLLSketch:
+    """Quantile sketch of Karnin, Lang and Liberty.
+
+    Items are kept in a stack of levels. An item at level h stands for 2**h
+    items of the input. When a level is over its capacity, it is sorted and
+    every other item (starting at a random offset) is promoted to the next
+    level, so the memory stays proportional to `k`.
+
+    Parameters
+    ----------
+    epsilon : float
+        Target rank error. A quantile estimate at rank q lies between the
+        true quantiles at ranks q - epsilon and q + epsilon, with about 99%
+        confidence. Ignored if `k` is given.
+    k : int, optional
+        Capacity of the top level. Larger is more accurate.
+    seed : int, optional
+        Seed of the random offsets, for reproducible sketches.
+    """
+
+    def __init__(self, epsilon=0.01, k=None, seed=None):
+        # empirically, the rank error of KLL is about 3.3 / k at 99%
+        if k is None:
+            k = max(int(math.ceil(3.3 / epsilon)), 8)
+        self.k = int(k)
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * _DECAY ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # an odd item out stays behind, so no weight is lost
+                keep = items[:len(items) % 2]
+                offset = self._rng.integers(2)
+                promoted = items[len(keep) + offset::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], promoted])
+                # a new top level changes the capacity of every level
+                level = 0 if level + 2 == len(self.levels) else level + 1
+            else:
+                level += 1
+
+    def update(self, values):
+        """Add an array of values. Missing values are ignored."""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += len(values)
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Add the items of another sketch to this one."""
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def weighted_items(self):
+        """The retained items, sorted, and the weight of each."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantile(self, q):
+        """Estimate one quantile, or an array of quantiles.
+
+        While nothing has been compacted yet, the quantiles are exact and
+        interpolated like `Series.quantile`.
+        """
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], q)
+        items, weights = self.weighted_items()
+        cumulative = np.cumsum(weights)
+        ranks = np.asarray(q, dtype=float) * cumulative[-1]
+        index = np.searchsorted(cumulative, ranks, side="left")
+        return items[np.minimum(index, len(items) - 1)]
+
+    def rank(self, value):
+        """Estimated fraction of the values that are at most `value`."""
+        items, weights = self.weighted_items()
+        if len(items) == 0:
+            return np.nan
+        at_most = np.searchsorted(items, value, side="right")
+        cumulative = np.concatenate([[0.], np.cumsum(weights)])
+        return cumulative[at_most] / cumulative[-1]
+
+    def __len__(self):
+        """Number of items retained (not the number of values added)."""
+        return sum(len(level) for level in self.levels)
+
+
+def hash_values(values):
+    """64-bit hashes of an array of values (strings, numbers, ...).
+
+    Uses `pd.util.hash_array`, which is vectorized and gives the same hash
+    for the same value in every process, so sketches built by different
+    workers can be merged.
+
+    Numbers are hashed by value, not by type: `1`, `1.0` and `True` have the
+    same hash, as they are the same key in `value_counts`. This matters for
+    chunked reads, where an integer column comes back as floats in every
+    chunk that has a missing value.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == "O" and len(values):
+        # e.g. a nullable integer index, or numbers of mixed types
+        kind = pd.api.types.infer_dtype(values, skipna=False)
+        if kind in ("integer", "floating", "mixed-integer-float",
+                    "boolean"):
+            values = values.astype(float)
+    if values.dtype.kind in "OUS":
+        return pd.util.hash_array(values.astype(object))
+    if values.dtype.kind in "biu":
+        return pd.util.hash_array(values.astype(np.int64))
+    if values.dtype.kind != "f":
+        return pd.util.hash_array(values)
+    values = values.astype(np.float64)
+    # integral floats are hashed as the integers they are equal to
+    integral = (np.floor(values) == values) & (np.abs(values) < 2.0 ** 63)
+    hashes = pd.util.hash_array(values)
+    hashes[integral] = pd.util.hash_array(values[integral].astype(np.int64))
+    return hashes
+
+
+def _bit_length(x):
+    """Number of bits needed to represent each unsigned 64-bit integer."""
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= (np.uint64(1) << np.uint64(shift))
+        length[high] += shift
+        x[high] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+class HyperLogLog:
+    """Distinct-count sketch of Flajolet, Fusy, Gandouet and Meunier.
+
+    The first `precision` bits of each hash choose one of `2**precision`
+    registers, and each register keeps the longest run of leading zeros seen
+    in the rest of the hash. The relative standard error of the estimate is
+    `1.04 / sqrt(2**precision)`, about 0.8% for the default of 14 bits, using
+    16 KB of memory however many values are added.
+    """
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        """Add values given by their 64-bit hashes."""
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        rest = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        rank = (64 - self.precision + 1 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def update(self, values):
+        """Add an array of values."""
+        return self.update_hashes(hash_values(values))
+
+    def merge(self, other):
+        """Combine with a sketch of the same precision."""
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def relative_error(self):
+        """Relative standard error of `estimate()`."""
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def estimate(self):
+        """Estimated number of distinct values."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m ** 2 / np.sum(2.0 ** -self.registers.astype(float))
+        empty = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and empty:
+            # linear counting is more accurate for small cardinalities
+            return m * np.log(m / empty)
+        return raw
+
+
+class CountMinSketch:
+    """Frequency sketch of Cormode and Muthukrishnan.
+
+    Each value is counted in one cell of each of `depth` rows of `width`
+    counters. The estimate of a count is the smallest of its cells. It never
+    underestimates, and it overestimates by at most `epsilon` times the total
+    count with probability at least `1 - delta`.
+    """
+
+    def __init__(self, epsilon=1e-4, delta=0.01):
+        self.width = int(np.ceil(np.e / epsilon))
+        self.depth = int(np.ceil(np.log(1 / delta)))
+        self.epsilon, self.delta = epsilon, delta
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, hashes):
+        # double hashing: row i uses h1 + i * h2
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, np.newaxis]
+        return ((h1 + rows * h2) % np.uint64(self.width)).astype(np.intp)
+
+    def update_hashes(self, hashes, counts=None):
+        """Add values given by their hashes, each `counts` times (default 1)."""
+        for row, columns in enumerate(self._columns(hashes)):
+            self.table[row] += np.bincount(columns, counts,
+                                           minlength=self.width).astype(
+                                               np.int64)
+        self.total += len(hashes) if counts is None else int(np.sum(counts))
+        return self
+
+    def update(self, values):
+        """Add an array of values."""
+        return self.update_hashes(hash_values(values))
+
+    def merge(self, other):
+        """Combine with a sketch of the same shape."""
+        if self.table.shape != other.table.shape:
+            raise ValueError("cannot merge sketches of different shapes")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    def estimate_hashes(self, hashes):
+        """Estimated counts of values given by their hashes."""
+        columns = self._columns(hashes)
+        return self.table[np.arange(self.depth)[:, np.newaxis],
+                          columns].min(axis=0)
+
+    def estimate(self, values):
+        """Estimated counts of an array of values."""
+        return self.estimate_hashes(hash_values(np.atleast_1d(values)))
+
+
+class SpaceSaving:
+    """Heavy-hitter summary of Metwally, Agrawal and El Abbadi.
+
+    Keeps `capacity` counters. Each counter has an estimated count, which
+    overestimates the true count by at most its `error`, and every error is
+    at most the total count divided by `capacity`. Every value that makes up
+    more than that fraction of the data is guaranteed to have a counter.
+
+    Chunks are counted exactly with `value_counts` and then merged into the
+    counters with the mergeable update of Agarwal et al. (2012), so a chunk
+    costs one hash aggregation instead of one step per value.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = int(capacity)
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+        self.total = 0
+
+    def _floor(self):
+        """Largest possible count of a value without a counter."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return int(self.counts.min())
+
+    def _merge_counts(self, counts, errors, floor, total):
+        own_floor = self._floor()
+        index = self.counts.index.union(counts.index, sort=False)
+        merged = (self.counts.reindex(index, fill_value=own_floor)
+                  + counts.reindex(index, fill_value=floor))
+        merged_errors = (
+            self.errors.reindex(index, fill_value=own_floor)
+            + errors.reindex(index, fill_value=floor))
+        if len(merged) > self.capacity:
+            merged = merged.nlargest(self.capacity, keep="first")
+        self.counts = merged.astype(np.int64)
+        self.errors = merged_errors.loc[merged.index].astype(np.int64)
+        self.total += total
+
+    def update_counts(self, counts):
+        """Add exact counts of a chunk, as returned by `value_counts`."""
+        self._merge_counts(counts, pd.Series(0, index=counts.index), 0,
+                           int(counts.sum()))
+        return self
+
+    def update(self, values):
+        """Add a chunk of values. Missing values are ignored."""
+        return self.update_counts(pd.Series(values).value_counts())
+
+    def merge(self, other):
+        """Combine with another summary."""
+        self._merge_counts(other.counts, other.errors, other._floor(),
+                           other.total)
+        return self
+
+    def top(self, k=10):
+        """The `k` largest counters, with their errors."""
+        counts = self.counts.nlargest(k, keep="first")
+        return pd.DataFrame({"count": counts,
+                             "error": self.errors.loc[counts.index]})
@@ -0,0 +1,212 @@
+"""
+Extracting fields from string columns without building Python lists.
+
+Section 1.2 extracts surnames with
+
+    df.name.str.split(", ", expand=True)[0]
+
+which creates a list of Python strings for every name, and then a column for
+every part, just to keep the first part. The functions in this module work
+on the whole column at once. With `pyarrow` installed, they run Arrow
+compute kernels over Arrow's contiguous string buffer. Otherwise they use
+NumPy's vectorized string functions (`np.strings`, NumPy 2.3 or later) on a
+fixed-width array.
+Either way, the result is a categorical (or Arrow) array, which stores each
+distinct string only once.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover
+    pa = pc = None
+
+from ._labels import index_and_name
+
+OUTPUTS = ("category", "arrow", "object")
+
+
+def _to_arrow(values):
+    """Arrow string array of `values`, without a copy if it is one already."""
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return values
+    if isinstance(values, pd.Series):
+        try:
+            return pa.array(values, from_pandas=True, type=pa.large_string())
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            values = values.astype(str).where(values.notna(), None)
+    return pa.array(values, from_pandas=True, type=pa.large_string())
+
+
+def _to_numpy(values):
+    """Fixed-width unicode array of `values` and the mask of missing ones."""
+    values = np.asarray(values, dtype=object)
+    missing = pd.isna(values)
+    return np.where(missing, "", values).astype(str), missing
+
+
+def _output(result, missing, output, index, name):
+    """Convert a result array to the requested kind of output."""
+    if output == "arrow":
+        if pa is None:
+            raise ImportError("output='arrow' requires pyarrow")
+        if not isinstance(result, (pa.Array, pa.ChunkedArray)):
+            result = pa.array(result, mask=missing)
+        return result
+    if pa is not None and isinstance(result, (pa.Array, pa.ChunkedArray)):
+        if pa.types.is_integer(result.type):
+            result = result.to_numpy(zero_copy_only=False)
+            return pd.Series(result, index=index, name=name)
+        if output == "category":
+            # Dictionary encoding stores each distinct string once.
+            encoded = pc.dictionary_encode(result)
+            if isinstance(encoded, pa.ChunkedArray):
+                encoded = encoded.combine_chunks()
+            codes = encoded.indices.fill_null(-1).to_numpy(
+                zero_copy_only=False)
+            categories = encoded.dictionary.to_pandas()
+            values = pd.Categorical.from_codes(
+                codes, pd.Index(categories).astype(object))
+            return pd.Series(values, index=index, name=name)
+        return pd.Series(result.to_pandas(), index=index, name=name)
+    if result.dtype.kind in "iu":
+        return pd.Series(result, index=index, name=name)
+    result = result.astype(object)
+    result[missing] = None
+    if output == "category":
+        return pd.Series(pd.Categorical(result), index=index, name=name)
+    return pd.Series(result, index=index, name=name)
+
+
+def _check_output(output):
+    if output not in OUTPUTS:
+        raise ValueError("output must be one of %s" % (OUTPUTS,))
+
+
+def count_separators(values, sep):
+    """Number of times `sep` occurs in each string.
+
+    The number of fields is one more, e.g. the number of languages in a
+    comma-separated list. Missing strings give -1.
+
+    Examples
+    --------
+    >>> count_separators(profiles.speaks, ",") + 1
+    """
+    index, name = index_and_name(values)
+    if pa is not None:
+        counts = pc.count_substring(_to_arrow(values), sep).fill_null(-1)
+        return _output(counts, None, "object", index, name)
+    strings, missing = _to_numpy(values)
+    counts = np.char.count(strings, sep)
+    counts[missing] = -1
+    return pd.Series(counts, index=index, name=name)
+
+
+def nth_field(values, sep, n=0, output="category"):
+    """The `n`-th field of each string, split on `sep`.
+
+    Equivalent to `values.str.split(sep, expand=True)[n]`, but without
+    materializing the other fields. Strings with fewer than `n + 1` fields,
+    and missing strings, give a missing value.
+
+    Parameters
+    ----------
+    values : Series or array-like
+        Strings to split.
+    sep : str
+        Separator (not a regular expression).
+    n : int
+        Index of the field to keep. Negative values count from the end.
+    output : {"category", "arrow", "object"}
+        Return a categorical Series, an Arrow array, or a Series of Python
+        strings.
+
+    Examples
+    --------
+    >>> surnames = nth_field(df.name, ", ", 0)
+    >>> surnames.value_counts()
+    """
+    _check_output(output)
+    index, name = index_and_name(values)
+    if pa is not None:
+        strings = _to_arrow(values)
+        if n >= 0:
+            parts = pc.split_pattern(strings, sep, max_splits=n + 1)
+        else:
+            parts = pc.split_pattern(strings, sep, max_splits=-n,
+                                     reverse=True)
+        lengths = pc.list_value_length(parts)
+        position = n if n >= 0 else pc.add(lengths, n)
+        valid = pc.and_(pc.less(position, lengths),
+                        pc.greater_equal(position, 0))
+        # pick element `position` of each list from the flattened values
+        flat = pc.list_flatten(parts)
+        counts = lengths.fill_null(0).to_numpy(zero_copy_only=False)
+        starts = np.cumsum(counts) - counts
+        take = pc.if_else(valid, pc.add(pa.array(starts), position), None)
+        result = pc.take(flat, take)
+        return _output(result, None, output, index, name)
+
+    strings, missing = _to_numpy(values)
+    if n < 0:
+        raise ValueError("negative n requires pyarrow")
+    start = np.zeros(len(strings), dtype=np.int64)
+    found = ~missing
+    for _ in range(n):
+        position = np.char.find(strings, sep, start)
+        found &= position >= 0
+        start = np.where(found, position + len(sep), 0)
+    end = np.char.find(strings, sep, start)
+    end = np.where(end >= 0, end, np.char.str_len(strings))
+    result = np.strings.slice(strings, start, end)
+    return _output(result, ~found, output, index, name)
+
+
+def extract_group(values, pattern, group=1, output="category"):
+    """The text matched by a group of a regular expression in each string.
+
+    Equivalent to `values.str.extract(pattern, expand=False)` for one group.
+    Strings that do not match give a missing value.
+
+    Parameters
+    ----------
+    values : Series or array-like
+        Strings to search.
+    pattern : str
+        Regular expression (RE2 syntax with pyarrow).
+    group : int or str
+        Number or name of the group to return.
+    output : {"category", "arrow", "object"}
+        As in `nth_field`.
+
+    Examples
+    --------
+    >>> # "agnosticism and very serious about it" -> "very serious"
+    >>> extract_group(profiles.religion, r"and (\\w+ ?\\w*) about it")
+    """
+    _check_output(output)
+    index, name = index_and_name(values)
+    if pa is not None:
+        number = group if isinstance(group, int) \
+            else re.compile(pattern).groupindex[group]
+        strings = _to_arrow(values)
+        matched = pc.match_substring_regex(strings, pattern)
+        # replace the whole string by the group of the leftmost match
+        replaced = pc.replace_substring_regex(
+            strings, r"(?s)^.*?(?:%s).*$" % pattern, "\\%d" % number)
+        result = pc.if_else(matched, replaced, pa.scalar(None, replaced.type))
+        return _output(result, None, output, index, name)
+
+    extracted = pd.Series(values).str.extract(pattern, expand=True)
+    column = extracted.iloc[:, group - 1] if isinstance(group, int) \
+        else extracted[group]
+    result = column.to_numpy(dtype=object)
+    missing = pd.isna(result)
+    return _output(np.where(missing, "", result).astype(str), missing,
+                   output, index, name)
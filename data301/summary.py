@@ -0,0 +1,158 @@
+"""
+Summary statistics of a numeric column that arrives in chunks.
+
+Section 1.2 summarizes a column with `describe()`, `median()`,
+`quantile(.75)`, the IQR and the mean and median absolute deviations, all
+computed on the fully loaded column. A `SummaryAccumulator` is fed one chunk
+at a time. It keeps the count, mean, variance, minimum and maximum exactly
+(combining chunks as in `moments`), and a `KLLSketch` for the quantiles.
+Accumulators from different worker processes can be merged, so a column of
+any length is summarized in one streaming pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .moments import _pool
+from .sketches import KLLSketch
+
+
+class SummaryAccumulator:
+    """Mergeable running summary of a numeric column.
+
+    Parameters
+    ----------
+    epsilon : float
+        Rank error of the quantile estimates, see `KLLSketch`.
+    seed : int, optional
+        Seed of the sketch, for reproducible results.
+
+    Examples
+    --------
+    >>> summary = SummaryAccumulator()
+    >>> for chunk in pd.read_csv("titanic.csv", chunksize=100):
+    ...     summary.update(chunk.fare)
+    >>> summary.describe()
+    >>> summary.median(), summary.quantile(.75), summary.iqr()
+    """
+
+    def __init__(self, epsilon=0.01, seed=None):
+        self.name = None
+        self.count = 0
+        self.n_missing = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+        self.sketch = KLLSketch(epsilon, seed=seed)
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        self.count, mean, delta, weight = _pool(self.count, self._mean, count,
+                                                mean)
+        self._mean = float(mean)
+        self._m2 += m2 + float(delta ** 2 * weight)
+        self._min = min(self._min, minimum)
+        self._max = max(self._max, maximum)
+
+    def update(self, values):
+        """Add a chunk of values. Missing values are counted and skipped."""
+        if self.name is None:
+            self.name = getattr(values, "name", None)
+        values = np.asarray(values, dtype=float).ravel()
+        missing = np.isnan(values)
+        self.n_missing += int(missing.sum())
+        values = values[~missing]
+        if len(values):
+            mean = values.mean()
+            self._combine(len(values), mean, ((values - mean) ** 2).sum(),
+                          values.min(), values.max())
+            self.sketch.update(values)
+        return self
+
+    def merge(self, other):
+        """Add the statistics of another accumulator to this one."""
+        if self.name is None:
+            self.name = other.name
+        self.n_missing += other.n_missing
+        if other.count:
+            self._combine(other.count, other._mean, other._m2,
+                          other._min, other._max)
+            self.sketch.merge(other.sketch)
+        return self
+
+    @classmethod
+    def from_chunks(cls, chunks, epsilon=0.01, seed=None):
+        """Accumulate every chunk of an iterable."""
+        accumulator = cls(epsilon, seed)
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return accumulator
+
+    # exact statistics
+
+    def mean(self):
+        return self._mean if self.count else np.nan
+
+    def var(self, ddof=1):
+        return self._m2 / (self.count - ddof) if self.count > ddof else np.nan
+
+    def std(self, ddof=1):
+        return np.sqrt(self.var(ddof))
+
+    def min(self):
+        return self._min if self.count else np.nan
+
+    def max(self):
+        return self._max if self.count else np.nan
+
+    # approximate statistics, from the sketch
+
+    def quantile(self, q=.5):
+        """Estimated quantile(s), within `epsilon` in rank."""
+        if np.ndim(q):
+            return pd.Series(self.sketch.quantile(q), index=q, name=self.name)
+        return float(self.sketch.quantile(q))
+
+    def median(self):
+        return self.quantile(.5)
+
+    def iqr(self):
+        """Estimated interquartile range."""
+        lower, upper = self.sketch.quantile([.25, .75])
+        return upper - lower
+
+    def mean_absolute_deviation(self):
+        """Estimated mean absolute deviation from the (exact) mean.
+
+        Computed from the weighted items kept by the sketch.
+        """
+        items, weights = self.sketch.weighted_items()
+        if not len(items):
+            return np.nan
+        return np.average(np.abs(items - self._mean), weights=weights)
+
+    def median_absolute_deviation(self):
+        """Estimated median absolute deviation from the median.
+
+        Computed from the weighted items kept by the sketch, like
+        `(x - x.median()).abs().median()`.
+        """
+        items, weights = self.sketch.weighted_items()
+        if not len(items):
+            return np.nan
+        deviations = np.abs(items - self.median())
+        order = np.argsort(deviations)
+        cumulative = np.cumsum(weights[order])
+        middle = np.searchsorted(cumulative, cumulative[-1] / 2)
+        return deviations[order][middle]
+
+    def describe(self, percentiles=(.25, .5, .75)):
+        """Summary like `Series.describe()`; the percentiles are estimates."""
+        quantiles = self.sketch.quantile(list(percentiles))
+        labels = ["%g%%" % (100 * p) for p in percentiles]
+        return pd.Series(
+            [self.count, self.mean(), self.std(), self.min()]
+            + list(np.atleast_1d(quantiles)) + [self.max()],
+            index=["count", "mean", "std", "min"] + labels + ["max"],
+            name=self.name,
+        )
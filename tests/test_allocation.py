@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from data301.allocation import allocate_equal_split, split_amount
+
+SHARKS = ["Cuban", "Greiner", "John"]
+
+
+def deals():
+    return pd.DataFrame({
+        "Company": ["a", "b", "b", "c", "d"],
+        "Amount": [300.0, 100.0, 100.0, 90.0, np.nan],
+        "Cuban": [1, 1, 1, 0, 1],
+        "Greiner": [1.0, 0.0, 0.0, np.nan, 1.0],
+        "John": [0, 1, 1, 0, 0],
+    })
+
+
+def reference(df, by=None):
+    if by is not None:
+        df = df.groupby(by).head(1)
+    totals = pd.Series(0.0, index=SHARKS)
+    for _, row in df.iterrows():
+        investors = [s for s in SHARKS if row[s] == 1]
+        for shark in investors:
+            totals[shark] += np.nan_to_num(row["Amount"]) / len(investors)
+    return totals
+
+
+def test_split_amount():
+    df = deals()
+    split = split_amount(df, "Amount", SHARKS)
+    assert split.index.equals(df.index)
+    np.testing.assert_allclose(split.loc[0], [150, 150, 0])
+    np.testing.assert_allclose(split.loc[3], [0, 0, 0])
+    np.testing.assert_allclose(split.sum(axis=1),
+                               [300, 100, 100, 0, 0])
+
+
+def test_allocate_equal_split_matches_loop():
+    df = deals()
+    pd.testing.assert_series_equal(
+        allocate_equal_split(df, "Amount", SHARKS), reference(df),
+        check_names=False)
+    pd.testing.assert_series_equal(
+        allocate_equal_split(df, "Amount", SHARKS, by="Company"),
+        reference(df, by="Company"), check_names=False)
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.altair_data import content_hash, to_local_file
+
+
+def test_content_hash():
+    df = pd.DataFrame({"x": [1, 2, 3], "y": ["a", "b", "c"]})
+    assert content_hash(df) == content_hash(df.copy())
+    assert content_hash(df) != content_hash(df.assign(x=[1, 2, 4]))
+    assert content_hash(df) != content_hash(df.astype({"x": float}))
+
+
+def test_to_local_file(tmp_path):
+    df = pd.DataFrame({"x": [1.5, 2.25], "flag": [True, False],
+                       "name": ["a", "b"]})
+    directory = str(tmp_path / "data")
+    spec = to_local_file(df, directory=directory)
+    assert spec["format"] == {"type": "csv",
+                              "parse": {"x": "number", "flag": "boolean"}}
+    path = os.path.join(directory, os.path.basename(spec["url"]))
+    pd.testing.assert_frame_equal(pd.read_csv(path), df)
+    # the same data is written once
+    assert to_local_file(df.copy(), directory=directory) == spec
+    assert os.listdir(directory) == [os.path.basename(spec["url"])]
+
+
+def test_values_and_urls(tmp_path):
+    directory = str(tmp_path)
+    spec = to_local_file({"values": [{"a": 1}, {"a": 2}]},
+                         directory=directory, url_prefix="files")
+    assert spec["url"].startswith("files/")
+    assert to_local_file({"url": "data.csv"}) == {"url": "data.csv"}
+
+
+def test_enable(tmp_path):
+    alt = pytest.importorskip("altair")
+    from data301 import altair_data
+    previous = alt.data_transformers.active
+    try:
+        altair_data.enable(directory=str(tmp_path))
+        spec = alt.Chart(pd.DataFrame({"x": np.arange(10)})).mark_point() \
+            .encode(x="x:Q").to_dict()
+        assert "url" in spec["data"]
+    finally:
+        alt.data_transformers.enable(previous)
+
+
+def test_floats_are_written_exactly(tmp_path):
+    df = pd.DataFrame({"x": [1234567.0, 0.1 + 0.2, 1e-300, -2.5e17]})
+    directory = str(tmp_path)
+    spec = to_local_file(df, directory=directory)
+    path = os.path.join(directory, os.path.basename(spec["url"]))
+    pd.testing.assert_frame_equal(pd.read_csv(path), df)
+    # rounding is opt-in, and goes to a file of its own
+    rounded = to_local_file(df, directory=directory, float_precision=3)
+    assert rounded["url"] != spec["url"]
+    path = os.path.join(directory, os.path.basename(rounded["url"]))
+    np.testing.assert_allclose(pd.read_csv(path)["x"], df["x"], rtol=1e-2)
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301 import association
+from data301.association import (STATISTICS, association_matrix,
+                                 chi_square, mutual_information,
+                                 total_variation)
+from data301.contingency import ContingencyTable
+
+
+def table(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    a = rng.choice(list("abc"), n)
+    df = pd.DataFrame({
+        "a": a,
+        "b": np.where(rng.random(n) < .7, a, rng.choice(list("abcd"), n)),
+        "c": rng.integers(0, 5, n).astype(float),
+        "d": rng.choice(["x", "y"], n),
+    })
+    df.loc[rng.random(n) < .1, "b"] = None
+    df.loc[rng.random(n) < .1, "c"] = np.nan
+    return df
+
+
+def reference(x, y, statistic):
+    """Section 3.2, with pd.crosstab."""
+    counts = pd.crosstab(x, y)
+    joint = counts / counts.sum().sum()
+    expected = np.outer(joint.sum(axis=1), joint.sum(axis=0))
+    joint = joint.to_numpy()
+    if statistic == "total_variation":
+        return np.abs(joint - expected).sum()
+    if statistic == "chi_square":
+        return ((joint - expected) ** 2 / expected).sum()
+    nonzero = joint > 0
+    return (joint[nonzero]
+            * np.log(joint[nonzero] / expected[nonzero])).sum()
+
+
+@pytest.mark.parametrize("statistic", STATISTICS)
+def test_association_matrix_matches_crosstab(statistic):
+    df = table()
+    matrix = association_matrix(df, statistic=statistic, n_jobs=1)
+    for x in df.columns:
+        for y in df.columns:
+            assert matrix.loc[x, y] == pytest.approx(
+                reference(df[x], df[y], statistic), abs=1e-12)
+
+
+def test_table_statistics():
+    df = table()
+    t = ContingencyTable(df["a"], df["b"])
+    assert total_variation(t) == pytest.approx(
+        reference(df["a"], df["b"], "total_variation"))
+    assert chi_square(t) == pytest.approx(
+        reference(df["a"], df["b"], "chi_square"))
+    assert mutual_information(t) == pytest.approx(
+        reference(df["a"], df["b"], "mutual_information"))
+
+
+def test_processes_match_serial():
+    df = table()
+    pd.testing.assert_frame_equal(association_matrix(df, n_jobs=2),
+                                  association_matrix(df, n_jobs=1))
+
+
+@pytest.mark.parametrize("statistic", STATISTICS)
+def test_id_column(statistic):
+    df = table(3000)
+    df["id"] = np.arange(len(df))
+    matrix = association_matrix(df, statistic=statistic, n_jobs=1)
+    for x in df.columns:
+        assert matrix.loc[x, "id"] == pytest.approx(
+            reference(df[x], df["id"], statistic), abs=1e-9)
+        assert matrix.loc["id", x] == matrix.loc[x, "id"]
+
+
+def test_blocks_are_bounded(monkeypatch):
+    df = table(3000)
+    df["id"] = np.arange(len(df))
+    df["half"] = np.arange(len(df)) // 2
+    expected = association_matrix(df, n_jobs=1)
+    monkeypatch.setattr(association, "_BLOCK_SIZE", 7000)
+    n_categories = np.array([df[c].nunique() + 1 for c in df.columns])
+    for i, js in association._tasks(n_categories, len(df)):
+        assert i not in js
+        cells = n_categories[i] * n_categories[js]
+        assert cells[cells <= len(df)].sum() <= 7000
+    pd.testing.assert_frame_equal(association_matrix(df, n_jobs=1),
+                                  expected)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.binning import Grid, auto_bins, binned_chart, binned_scatter
+
+
+def test_counts_match_histogram2d():
+    rng = np.random.default_rng(0)
+    x, y = rng.normal(size=(2, 5000))
+    grid = Grid(x, y, bins=(20, 15))
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=(20, 15))
+    np.testing.assert_allclose(grid.x_edges, x_edges)
+    np.testing.assert_allclose(grid.y_edges, y_edges)
+    np.testing.assert_array_equal(grid.counts, counts)
+
+
+def test_means_and_range():
+    rng = np.random.default_rng(1)
+    x, y, c = rng.uniform(0, 10, size=(3, 2000))
+    x[::10] = np.nan
+    grid = Grid(x, y, values=c, bins=5, range=((0, 5), (0, 10)))
+    keep = ~np.isnan(x) & (x <= 5)
+    sums, _, _ = np.histogram2d(x[keep], y[keep], bins=5,
+                                range=((0, 5), (0, 10)), weights=c[keep])
+    counts, _, _ = np.histogram2d(x[keep], y[keep], bins=5,
+                                  range=((0, 5), (0, 10)))
+    np.testing.assert_array_equal(grid.counts, counts)
+    np.testing.assert_allclose(grid.means, sums / counts)
+    frame = grid.to_frame()
+    assert frame["count"].sum() == keep.sum()
+    assert list(frame.columns) == ["x", "x2", "y", "y2", "count", "mean"]
+
+
+def test_auto_bins():
+    assert auto_bins(1000) == 20
+    assert auto_bins(1) == 10
+    assert auto_bins(10 ** 9) == 200
+    with pytest.raises(ValueError):
+        Grid([1], [1], bins="rice")
+
+
+def test_binned_scatter():
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    rng = np.random.default_rng(2)
+    x, y, c = (pd.Series(values, name=name) for name, values
+               in zip("xyc", rng.uniform(0, 10, size=(3, 1000))))
+    fig, ax = plt.subplots()
+    try:
+        assert binned_scatter(x, y, bins=4, ax=ax) is ax
+        binned_scatter(x, y, c, bins=4, ax=ax)
+        counts, means = (mesh.get_array() for mesh in ax.collections)
+        grid = Grid(x, y, values=c, bins=4)
+        np.testing.assert_array_equal(counts.ravel(), grid.counts.T.ravel())
+        np.testing.assert_allclose(means.ravel(), grid.means.T.ravel())
+        assert ax.get_xlabel() == "x"
+        assert fig.axes[-1].get_ylabel() == "c"
+    finally:
+        plt.close(fig)
+
+
+@pytest.mark.parametrize("color", [None, "price", "count", "x"])
+def test_binned_chart(color):
+    pytest.importorskip("altair")
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(rng.uniform(0, 10, size=(1000, 3)),
+                      columns=["x", "y", "price"])
+    df["count"] = df["price"]
+    spec = binned_chart(df, "x", "y", color=color, bins=5).to_dict()
+    cells = pd.DataFrame(next(iter(spec["datasets"].values())))
+    grid = Grid(df["x"], df["y"], values=None if color is None
+                else df[color], bins=5)
+    assert cells["count"].sum() == len(df)
+    assert spec["encoding"]["color"]["title"] == (color or "count")
+    if color is not None:
+        assert spec["encoding"]["color"]["field"] == "mean"
+        np.testing.assert_allclose(cells["mean"],
+                                   grid.to_frame()["mean"])
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.bitpacked import (METRICS, BitMatrix, binary_distance_matrix,
+                               popcount)
+
+
+def genres(n=150, p=70, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, p)) < .1
+    X[0] = False
+    X[1] = False
+    return pd.DataFrame(X, columns=["g%d" % j for j in range(p)])
+
+
+def test_round_trip():
+    X = genres()
+    bits = BitMatrix(X)
+    assert bits.words.shape == (len(X), 2)
+    pd.testing.assert_frame_equal(bits.to_frame(), X)
+    np.testing.assert_array_equal(bits.counts, X.sum(axis=1))
+    rows = [[1, 0, 1], [0, 0, 1]]
+    np.testing.assert_array_equal(BitMatrix(rows).to_frame(), rows)
+
+
+def test_popcount():
+    words = np.array([0, 1, 2 ** 64 - 1, 0xF0F0], dtype=np.uint64)
+    np.testing.assert_array_equal(popcount(words), [0, 1, 64, 8])
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_matches_sklearn(metric):
+    metrics = pytest.importorskip("sklearn.metrics")
+    X = genres()
+    D = binary_distance_matrix(X, metric=metric, memory=8 * 4 * 900)
+    expected = metrics.pairwise_distances(X.to_numpy(), metric=metric)
+    # two rows of zeros are identical
+    expected[np.isnan(expected)] = 0
+    np.testing.assert_allclose(D, expected, atol=1e-12)
+    Y = genres(30, seed=1)
+    np.testing.assert_allclose(
+        binary_distance_matrix(X, Y, metric=metric),
+        np.nan_to_num(metrics.pairwise_distances(X.to_numpy(),
+                                                 Y.to_numpy(),
+                                                 metric=metric)),
+        atol=1e-12)
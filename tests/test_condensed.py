@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.condensed import CondensedDistances
+
+
+def wines(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(n, 4)),
+                        index=["%d_wine" % i for i in range(n)])
+
+
+def test_matches_pdist():
+    distance = pytest.importorskip("scipy.spatial.distance")
+    X = wines()
+    D = CondensedDistances.from_data(X, metric="cityblock", memory=8 * 500)
+    np.testing.assert_allclose(D.values, distance.pdist(X, "cityblock"))
+    np.testing.assert_allclose(D.to_numpy(),
+                               distance.squareform(D.values))
+    assert D.to_frame().index.equals(X.index)
+    assert D.distance("3_wine", "7_wine") == D.to_numpy()[3, 7]
+    np.testing.assert_allclose(D.row("5_wine"), D.to_numpy()[5])
+
+
+def test_min_and_idxmin_match_dataframe():
+    X = wines()
+    D = CondensedDistances.from_data(X)
+    frame = D.to_frame()
+    frame = frame.mask(np.eye(len(frame), dtype=bool))
+    pd.testing.assert_series_equal(D.min(), frame.min(), check_names=False)
+    pd.testing.assert_series_equal(D.idxmin(), frame.idxmin(),
+                                   check_names=False)
+
+
+def test_file_backed(tmp_path):
+    X = wines()
+    path = str(tmp_path / "wines.dist")
+    D = CondensedDistances.from_data(X, dtype=np.float32, path=path)
+    reopened = CondensedDistances.open(path, len(X), X.index, np.float32,
+                                       mode="r")
+    np.testing.assert_array_equal(reopened.values, D.values)
+    with pytest.raises(ValueError):
+        CondensedDistances.from_values(np.zeros(4))
+
+
+def test_from_list():
+    X = wines(10)
+    D = CondensedDistances.from_data(X.to_numpy().tolist())
+    np.testing.assert_allclose(D.values, CondensedDistances.from_data(X)
+                               .values)
+    assert D.labels.equals(pd.RangeIndex(10))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from data301.contingency import ContingencyTable, factorize
+
+
+def data(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    x = pd.Series(rng.choice(["S", "C", "Q"], n), name="embarked")
+    y = pd.Series(rng.choice([1, 2, 3], n), name="pclass")
+    x[rng.random(n) < .1] = None
+    y = y.astype(float)
+    y[rng.random(n) < .1] = np.nan
+    return x, y
+
+
+def test_counts_match_crosstab():
+    x, y = data()
+    table = ContingencyTable(x, y)
+    expected = pd.crosstab(x, y)
+    np.testing.assert_array_equal(table.counts.to_numpy(),
+                                  expected.to_numpy())
+    assert list(table.counts.index) == list(expected.index)
+    assert list(table.counts.columns) == list(expected.columns)
+    assert table.total == expected.to_numpy().sum()
+
+
+def test_distributions():
+    x, y = data()
+    table = ContingencyTable(x, y)
+    counts = pd.crosstab(x, y)
+    joint = counts / counts.sum().sum()
+    np.testing.assert_allclose(table.joint, joint)
+    np.testing.assert_allclose(table.row_marginal, joint.sum(axis=1))
+    np.testing.assert_allclose(table.column_marginal, joint.sum(axis=0))
+    np.testing.assert_allclose(table.row_given_column,
+                               counts / counts.sum())
+    np.testing.assert_allclose(table.column_given_row,
+                               counts.div(counts.sum(axis=1), axis=0))
+    np.testing.assert_allclose(
+        table.expected_counts,
+        np.outer(counts.sum(axis=1), counts.sum(axis=0)) / table.total)
+
+
+def test_from_codes():
+    x, y = data()
+    row_codes, row_labels = factorize(x)
+    column_codes, column_labels = factorize(y)
+    table = ContingencyTable.from_codes(row_codes, column_codes,
+                                        row_labels, column_labels)
+    np.testing.assert_array_equal(table.counts,
+                                  ContingencyTable(x, y).counts)
+
+
+def test_categories_seen_only_with_missing_values():
+    import warnings
+    x = pd.Series(["x", "y", None, "z", "x"], name="a")
+    y = pd.Series([1, 2, 3, None, 1], name="b")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        table = ContingencyTable(x, y)
+        pd.testing.assert_frame_equal(table.counts, pd.crosstab(x, y))
+        conditional = table.row_given_column
+        assert not conditional.isna().any().any()
+        np.testing.assert_allclose(conditional.sum(), 1)
+    # a label without observations is kept when nothing was dropped
+    table = ContingencyTable.from_codes([0, 0], [0, 1], ["p", "q"],
+                                        ["r", "s"])
+    assert table.counts.shape == (2, 2)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from data301.correlation import corr_matrix, top_correlations
+
+
+def table(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n, 5)) @ rng.normal(size=(5, 5)),
+                      columns=["Gr Liv Area", "SalePrice", "a", "b", "c"])
+    return df.mask(rng.random(df.shape) < .05).assign(name="x")
+
+
+def test_corr_matrix_matches_pandas():
+    df = table()
+    numeric = df.select_dtypes("number")
+    np.testing.assert_allclose(corr_matrix(df, chunksize=300),
+                               numeric.corr(), rtol=1e-10)
+    complete = numeric.dropna()
+    np.testing.assert_allclose(corr_matrix(complete, method="spearman"),
+                               complete.corr("spearman"), rtol=1e-10)
+
+
+def test_top_correlations():
+    df = table()
+    corr = df.select_dtypes("number").corr()
+    top = top_correlations(df, k=3)
+    pairs = corr.where(np.triu(np.ones(corr.shape, bool), 1)).stack()
+    expected = pairs.abs().sort_values(ascending=False).head(3)
+    assert list(zip(top.variable_1, top.variable_2)) == list(expected.index)
+    target = top_correlations(df, k=2, target="Gr Liv Area")
+    assert (target.variable_1 == "Gr Liv Area").all()
+    expected = corr["Gr Liv Area"].drop("Gr Liv Area").abs() \
+        .sort_values(ascending=False)
+    assert list(target.variable_2) == list(expected.index[:2])
+
+
+def test_nullable_columns():
+    df = table().round()
+    nullable = df.astype({"Gr Liv Area": "Int64", "SalePrice": "Float64"})
+    np.testing.assert_allclose(corr_matrix(nullable),
+                               df.select_dtypes("number").corr(),
+                               rtol=1e-10)
+    top = top_correlations(nullable, k=3, chunksize=300)
+    expected = top_correlations(df, k=3)
+    pd.testing.assert_frame_equal(top, expected)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.density import BinnedColumn
+
+
+def test_density_matches_gaussian_kde():
+    stats = pytest.importorskip("scipy.stats")
+    rng = np.random.default_rng(0)
+    values = pd.Series(np.concatenate([rng.normal(0, 1, 3000),
+                                       rng.normal(5, .5, 1000)]), name="x")
+    column = BinnedColumn(values)
+    density = column.density()
+    expected = stats.gaussian_kde(values)(density.index.to_numpy())
+    assert np.abs(density.to_numpy() - expected).max() < 1e-4
+    assert np.trapezoid(density.to_numpy(), density.index) == \
+        pytest.approx(1, abs=1e-3)
+
+
+def test_groups_have_their_own_bandwidth():
+    stats = pytest.importorskip("scipy.stats")
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(0, 1, 500), rng.normal(3, 2, 800)])
+    groups = pd.Series(["a"] * 500 + ["b"] * 800, name="sex")
+    densities = BinnedColumn(values, groups=groups).density()
+    assert list(densities.columns) == ["a", "b"]
+    for label, rows in [("a", slice(0, 500)), ("b", slice(500, None))]:
+        expected = stats.gaussian_kde(values[rows])(densities.index)
+        assert np.abs(densities[label] - expected).max() < 1e-3
+
+
+def test_hist_matches_numpy():
+    rng = np.random.default_rng(2)
+    values = rng.exponential(30, 5000)
+    column = BinnedColumn(values)
+    for bins in (10, 50, 120):
+        counts, edges = column.hist(bins)
+        expected, expected_edges = np.histogram(values, bins)
+        np.testing.assert_allclose(edges, expected_edges)
+        np.testing.assert_allclose(counts, expected)
+
+
+def test_weights_and_missing():
+    values = np.array([1.0, 2.0, np.nan, 4.0])
+    column = BinnedColumn(values, weights=[1, 2, 5, 1])
+    counts, _ = column.hist(3)
+    np.testing.assert_allclose(counts, [1, 2, 1])
+    with pytest.raises(ValueError):
+        BinnedColumn([np.nan])
+
+
+def test_groups_without_spread():
+    values = [1.0, 2.0, 3.0, 5.0, 7.0, 7.0]
+    column = BinnedColumn(values, groups=["a", "a", "a", "b", "c", "c"])
+    assert column.labels.tolist() == ["a", "b", "c"]
+    assert (column.bandwidths > 0).all()
+    density = column.density()
+    # the single observation and the repeated value are narrow peaks
+    np.testing.assert_allclose(density.sum() * column.step, 1, atol=1e-3)
+    assert density["b"].idxmax() == pytest.approx(5, abs=column.step)
+    assert density["c"].idxmax() == pytest.approx(7, abs=column.step)
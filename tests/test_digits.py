@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.digits import (benford, benford_test, digit_counts,
+                            first_digit, last_digit)
+
+
+def string_first_digits(values, ndigits=1):
+    """First digits read from the printed numbers."""
+    digits = []
+    for value in values:
+        text = ("%.14e" % abs(value)).replace(".", "")
+        digits.append(int(text[:ndigits]))
+    return digits
+
+
+def test_first_digit_matches_strings():
+    rng = np.random.default_rng(0)
+    values = np.exp(rng.uniform(-20, 20, 2000)) * rng.choice([-1, 1], 2000)
+    for ndigits in (1, 2):
+        assert first_digit(values, ndigits).tolist() == \
+            string_first_digits(values, ndigits)
+
+
+def test_first_digit_special_values():
+    values = pd.Series([52, 30.8, 0.07, 0.3, 0, np.nan, np.inf, -9.99])
+    assert first_digit(values).tolist() == [5, 3, 7, 3, -1, -1, -1, 9]
+    integers = pd.Series([52, 0, -7, 10 ** 18])
+    assert first_digit(integers).tolist() == [5, -1, 7, 1]
+
+
+def test_last_digit():
+    assert last_digit(pd.Series([120, -7, 33])).tolist() == [0, 7, 3]
+    assert last_digit(pd.Series([30.8, 1200.0, 0.05, np.nan])).tolist() == \
+        [8, 2, 5, -1]
+    assert last_digit(pd.Series([12.34, 5.1]), decimals=2).tolist() == \
+        [4, 0]
+
+
+def test_digit_counts_matches_value_counts():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "ints": rng.integers(-10 ** 6, 10 ** 6, 500),
+        "floats": np.exp(rng.normal(5, 3, 500)),
+        "nullable": pd.array(rng.integers(1, 999, 500), dtype="Int64"),
+    })
+    df.loc[::7, "floats"] = np.nan
+    df.loc[::5, "nullable"] = pd.NA
+    for position in ("first", "last"):
+        counts = digit_counts(df, position=position)
+        for column in df.columns:
+            if position == "first":
+                expected = first_digit(df[column].astype(float))
+            elif column == "nullable":
+                # nullable integers still give their units digit
+                expected = last_digit(df[column].astype(float), decimals=0)
+            else:
+                expected = last_digit(df[column])
+            expected = expected[expected >= 0].value_counts()
+            np.testing.assert_array_equal(
+                counts[column],
+                expected.reindex(counts.index, fill_value=0))
+
+
+def test_benford():
+    assert benford().sum() == pytest.approx(1)
+    assert benford(2).index[0] == 10
+    assert benford()[1] == pytest.approx(np.log10(2))
+
+
+def test_benford_test_matches_scipy():
+    stats = pytest.importorskip("scipy.stats")
+    rng = np.random.default_rng(2)
+    values = pd.Series(np.exp(rng.uniform(0, 10, 3000)), name="x")
+    counts = digit_counts(values.to_frame())
+    result = benford_test(counts)
+    expected = stats.chisquare(counts["x"], benford() * counts["x"].sum())
+    assert result.loc["x", "n"] == 3000
+    assert result.loc["x", "chi_square"] == pytest.approx(expected.statistic)
+    assert result.loc["x", "p_value"] == pytest.approx(expected.pvalue)
+
+
+def test_list_input():
+    assert first_digit([52, 30.8, 0.07]).tolist() == [5, 3, 7]
+    assert last_digit([52, 1200]).tolist() == [2, 0]
+
+
+def test_benford_test_value_counts():
+    pytest.importorskip("scipy")
+    rng = np.random.default_rng(3)
+    values = pd.Series(np.r_[np.exp(rng.uniform(0, 10, 3000)), 0, 0])
+    expected = benford_test(digit_counts(values.to_frame()))
+    for ndigits in (1, 2):
+        counts = first_digit(values, ndigits).value_counts().sort_index()
+        assert counts.index[0] == -1
+        result = benford_test(counts)
+        assert result["n"].iloc[0] == 3000
+        pd.testing.assert_frame_equal(
+            result, benford_test(counts, ndigits=ndigits))
+    counts = first_digit(values).value_counts().sort_index()
+    np.testing.assert_allclose(benford_test(counts).to_numpy(),
+                               expected.to_numpy())
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from data301.distances import (METRICS, distance_matrix, distance_tiles,
+                               tile_shape)
+
+
+def data(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(100, 5, size=(300, 6)), rng.normal(100, 5,
+                                                         size=(70, 6))
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_matches_sklearn(metric):
+    pairwise = pytest.importorskip("sklearn.metrics.pairwise")
+    X, Y = data()
+    # a small budget forces many tiles, with ragged edges
+    D = distance_matrix(X, metric=metric, memory=8 * 47 * 31)
+    expected = pairwise.pairwise_distances(X, metric=metric)
+    np.testing.assert_allclose(D, expected, rtol=1e-8, atol=1e-8)
+    np.testing.assert_array_equal(np.diag(D), 0)
+    np.testing.assert_allclose(
+        distance_matrix(X, Y, metric=metric, memory=8 * 1000),
+        pairwise.pairwise_distances(X, Y, metric=metric),
+        rtol=1e-8, atol=1e-8)
+
+
+def test_float32():
+    distance = pytest.importorskip("scipy.spatial.distance")
+    X, _ = data()
+    D = distance_matrix(X, dtype=np.float32)
+    assert D.dtype == np.float32
+    expected = distance.cdist(X, X)
+    assert np.abs(D - expected).max() < 1e-3 * expected.mean()
+
+
+def test_upper_tiles_and_rows():
+    X, _ = data()
+    D = distance_matrix(X)
+    seen = np.zeros(D.shape, dtype=bool)
+    for rows, columns, tile in distance_tiles(X, tile=(40, 50), upper=True,
+                                              rows=slice(60, 250)):
+        np.testing.assert_allclose(tile, D[rows, columns], atol=1e-9)
+        seen[rows, columns] = True
+    upper = np.triu(np.ones(D.shape, dtype=bool))
+    assert seen[60:250][upper[60:250]].all()
+    assert not seen[:60].any() and not seen[250:].any()
+
+
+def test_tile_shape_and_errors():
+    rows, columns = tile_shape(10 ** 6, 10 ** 6, np.float64, 2 ** 20)
+    assert rows * columns * 8 <= 2 ** 20
+    assert tile_shape(10, 5, np.float64, 2 ** 20) == (10, 5)
+    with pytest.raises(ValueError):
+        distance_matrix(np.ones((3, 2)), metric="chebyshev")
+    with pytest.raises(ValueError):
+        distance_matrix(np.ones((3, 2)), np.ones((3, 3)))
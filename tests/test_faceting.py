@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.faceting import Partition, facet_scatter
+
+
+def test_partition_matches_boolean_masks():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"type": rng.choice(["1Fam", "TwnhsE", "Duplex",
+                                           None], 300),
+                       "x": rng.normal(size=300)})
+    partition = Partition(df["type"])
+    assert list(partition.labels) == list(df["type"].dropna().unique())
+    pd.testing.assert_series_equal(
+        partition.sizes(), df["type"].value_counts(sort=False)
+        .reindex(partition.labels), check_names=False)
+    for label, (xs,) in partition.split(df["x"]):
+        np.testing.assert_array_equal(xs, df.loc[df["type"] == label, "x"])
+
+
+def test_sorted_labels():
+    partition = Partition(pd.Series(["b", "a", "b"]), sort=True)
+    assert list(partition.labels) == ["a", "b"]
+    assert [rows for _, rows in partition.slices()] == [slice(0, 1),
+                                                       slice(1, 3)]
+
+
+def test_facet_scatter():
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"type": rng.choice(list("abcdefg"), 500),
+                       "x": rng.normal(size=500),
+                       "y": rng.normal(size=500)})
+    axes = facet_scatter(df, "x", "y", by="type", sort=True)
+    try:
+        # 7 panels on a 3 x 3 grid, with the last two hidden
+        assert len(axes) == 7
+        figure_axes = axes[0].figure.axes
+        assert len(figure_axes) == 9
+        assert sum(ax.get_visible() for ax in figure_axes) == 7
+        for ax, label in zip(axes, sorted(df["type"].unique())):
+            assert ax.get_title() == label
+            points = ax.collections[0].get_offsets()
+            np.testing.assert_array_equal(
+                points, df.loc[df["type"] == label, ["x", "y"]])
+    finally:
+        plt.close(axes[0].figure)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from data301.frequency import ValueCounter, approx_value_counts
+
+
+def surnames(n=200000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(["name%d" % i for i in rng.zipf(1.2, n) % 300000],
+                     name="surname")
+
+
+def test_exact_matches_value_counts():
+    values = pd.Series(["a", "b", "a", None, "c", "a", "b"], name="name")
+    counter = ValueCounter()
+    counter.update(values[:3]).update(values[3:])
+    assert counter.is_exact
+    pd.testing.assert_series_equal(counter.value_counts(3),
+                                   values.value_counts().head(3),
+                                   check_names=False)
+    assert counter.nunique() == 3
+    assert counter.count("a") == 3
+
+
+def test_sketched_counts_bound_the_truth():
+    values = surnames()
+    counter = ValueCounter(capacity=200, exact_limit=1000)
+    for chunk in np.array_split(values, 20):
+        counter.update(chunk)
+    assert not counter.is_exact
+    expected = values.value_counts()
+    counts = counter.value_counts(10)
+    assert set(counts.index) == set(expected.index[:10])
+    true = expected.reindex(counts.index).to_numpy()
+    assert (counts.to_numpy() >= true).all()
+    assert (counts.to_numpy() - true <= counter.max_error()).all()
+    assert abs(counter.nunique() - len(expected)) < .05 * len(expected)
+
+
+def test_merge_and_helper():
+    values = surnames(20000)
+    a = ValueCounter(exact_limit=500).update(values[:10000])
+    b = ValueCounter(exact_limit=500).update(values[10000:])
+    merged = a.merge(b)
+    assert merged.total == len(values)
+    top = approx_value_counts(values, k=5)
+    assert list(top.index) == list(values.value_counts().index[:5])
+
+
+def test_integer_chunks_read_as_floats():
+    # a chunked read gives float chunks wherever a value is missing
+    rng = np.random.default_rng(1)
+    chunks = []
+    for i in range(10):
+        chunk = pd.Series(rng.zipf(1.5, 10000) % 1000)
+        if i % 2:
+            chunk = chunk.astype(float)
+            chunk[0] = np.nan
+        chunks.append(chunk)
+    values = pd.concat(chunks)
+    counter = ValueCounter(capacity=100, exact_limit=100)
+    for chunk in chunks:
+        counter.update(chunk)
+    assert not counter.is_exact
+    expected = values.value_counts()
+    counts = counter.value_counts(3)
+    assert list(counts.index) == list(expected.index[:3])
+    true = expected.reindex(counts.index).to_numpy()
+    assert (counts.to_numpy() >= true).all()
+    assert (counts.to_numpy() - true <= counter.max_error()).all()
+    assert counter.count(1) >= expected[1]
+    assert abs(counter.nunique() - len(expected)) < .05 * len(expected)
+
+
+def test_categorical_chunks():
+    values = pd.Series(pd.Categorical(["a", "b", "a"],
+                                      categories=["a", "b", "c", "d"]))
+    for exact_limit in (100, 1):
+        counter = ValueCounter(exact_limit=exact_limit).update(values)
+        assert counter.nunique() == 2
+        assert counter.value_counts().to_dict() == {"a": 2, "b": 1}
+        assert counter.count("c") == 0
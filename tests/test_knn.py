@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.knn import (knn_cv_errors, knn_loo, knn_loo_errors,
+                         knn_predict, knn_predictions,
+                         knn_validation_errors)
+
+neighbors = pytest.importorskip("sklearn.neighbors")
+
+
+def housing(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, 3)),
+                     columns=["Gr Liv Area", "Bedroom AbvGr", "Full Bath"])
+    y = pd.Series(3 * X["Gr Liv Area"] + rng.normal(size=n),
+                  name="SalePrice")
+    return X, y
+
+
+def test_predict_matches_sklearn_and_section_5_1():
+    X, y = housing()
+    X_new = housing(50, seed=1)[0][["Full Bath", "Bedroom AbvGr",
+                                    "Gr Liv Area"]]
+    predictions = knn_predict(X, y, X_new, k=30)
+    model = neighbors.KNeighborsRegressor(30).fit(X, y)
+    np.testing.assert_allclose(predictions, model.predict(X_new[X.columns]))
+    assert predictions.index.equals(X_new.index)
+    x_new = X_new.iloc[0]
+    dists = np.sqrt(((X - x_new) ** 2).sum(axis=1))
+    expected = y.loc[dists.sort_values().index[:30]].mean()
+    assert knn_predict(X, y, x_new, k=30) == pytest.approx(expected)
+
+
+def test_several_k_match_sklearn():
+    X, y = housing()
+    X_val, y_val = housing(200, seed=1)
+    ks = [1, 5, 30]
+    predictions = knn_predictions(X, y, X_val, ks)
+    errors = knn_validation_errors(X, y, X_val, y_val, ks)
+    for k in ks:
+        expected = neighbors.KNeighborsRegressor(k).fit(X, y).predict(X_val)
+        np.testing.assert_allclose(predictions[k], expected)
+        assert errors.loc[k, "MSE"] == pytest.approx(
+            np.mean((y_val - expected) ** 2))
+
+
+def test_cv_errors_match_cross_val_score():
+    model_selection = pytest.importorskip("sklearn.model_selection")
+    pipeline = pytest.importorskip("sklearn.pipeline")
+    preprocessing = pytest.importorskip("sklearn.preprocessing")
+    X, y = housing(300)
+    errors = knn_cv_errors(X, y, range(1, 11), cv=5)
+    for k in (1, 4, 10):
+        model = pipeline.Pipeline([
+            ("scaler", preprocessing.StandardScaler()),
+            ("fit", neighbors.KNeighborsRegressor(k))])
+        expected = -model_selection.cross_val_score(
+            model, X, y, cv=5, scoring="neg_mean_squared_error").mean()
+        assert errors.loc[k, "MSE"] == pytest.approx(expected)
+
+
+def test_loo_matches_refits():
+    X, y = housing(120)
+    loo = knn_loo(X, y, k=5)
+    model = neighbors.KNeighborsRegressor(5).fit(X, y)
+    np.testing.assert_allclose(loo["training"], model.predict(X))
+    refits = [neighbors.KNeighborsRegressor(5).fit(X.drop(i), y.drop(i))
+              .predict(X.loc[[i]])[0] for i in X.index]
+    np.testing.assert_allclose(loo["loo"], refits)
+    np.testing.assert_allclose(loo["loo_residual"], y - refits)
+    errors = knn_loo_errors(X, y, [1, 5])
+    assert errors.loc[1, ("training", "MSE")] == 0
+    assert errors.loc[5, ("loo", "MSE")] == pytest.approx(
+        np.mean((y - refits) ** 2))
+
+
+def test_loo_classification():
+    X, _ = housing(120)
+    y = pd.Series(np.where(X["Bedroom AbvGr"] > 0, "red", "white"))
+    for k in (1, 4):
+        loo = knn_loo(X, y, k=k)
+        model = neighbors.KNeighborsClassifier(k).fit(X, y)
+        np.testing.assert_array_equal(loo["training"], model.predict(X))
+        refits = [neighbors.KNeighborsClassifier(k).fit(X.drop(i), y.drop(i))
+                  .predict(X.loc[[i]])[0] for i in X.index]
+        np.testing.assert_array_equal(loo["loo"], refits)
+    errors = knn_loo_errors(X, y, [4])
+    assert errors.loc[4, ("loo", "accuracy")] == pytest.approx(
+        np.mean(np.array(refits) == y))
+
+
+def test_loo_list_input():
+    X, y = housing(60)
+    loo = knn_loo(X.to_numpy().tolist(), y.tolist(), k=3)
+    assert loo.index.equals(pd.RangeIndex(60))
+    np.testing.assert_allclose(loo, knn_loo(X, y, k=3))
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.mixed import mixed_distance_matrix
+
+
+def titanic(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "pclass": rng.choice(["1", "2", "3"], n),
+        "sex": pd.Categorical(rng.choice(["male", "female"], n)),
+        "age": rng.uniform(1, 80, n),
+        "fare": rng.exponential(30, n),
+        "embarked": rng.choice(["S", "C", "Q"], n).astype(object),
+    })
+    df.loc[rng.random(n) < .1, "embarked"] = None
+    return df
+
+
+@pytest.mark.parametrize("metric", ["euclidean", "cityblock"])
+def test_unscaled_matches_get_dummies(metric):
+    distance = pytest.importorskip("scipy.spatial.distance")
+    df = titanic()
+    dummies = pd.get_dummies(df).to_numpy(dtype=float)
+    np.testing.assert_allclose(
+        mixed_distance_matrix(df, metric=metric, scale=None,
+                              memory=8 * 4000),
+        distance.cdist(dummies, dummies, metric), atol=1e-9)
+
+
+def gower(df, categorical):
+    """Gower's distance, one pair at a time."""
+    numeric = [c for c in df.columns if c not in categorical]
+    spread = df[numeric].max() - df[numeric].min()
+    n = len(df)
+    D = np.empty((n, n))
+    for i in range(n):
+        for j in range(n):
+            terms = []
+            for c in numeric:
+                x, y = df[c].iloc[i], df[c].iloc[j]
+                if not (pd.isna(x) or pd.isna(y)):
+                    terms.append(abs(x - y) / spread[c])
+            for c in categorical:
+                x, y = df[c].iloc[i], df[c].iloc[j]
+                if not (pd.isna(x) or pd.isna(y)):
+                    terms.append(float(x != y))
+            D[i, j] = np.mean(terms)
+    return D
+
+
+def test_gower_with_missing_values():
+    df = titanic(40)
+    df.loc[3, "age"] = np.nan
+    D = mixed_distance_matrix(df)
+    np.testing.assert_allclose(
+        D, gower(df, ["pclass", "sex", "embarked"]), atol=1e-12)
+
+
+def test_second_set_and_weights():
+    df = titanic()
+    # the scales come from the first set, so compare without scaling
+    D = mixed_distance_matrix(df[:50], df[50:80], scale=None)
+    np.testing.assert_allclose(
+        D, mixed_distance_matrix(df, scale=None)[:50, 50:80], atol=1e-12)
+    weighted = mixed_distance_matrix(df, weights={"age": 0})
+    # a weight of 0 leaves the column out of the average
+    np.testing.assert_allclose(
+        weighted, mixed_distance_matrix(df.drop(columns="age")),
+        atol=1e-12)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.moments import CovarianceAccumulator
+
+
+def table(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(n, 4)) @ rng.normal(size=(4, 4)) + 1e6
+    df = pd.DataFrame(values, columns=list("abcd"))
+    df = df.mask(rng.random(df.shape) < .1)
+    df["label"] = "x"
+    return df
+
+
+def test_chunks_match_pandas():
+    df = table()
+    acc = CovarianceAccumulator.from_chunks(
+        df[i:i + 400] for i in range(0, len(df), 400))
+    numeric = df[list("abcd")]
+    np.testing.assert_allclose(acc.cov(), numeric.cov(), rtol=1e-9)
+    np.testing.assert_allclose(acc.corr(), numeric.corr(), rtol=1e-9)
+    np.testing.assert_allclose(acc.mean(), numeric.mean(), rtol=1e-12)
+    np.testing.assert_allclose(acc.var(), numeric.var(), rtol=1e-9)
+    np.testing.assert_array_equal(
+        acc.count(), numeric.notna().astype(int).T @ numeric.notna()
+        .astype(int))
+
+
+def test_merge_and_complete_data():
+    df = table().dropna()[list("abcd")]
+    a = CovarianceAccumulator().update(df[:1000])
+    b = CovarianceAccumulator().update(df[1000:])
+    np.testing.assert_allclose(a.merge(b).cov(), df.cov(), rtol=1e-9)
+
+
+def test_min_periods():
+    df = pd.DataFrame({"a": [1.0, 2, 3, np.nan], "b": [np.nan, 1, 2, 5]})
+    acc = CovarianceAccumulator().update(df)
+    pd.testing.assert_frame_equal(acc.cov(min_periods=3),
+                                  df.cov(min_periods=3))
+    with pytest.raises(ValueError):
+        CovarianceAccumulator().cov()
+
+
+def test_nullable_columns():
+    df = table()[list("ab")]
+    nullable = df.round().astype({"a": "Int64", "b": "Float64"})
+    acc = CovarianceAccumulator.from_chunks(
+        nullable[i:i + 400] for i in range(0, len(df), 400))
+    np.testing.assert_allclose(acc.cov(), nullable.astype(float).cov(),
+                               rtol=1e-9)
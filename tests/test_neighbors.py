@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.neighbors import k_nearest, nearest_other
+
+
+def data(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(800, 5)), rng.normal(size=(150, 5))
+
+
+@pytest.mark.parametrize("metric", ["euclidean", "cityblock", "cosine"])
+def test_matches_sklearn(metric):
+    neighbors = pytest.importorskip("sklearn.neighbors")
+    X, Y = data()
+    model = neighbors.NearestNeighbors(n_neighbors=7, metric=metric,
+                                       algorithm="brute").fit(X)
+    distances, indices = k_nearest(Y, X, k=7, metric=metric,
+                                   memory=8 * 3000)
+    expected_distances, expected_indices = model.kneighbors(Y)
+    np.testing.assert_allclose(distances, expected_distances, atol=1e-9)
+    np.testing.assert_array_equal(indices, expected_indices)
+
+
+def test_exclude_self_and_padding():
+    X, _ = data()
+    distances, indices = k_nearest(X, k=3)
+    np.testing.assert_array_equal(k_nearest(X, X, k=3)[1], indices)
+    assert not (indices == np.arange(len(X))[:, np.newaxis]).any()
+    assert (np.diff(distances, axis=1) >= 0).all()
+    distances, indices = k_nearest(X[:3], k=4)
+    assert (indices[:, 2:] == -1).all() and np.isinf(distances[:, 2:]).all()
+    distances, indices = k_nearest(X, k=1, exclude_self=False)
+    np.testing.assert_array_equal(indices[:, 0], np.arange(len(X)))
+
+
+def test_nearest_other_matches_idxmin():
+    distance = pytest.importorskip("scipy.spatial.distance")
+    X, _ = data()
+    X = pd.DataFrame(X[:200], index=["w%d" % i for i in range(200)])
+    D = pd.DataFrame(distance.cdist(X, X), index=X.index, columns=X.index)
+    D = D.mask(np.eye(len(D), dtype=bool))
+    result = nearest_other(X)
+    np.testing.assert_allclose(result["distance"], D.min(), atol=1e-9)
+    assert (result["nearest"] == D.idxmin()).all()
+
+
+def test_nearest_other_list():
+    X = [[0.0, 0.0], [0.0, 1.0], [5.0, 5.0]]
+    result = nearest_other(X)
+    assert result.index.equals(pd.RangeIndex(3))
+    assert result["nearest"].tolist() == [1, 0, 1]
+    np.testing.assert_allclose(result["distance"],
+                               [1, 1, np.hypot(5, 4)])
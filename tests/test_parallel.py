@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pytest
+
+from data301.condensed import CondensedDistances
+from data301.distances import distance_matrix
+from data301.neighbors import k_nearest
+from data301.parallel import parallel_distances
+
+
+def data(seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(300, 4)), rng.normal(size=(90, 4))
+
+
+@pytest.mark.parametrize("n_jobs", [1, 3])
+@pytest.mark.parametrize("metric", ["euclidean", "cityblock", "cosine"])
+def test_dense_matches_serial(n_jobs, metric):
+    X, Y = data()
+    np.testing.assert_allclose(
+        parallel_distances(X, metric=metric, n_jobs=n_jobs,
+                           memory=8 * 2000),
+        distance_matrix(X, metric=metric), atol=1e-12)
+    np.testing.assert_allclose(
+        parallel_distances(X, Y, metric=metric, n_jobs=n_jobs),
+        distance_matrix(X, Y, metric=metric), atol=1e-12)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 3])
+def test_condensed_matches_serial(n_jobs, tmp_path):
+    X, _ = data()
+    expected = CondensedDistances.from_data(X).values
+    D = parallel_distances(X, output="condensed", n_jobs=n_jobs,
+                           memory=8 * 2000)
+    np.testing.assert_allclose(D.values, expected, atol=1e-12)
+    D = parallel_distances(X, output="condensed", n_jobs=n_jobs,
+                           path=str(tmp_path / "X.dist"))
+    np.testing.assert_allclose(D.values, expected, atol=1e-12)
+
+
+@pytest.mark.parametrize("n_jobs", [1, 3])
+def test_topk_matches_serial(n_jobs):
+    X, Y = data()
+    distances, indices = parallel_distances(X, output="topk", k=4,
+                                            n_jobs=n_jobs, memory=8 * 2000)
+    expected_distances, expected_indices = k_nearest(X, k=4)
+    np.testing.assert_allclose(distances, expected_distances, atol=1e-12)
+    np.testing.assert_array_equal(indices, expected_indices)
+    _, indices = parallel_distances(X, X, output="topk", k=4,
+                                    n_jobs=n_jobs, memory=8 * 2000)
+    np.testing.assert_array_equal(indices, expected_indices)
+
+
+def test_errors():
+    X, Y = data()
+    with pytest.raises(ValueError):
+        parallel_distances(X, output="sparse")
+    with pytest.raises(ValueError):
+        parallel_distances(X, Y, output="condensed")
+
+
+def test_list_input():
+    X = [[0.0, 1.0], [1.0, 1.0], [2.0, 2.0]]
+    D = parallel_distances(X, output="condensed", n_jobs=1)
+    np.testing.assert_allclose(D.values, CondensedDistances.from_data(X)
+                               .values)
+
+
+@pytest.mark.parametrize("output", ["dense", "condensed", "topk"])
+def test_prepares_once(output, monkeypatch):
+    from data301 import distances, parallel
+    calls, original = [], distances._prepare
+
+    def prepare(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(parallel, "_prepare", prepare)
+    monkeypatch.setattr(distances, "_prepare", prepare)
+    X, Y = data()
+    parallel_distances(X, output=output, k=2, n_jobs=1, memory=8 * 2000)
+    assert len(calls) == 1
+    if output != "condensed":
+        result = parallel_distances(X, Y, output=output, k=2, n_jobs=1,
+                                    memory=8 * 2000)
+        assert len(calls) == 2
+        if output == "topk":
+            expected = k_nearest(X, Y, k=2)
+            np.testing.assert_allclose(result[0], expected[0], atol=1e-12)
+            np.testing.assert_array_equal(result[1], expected[1])
+
+
+@pytest.mark.parametrize("n_jobs", [1, 3])
+def test_dense_in_file(n_jobs, tmp_path, monkeypatch):
+    import tempfile
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    X, Y = data()
+    expected = distance_matrix(X, Y)
+    D = parallel_distances(X, Y, n_jobs=n_jobs, memory=8 * 2000)
+    np.testing.assert_allclose(D, expected, atol=1e-12)
+    # without a path, the result is in memory and no file is left behind
+    assert type(D) is np.ndarray
+    assert not list(tmp_path.iterdir())
+    path = str(tmp_path / "D.dist")
+    D = parallel_distances(X, Y, n_jobs=n_jobs, memory=8 * 2000, path=path)
+    np.testing.assert_allclose(D, expected, atol=1e-12)
+    assert isinstance(D, np.memmap)
+    np.testing.assert_allclose(
+        np.memmap(path, dtype=np.float64, mode="r", shape=expected.shape),
+        expected, atol=1e-12)
+
+
+def blas_threads():
+    from threadpoolctl import threadpool_info
+    return [pool["num_threads"] for pool in threadpool_info()
+            if pool["user_api"] == "blas"]
+
+
+def test_workers_use_one_blas_thread():
+    pytest.importorskip("threadpoolctl")
+    from concurrent.futures import ProcessPoolExecutor
+    from data301.parallel import _start_worker
+    environ = dict(os.environ)
+    with ProcessPoolExecutor(
+            2, initializer=_start_worker, initargs=(None,)) as pool:
+        threads = pool.submit(blas_threads).result()
+    assert all(n == 1 for n in threads)
+    # the limit applies to the workers only
+    assert dict(os.environ) == environ
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.parsing import parse_numeric
+
+
+def test_examples():
+    values = pd.Series(["$1,250,000", "12.5%", "(300)", None, " -$4.50 ",
+                        "+7", "", "€3", ".5"], name="Amount")
+    result = parse_numeric(values)
+    np.testing.assert_array_equal(
+        result, [1250000, 12.5, -300, np.nan, -4.5, 7, np.nan, 3, .5])
+    assert result.name == "Amount"
+    assert result.index.equals(values.index)
+
+
+def test_matches_str_chain():
+    rng = np.random.default_rng(0)
+    amounts = rng.integers(0, 10 ** 7, 1000)
+    strings = pd.Series(["${:,}".format(a) for a in amounts])
+    expected = strings.str.replace("$", "").str.replace(",", "") \
+        .astype(float)
+    pd.testing.assert_series_equal(parse_numeric(strings, chunksize=64),
+                                   expected)
+
+
+def test_percent_and_na_value():
+    values = ["12.5%", None]
+    np.testing.assert_array_equal(
+        parse_numeric(values, percent="fraction", na_value=0), [.125, 0])
+
+
+def test_errors():
+    with pytest.raises(ValueError, match="could not parse"):
+        parse_numeric(["1", "1.2.3"])
+    np.testing.assert_array_equal(
+        parse_numeric(["1", "1.2.3", "abc"], errors="coerce"),
+        [1, np.nan, np.nan])
+
+
+def test_numeric_series_passes_through():
+    values = pd.Series([1, 2, None], dtype="Int64")
+    np.testing.assert_array_equal(parse_numeric(values, na_value=0),
+                                  [1, 2, 0])
+
+
+def test_numeric_input():
+    np.testing.assert_array_equal(parse_numeric(np.array([1e-7, 2])),
+                                  [1e-7, 2])
+    np.testing.assert_array_equal(parse_numeric([1, None, 2.5], na_value=0),
+                                  [1, 0, 2.5])
+    result = parse_numeric(pd.Series([1, None], dtype="Int64", name="n"))
+    np.testing.assert_array_equal(result, [1, np.nan])
+    assert result.name == "n"
+
+
+def test_long_strings():
+    junk = "x" * 500
+    values = ["$1,000", junk, "   %s   " % ("1" * 10), None]
+    with pytest.raises(ValueError, match="1 value"):
+        parse_numeric(values)
+    result = parse_numeric(values * 1000, errors="coerce")
+    np.testing.assert_array_equal(result[:4], [1000, np.nan, 1111111111,
+                                               np.nan])
+    # whitespace around a valid value does not count towards the limit
+    np.testing.assert_array_equal(parse_numeric([" " * 100 + "12%"]), [12])
+
+
+def test_thousands_separators():
+    values = ["1,234", "$1,250,000", "1,234.5678", "12,345,678.9"]
+    np.testing.assert_array_equal(parse_numeric(values),
+                                  [1234, 1250000, 1234.5678, 12345678.9])
+    malformed = ["1,2,,3", "12,34", "1234,567", "1,", ",123", "1,234,56",
+                 "1,234.5,6"]
+    for value in malformed:
+        with pytest.raises(ValueError):
+            parse_numeric([value])
+    assert np.isnan(parse_numeric(malformed, errors="coerce")).all()
+
+
+def test_object_series_of_numbers():
+    values = pd.Series([1e-7, None, 2.5], dtype=object, name="x")
+    result = parse_numeric(values)
+    np.testing.assert_array_equal(result, [1e-7, np.nan, 2.5])
+    assert result.name == "x"
+    np.testing.assert_array_equal(parse_numeric(values, na_value=0),
+                                  [1e-7, 0, 2.5])
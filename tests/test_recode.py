@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from data301.recode import indicators, recode
+
+QUALITY = pd.Series(["TA", "Gd", "Ex", None, "Po", "TA", "Fa"],
+                    name="Heating QC")
+MAPPING = {"Po": "Unacceptable", "Fa": "Unacceptable", "TA": "Acceptable",
+           "Gd": "Acceptable", "Ex": "Acceptable"}
+
+
+def test_recode_matches_map():
+    expected = QUALITY.map(MAPPING)
+    result = recode(QUALITY, MAPPING)
+    assert isinstance(result.dtype, pd.CategoricalDtype)
+    assert [None if pd.isna(v) else v for v in result] == \
+        [None if pd.isna(v) else v for v in expected]
+    pd.testing.assert_series_equal(recode(QUALITY, MAPPING,
+                                          categorical=False), expected)
+
+
+def test_recode_categorical_and_partial():
+    values = QUALITY.astype("category")
+    result = recode(values, {"TA": 3, "Gd": 4})
+    expected = QUALITY.map({"TA": 3, "Gd": 4})
+    np.testing.assert_array_equal(result.astype(float), expected)
+
+
+def test_indicators():
+    values = pd.Series(["AllPub", "NoSewr", "AllPub", None, "NoSeWa"])
+    categories = ["AllPub", "NoSewr", "NoSeWa"]
+    expected = pd.DataFrame({c: values == c for c in categories})
+    pd.testing.assert_frame_equal(indicators(values, categories), expected)
+    pd.testing.assert_frame_equal(
+        indicators(values, prefix="Utilities"),
+        pd.get_dummies(values, prefix="Utilities"))
+
+
+def test_indicators_keep_labels():
+    values = pd.Series([1, 3, 1, 2])
+    # the columns are the numbers, not their string forms
+    pd.testing.assert_frame_equal(indicators(values), pd.get_dummies(values))
+    assert indicators(values, [3, 1])[3].tolist() == [False, True, False,
+                                                      False]
+    pd.testing.assert_frame_equal(indicators(values, prefix="Overall Qual"),
+                                  pd.get_dummies(values,
+                                                 prefix="Overall Qual"))
+
+
+def test_list_input():
+    result = recode(["a", "b", None, "a"], {"a": "x", "b": "y"},
+                    categorical=False)
+    assert result.tolist() == ["x", "y", np.nan, "x"]
+    expected = pd.get_dummies(pd.Series(["b", "a", "b"]))
+    pd.testing.assert_frame_equal(indicators(["b", "a", "b"]), expected)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.scaling import Scaler
+
+
+def table(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(5, 3, size=(n, 3)), columns=list("abc"))
+    df["d"] = 7.0
+    df.loc[::9, "a"] = np.nan
+    return df.assign(name="x")
+
+
+def test_statistics_match_pandas():
+    df = table()
+    scaler = Scaler.from_chunks(
+        df[i:i + 170] for i in range(0, len(df), 170))
+    numeric = df.select_dtypes("number")
+    np.testing.assert_allclose(scaler.mean(), numeric.mean(), rtol=1e-12)
+    np.testing.assert_allclose(scaler.std(), numeric.std(), rtol=1e-10)
+    np.testing.assert_allclose(scaler.norm(),
+                               np.sqrt((numeric ** 2).sum()), rtol=1e-12)
+    np.testing.assert_array_equal(scaler.min(), numeric.min())
+    np.testing.assert_array_equal(scaler.max(), numeric.max())
+
+
+@pytest.mark.parametrize("method", ["standard", "l2", "minmax"])
+def test_transform_matches_section_4_1(method):
+    df = table()
+    numeric = df.select_dtypes("number")
+    scaler = Scaler().update(df)
+    if method == "standard":
+        expected = (numeric - numeric.mean()) / numeric.std()
+    elif method == "l2":
+        expected = numeric / np.sqrt((numeric ** 2).sum())
+    else:
+        expected = (numeric - numeric.min()) / (numeric.max()
+                                                - numeric.min())
+    # a constant column becomes 0 instead of NaN
+    expected["d"] = 0.0 if method != "l2" else expected["d"]
+    result = scaler.transform(df, method, chunksize=128)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-10)
+
+
+def test_transform_into_float32_buffer():
+    df = table()
+    scaler = Scaler(["b", "c"]).update(df)
+    out = np.empty((len(df), 2), dtype=np.float32)
+    assert scaler.transform(df, out=out) is out
+    np.testing.assert_allclose(out, scaler.transform(df), rtol=1e-6)
+
+
+def test_merge():
+    df = table()
+    a = Scaler().update(df[:300])
+    merged = a.merge(Scaler().update(df[300:]))
+    np.testing.assert_allclose(merged.std(), Scaler().update(df).std())
+    with pytest.raises(ValueError):
+        a.merge(Scaler(["b"]).update(df))
+
+
+def test_nullable_columns():
+    df = table().round()
+    nullable = df.astype({"a": "Int64", "b": "Float64"})
+    scaler = Scaler().update(nullable)
+    numeric = df.select_dtypes("number")
+    np.testing.assert_allclose(scaler.mean(), numeric.mean(), rtol=1e-12)
+    np.testing.assert_allclose(scaler.std(), numeric.std(), rtol=1e-10)
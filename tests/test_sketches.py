@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from data301.sketches import (CountMinSketch, HyperLogLog, KLLSketch,
+                              SpaceSaving, hash_values)
+
+
+def zipf_values(n=100000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.zipf(1.3, n) % 50000
+
+
+def test_kll_exact_while_small():
+    values = np.random.default_rng(0).normal(size=100)
+    sketch = KLLSketch(k=200).update(values)
+    np.testing.assert_allclose(sketch.quantile([.1, .5, .9]),
+                               np.quantile(values, [.1, .5, .9]))
+
+
+def test_kll_rank_error():
+    values = np.random.default_rng(1).normal(size=200000)
+    sketches = [KLLSketch(.01, seed=i).update(chunk)
+                for i, chunk in enumerate(np.array_split(values, 8))]
+    sketch = sketches[0]
+    for other in sketches[1:]:
+        sketch.merge(other)
+    assert sketch.n == len(values)
+    assert len(sketch) < 2000
+    ordered = np.sort(values)
+    for q in np.linspace(.05, .95, 19):
+        rank = np.searchsorted(ordered, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < .02
+
+
+def test_hyperloglog():
+    values = zipf_values()
+    true = len(np.unique(values))
+    a = HyperLogLog().update(values[:50000])
+    b = HyperLogLog().update(values[50000:])
+    estimate = a.merge(b).estimate()
+    assert abs(estimate - true) / true < 4 * a.relative_error()
+
+
+def test_count_min_never_underestimates():
+    values = zipf_values()
+    sketch = CountMinSketch(epsilon=1e-3).update(values)
+    counts = pd.Series(values).value_counts()
+    estimates = sketch.estimate(counts.index.to_numpy())
+    assert (estimates >= counts.to_numpy()).all()
+    assert (estimates - counts.to_numpy()).max() <= 1e-3 * len(values) * 3
+
+
+def test_space_saving_finds_heavy_hitters():
+    values = zipf_values()
+    summary = SpaceSaving(100)
+    for chunk in np.array_split(values, 10):
+        summary.update(chunk)
+    top = summary.top(10)
+    expected = pd.Series(values).value_counts().head(10)
+    assert set(top.index) == set(expected.index)
+    true = expected.reindex(top.index).to_numpy()
+    assert (top["count"].to_numpy() >= true).all()
+    assert (top["count"].to_numpy() - top["error"].to_numpy()
+            <= true).all()
+
+
+def test_hash_values_is_deterministic():
+    values = np.array(["a", "b", "a"], dtype=object)
+    hashes = hash_values(values)
+    assert hashes.dtype == np.uint64
+    assert hashes[0] == hashes[2] != hashes[1]
+    np.testing.assert_array_equal(hash_values(values), hashes)
+
+
+def test_hash_values_by_value_not_type():
+    integers = hash_values(np.array([0, 1, -5, 2 ** 40]))
+    np.testing.assert_array_equal(
+        hash_values(np.array([0.0, 1.0, -5.0, 2.0 ** 40])), integers)
+    np.testing.assert_array_equal(
+        hash_values(pd.array([0, 1, -5, 2 ** 40], dtype="Int64")
+                    .to_numpy()), integers)
+    assert hash_values(np.array([1.5]))[0] != hash_values(np.array([1]))[0]
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301 import strings
+from data301.strings import count_separators, extract_group, nth_field
+
+NAMES = pd.Series(["Braund, Mr. Owen", "Cumings, Mrs. John", None,
+                   "Heikkinen, Miss. Laina", "Allen"], name="name")
+
+
+def as_objects(result):
+    return [None if pd.isna(value) else value for value in result]
+
+
+@pytest.mark.parametrize("n", [0, 1])
+def test_nth_field_matches_split(n):
+    expected = NAMES.str.split(", ", expand=True)[n]
+    result = nth_field(NAMES, ", ", n)
+    assert isinstance(result.dtype, pd.CategoricalDtype)
+    assert result.name == "name"
+    assert as_objects(result) == as_objects(expected)
+
+
+def test_nth_field_negative():
+    pytest.importorskip("pyarrow")
+    result = nth_field(pd.Series(["a,b,c", "d"]), ",", -1, output="object")
+    assert result.tolist() == ["c", "d"]
+
+
+def test_count_separators():
+    result = count_separators(pd.Series(["a, b, c", "a", None]), ",")
+    assert result.tolist() == [2, 0, -1]
+
+
+def test_extract_group_matches_str_extract():
+    values = pd.Series(["agnosticism and very serious about it",
+                        "atheism and laughing about it", "other", None])
+    pattern = r"and (\w+ ?\w*) about it"
+    expected = values.str.extract(pattern, expand=False)
+    result = extract_group(values, pattern, output="object")
+    assert as_objects(result) == as_objects(expected)
+
+
+def test_numpy_fallback(monkeypatch):
+    if not hasattr(np, "strings"):
+        pytest.skip("requires np.strings")
+    monkeypatch.setattr(strings, "pa", None)
+    monkeypatch.setattr(strings, "pc", None)
+    expected = NAMES.str.split(", ", expand=True)[0]
+    assert as_objects(nth_field(NAMES, ", ", 0)) == as_objects(expected)
+    assert count_separators(NAMES, ",").tolist() == [1, 1, -1, 1, 0]
+
+
+@pytest.mark.parametrize("arrow", [True, False])
+def test_list_input(arrow, monkeypatch):
+    if not arrow:
+        if not hasattr(np, "strings"):
+            pytest.skip("requires np.strings")
+        monkeypatch.setattr(strings, "pa", None)
+        monkeypatch.setattr(strings, "pc", None)
+    values = ["a,b", "c", None]
+    counts = count_separators(values, ",")
+    assert counts.tolist() == [1, 0, -1]
+    assert counts.index.equals(pd.RangeIndex(3))
+    assert as_objects(nth_field(values, ",", 0)) == ["a", "c", None]
+    assert as_objects(extract_group(values, r"(\w),")) == ["a", None, None]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data301.summary import SummaryAccumulator
+
+
+def fares(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    values = pd.Series(rng.lognormal(3, 1, n), name="fare")
+    values[rng.random(n) < .05] = np.nan
+    return values
+
+
+def test_exact_statistics_match_pandas():
+    values = fares()
+    summary = SummaryAccumulator.from_chunks(np.array_split(values, 7))
+    assert summary.count == values.count()
+    assert summary.n_missing == values.isna().sum()
+    assert summary.mean() == pytest.approx(values.mean(), rel=1e-12)
+    assert summary.std() == pytest.approx(values.std(), rel=1e-12)
+    assert summary.min() == values.min()
+    assert summary.max() == values.max()
+
+
+def test_quantiles_within_epsilon():
+    values = fares()
+    summary = SummaryAccumulator(epsilon=.01, seed=0)
+    for chunk in np.array_split(values, 10):
+        summary.update(chunk)
+    present = np.sort(values.dropna())
+    for q in (.1, .25, .5, .75, .9):
+        rank = np.searchsorted(present, summary.quantile(q)) / len(present)
+        assert abs(rank - q) < .02
+    described = summary.describe()
+    assert list(described.index) == list(values.describe().index)
+
+
+def test_merge_matches_single_pass():
+    values = fares()
+    a = SummaryAccumulator().update(values[:5000])
+    b = SummaryAccumulator().update(values[5000:])
+    merged = a.merge(b)
+    assert merged.count == values.count()
+    assert merged.var() == pytest.approx(values.var(), rel=1e-12)